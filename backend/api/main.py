@@ -1,24 +1,34 @@
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi import FastAPI, HTTPException, Depends, Request, Response, Query, BackgroundTasks
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
+import asyncio
 import bcrypt
 import jwt
 import datetime
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 import sys
 import os
 import re
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from services.service_api import create_user, update_user_service, create_contact, update_contact_service, delete_contact_service, create_meeting, update_meeting_service, delete_meeting_service, get_upcoming_meetings_service, get_meetings_for_date_service, get_user_by_email, list_contacts_for_user, list_meetings_for_contact, list_meetings_for_user, get_upcoming_follow_ups_for_user, get_goals_for_user, create_goal, update_goal_service, delete_goal_service, get_goal_steps, create_goal_step, update_goal_step_service, delete_goal_step_service, get_interactions_for_contact, get_interactions_for_user, create_interaction, update_interaction_service, delete_interaction_service, get_overdue_follow_ups_for_user, get_upcoming_follow_ups_interactions_for_user, get_platform_stats, create_or_update_public_profile_service, get_public_profiles_service, get_public_profile_by_user_id_service, delete_public_profile_service
-from models.database_functions import AlreadyExistsError, NotFoundError, get_session, User, engine, DATABASE_URL
+from services.service_api import create_user, update_user_service, create_contact, update_contact_service, delete_contact_service, create_meeting, update_meeting_service, delete_meeting_service, get_upcoming_meetings_service, get_meetings_for_date_service, get_user_by_email, list_contacts_for_user, list_meetings_for_contact, list_meetings_for_user, get_upcoming_follow_ups_for_user, get_goals_for_user, create_goal, update_goal_service, delete_goal_service, get_goal_steps, create_goal_step, update_goal_step_service, delete_goal_step_service, get_interactions_for_contact, get_interactions_for_user, create_interaction, update_interaction_service, delete_interaction_service, get_overdue_follow_ups_for_user, get_upcoming_follow_ups_interactions_for_user, create_or_update_public_profile_service, get_public_profiles_service, get_public_profile_by_user_id_service, delete_public_profile_service, get_dashboard_data_async, get_goals_for_user_async, update_user_password_hash_service, list_contacts_page_async, list_meetings_page_async, list_interactions_page_async
+from models.database_functions import AlreadyExistsError, NotFoundError, InvalidQueryError, get_session, User, engine, DATABASE_URL, MAX_PAGE_SIZE, encode_cursor, decode_cursor
 from sqlalchemy import text
+from models.async_database import async_engine
+from models.engine_factory import get_pool_metrics
+from services.platform_stats import get_cached_platform_stats, start_stats_refresher, stop_stats_refresher, STATS_REFRESH_SECONDS
 
 # Import optional services - don't break app if they fail
 try:
@@ -121,13 +131,44 @@ SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkey")  # Set SECRET_KEY environ
 ALGORITHM = "HS256"
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/login")
 
+# bcrypt cost factor for new hashes; existing hashes with a different cost are rehashed on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt runs on its own small pool so a login spike can't take every request worker
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+
+_password_executor: Optional[ThreadPoolExecutor] = None
+_password_executor_lock = threading.Lock()
+
+def _get_password_executor() -> ThreadPoolExecutor:
+    global _password_executor
+    with _password_executor_lock:
+        if _password_executor is None:
+            _password_executor = ThreadPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                thread_name_prefix="PasswordHash"
+            )
+        return _password_executor
+
 # Auth helper functions
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode("utf-8")
 
 def verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
 
+def password_needs_rehash(hashed: str) -> bool:
+    """True if a bcrypt hash ($2b$<cost>$...) wasn't made with BCRYPT_ROUNDS."""
+    try:
+        return int(hashed.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_get_password_executor(), hash_password, password)
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(_get_password_executor(), verify_password, password, hashed)
+
 def create_token(user_id: int, email: str):
     payload = {
         "user_id": user_id,
@@ -136,11 +177,89 @@ def create_token(user_id: int, email: str):
     }
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
+# Verified token cache: token -> (payload, exp). LRU bounded by JWT_CACHE_SIZE;
+# entries are dropped once the token expires, so an expired token is never served.
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "1024"))
+_token_cache: "OrderedDict[str, tuple[dict, float]]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+def decode_token(token: str) -> dict:
+    """
+    jwt.decode() with a cache of already-verified tokens.
+    Raises the same jwt.ExpiredSignatureError / jwt.InvalidTokenError as jwt.decode.
+    """
+    now = time.time()
+    with _token_cache_lock:
+        entry = _token_cache.get(token)
+        if entry is not None:
+            payload, exp = entry
+            if exp > now:
+                _token_cache.move_to_end(token)
+                return payload
+            del _token_cache[token]
+            raise jwt.ExpiredSignatureError("Signature has expired")
+
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    # create_token() always sets exp; anything else is only trusted for a few minutes
+    exp = float(payload.get("exp") or now + 300)
+    with _token_cache_lock:
+        _token_cache[token] = (payload, exp)
+        _token_cache.move_to_end(token)
+        if len(_token_cache) > JWT_CACHE_SIZE:
+            # Expired entries go first, then least recently used
+            for cached_token in [t for t, (_, e) in _token_cache.items() if e <= now]:
+                del _token_cache[cached_token]
+            while len(_token_cache) > JWT_CACHE_SIZE:
+                _token_cache.popitem(last=False)
+    return payload
+
+async def get_current_user_id(request: Request, token: str = Depends(oauth2_scheme)) -> int:
+    """Auth dependency: verified user_id (also stored on request.state.user_id)."""
+    try:
+        payload = decode_token(token)
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token expired")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    request.state.token_payload = payload
+    request.state.user_id = payload["user_id"]
+    return payload["user_id"]
+
+def get_current_user(request: Request, user_id: int = Depends(get_current_user_id)) -> User:
+    """
+    Auth dependency: the authenticated User row, loaded once per request and
+    stored on request.state.user for anything else handling the request.
+    """
+    db_user = getattr(request.state, "user", None)
+    if db_user is None:
+        with get_session() as s:
+            db_user = s.get(User, user_id)
+        if not db_user:
+            raise HTTPException(status_code=404, detail="User not found")
+        request.state.user = db_user
+    return db_user
+
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 
 import os
 
+
+# List endpoints: ?limit=&cursor= keyset pagination and ?fields=a,b projection.
+# The body stays a JSON array; the cursor for the next page is returned in this header.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    return [f.strip() for f in fields.split(",") if f.strip()] or None
+
+
+def _set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
 # API routes are defined below...
 
 
@@ -366,11 +485,13 @@ async def options_register():
     )
 
 @app.post("/api/register", response_model=dict)
-def register(user: UserRegister):
+async def register(user: UserRegister):
     try:
-        user_data = create_user(
-            email=user.email, 
-            password_hash=hash_password(user.password), 
+        password_hash = await hash_password_async(user.password)
+        user_data = await asyncio.to_thread(
+            create_user,
+            email=user.email,
+            password_hash=password_hash,
             name=user.name,
             company_or_school=user.company_or_school,
             role=user.role
@@ -401,44 +522,66 @@ async def options_login():
         }
     )
 
+def _load_login_user(email: str) -> Optional[User]:
+    """User row for login; the session is closed before the password check."""
+    from sqlalchemy import select
+    with get_session() as s:
+        return s.execute(select(User).where(User.email == email)).scalar_one_or_none()
+
+
+async def _rehash_password(user_id: int, password: str) -> None:
+    """Background task: store the password hashed with the current BCRYPT_ROUNDS."""
+    try:
+        new_hash = await hash_password_async(password)
+        await asyncio.to_thread(update_user_password_hash_service, user_id, new_hash)
+    except Exception as e:
+        print(f"Note: Could not rehash password for user {user_id}: {e}")
+
+
+def _ensure_public_profile(user_id: int, name: str, company_or_school: Optional[str], role: Optional[str]) -> None:
+    """
+    Background task: auto-create a public profile for existing users that have a name
+    and (company or role). This migrates existing users to have public profiles by default.
+    """
+    try:
+        # Only create if it doesn't exist (don't overwrite user's choice)
+        existing_profile = None
+        try:
+            existing_profile = get_public_profile_by_user_id_service(user_id)
+        except HTTPException as e:
+            if e.status_code != 404:
+                raise
+        
+        if not existing_profile:
+            create_or_update_public_profile_service(
+                user_id=user_id,
+                display_name=name,
+                school=company_or_school,
+                role=role,
+                visibility=True,  # Public by default
+            )
+    except Exception as pub_error:
+        # Runs after the response; never affects login
+        print(f"Note: Could not auto-create public profile on login: {pub_error}")
+
+
 @app.post("/api/login", response_model=Token)
-def login(user: UserLogin):
+async def login(user: UserLogin, background_tasks: BackgroundTasks):
     try:
-        with get_session() as s:
-            from sqlalchemy import select
-            db_user = s.execute(select(User).where(User.email == user.email)).scalar_one_or_none()
-            if not db_user or not verify_password(user.password, db_user.password_hash):
-                raise HTTPException(status_code=401, detail="Invalid email or password")
-            
-            # Auto-create public profile for existing users if they have name and (company or role)
-            # This migrates existing users to have public profiles by default
-            if db_user.name and (db_user.company_or_school or db_user.role):
-                try:
-                    # Check if public profile exists
-                    existing_profile = None
-                    try:
-                        existing_profile = get_public_profile_by_user_id_service(db_user.user_id)
-                    except HTTPException as e:
-                        if e.status_code == 404:
-                            existing_profile = None
-                        else:
-                            raise
-                    
-                    # Only create if it doesn't exist (don't overwrite user's choice)
-                    if not existing_profile:
-                        create_or_update_public_profile_service(
-                            user_id=db_user.user_id,
-                            display_name=db_user.name,
-                            school=db_user.company_or_school,
-                            role=db_user.role,
-                            visibility=True,  # Public by default
-                        )
-                except Exception as pub_error:
-                    # Don't fail login if public profile creation fails
-                    print(f"Note: Could not auto-create public profile on login: {pub_error}")
-            
-            token = create_token(db_user.user_id, db_user.email)
-            return {"access_token": token, "token_type": "bearer"}
+        db_user = await asyncio.to_thread(_load_login_user, user.email)
+        if not db_user or not await verify_password_async(user.password, db_user.password_hash):
+            raise HTTPException(status_code=401, detail="Invalid email or password")
+        
+        if password_needs_rehash(db_user.password_hash):
+            background_tasks.add_task(_rehash_password, db_user.user_id, user.password)
+        
+        if db_user.name and (db_user.company_or_school or db_user.role):
+            background_tasks.add_task(
+                _ensure_public_profile, db_user.user_id, db_user.name, db_user.company_or_school, db_user.role
+            )
+        
+        token = create_token(db_user.user_id, db_user.email)
+        return {"access_token": token, "token_type": "bearer"}
     except HTTPException:
         # Re-raise HTTP exceptions (like 401)
         raise
@@ -451,55 +594,59 @@ def login(user: UserLogin):
 
 
 @app.get("/api/stats", response_model=dict)
-def get_stats():
-    """Get platform-wide statistics for the landing page."""
-    try:
-        stats = get_platform_stats()
-        return stats
-    except Exception as e:
-        print(f"Stats error: {e}")
-        # Return default stats on error
-        return {
-            "total_users": 0,
-            "total_contacts": 0,
-            "active_users": 0,
-        }
+async def get_stats(response: Response):
+    """
+    Get platform-wide statistics for the landing page.
+    Served from the in-process cache kept up to date by the stats refresher;
+    never queries the database on the request path.
+    """
+    response.headers["Cache-Control"] = f"public, max-age={min(STATS_REFRESH_SECONDS, 300)}"
+    return get_cached_platform_stats()
 
 
 @app.get("/api/me")
-def get_profile(token: str = Depends(oauth2_scheme)):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload["user_id"]
-        
-        # Fetch full user data from database
-        with get_session() as s:
-            from sqlalchemy import select
-            db_user = s.execute(select(User).where(User.user_id == user_id)).scalar_one_or_none()
-            if not db_user:
-                raise HTTPException(status_code=404, detail="User not found")
-            
-            return {
-                "userId": db_user.user_id,
-                "email": db_user.email,
-                "name": db_user.name,
-                "company_or_school": db_user.company_or_school,
-                "role": db_user.role,
-                "experience_level": db_user.experience_level,
-                "onboarding_completed": db_user.onboarding_completed
-            }
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+def get_profile(db_user: User = Depends(get_current_user)):
+    return {
+        "userId": db_user.user_id,
+        "email": db_user.email,
+        "name": db_user.name,
+        "company_or_school": db_user.company_or_school,
+        "role": db_user.role,
+        "experience_level": db_user.experience_level,
+        "onboarding_completed": db_user.onboarding_completed
+    }
+
+
+@app.get("/api/dashboard")
+async def get_dashboard(
+    request: Request,
+    follow_up_days: int = Query(7, ge=0, le=365),
+    meeting_days: int = Query(30, ge=0, le=365),
+    user_id: int = Depends(get_current_user_id)
+):
+    """
+    Everything the dashboard loads (contacts, goals, meetings, interactions, follow-ups)
+    in one response, computed from one database session.
+    Supports conditional requests: a matching If-None-Match returns 304 with no body.
+    """
+    data = await get_dashboard_data_async(user_id, follow_up_days=follow_up_days, meeting_days=meeting_days)
+    body = json.dumps(data, separators=(",", ":"), default=str)
+    etag = '"' + hashlib.sha256(body.encode("utf-8")).hexdigest()[:32] + '"'
+    headers = {
+        "ETag": etag,
+        # Per-user data: browsers may keep it but must revalidate every time
+        "Cache-Control": "private, no-cache",
+    }
+    
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @app.put("/api/me")
-def update_profile(payload: UserUpdate, token: str = Depends(oauth2_scheme)):
+def update_profile(payload: UserUpdate, user_id: int = Depends(get_current_user_id)):
     try:
-        jwt_payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = jwt_payload["user_id"]
-        
         user_data = update_user_service(
             user_id=user_id,
             name=payload.name,
@@ -513,16 +660,6 @@ def update_profile(payload: UserUpdate, token: str = Depends(oauth2_scheme)):
         # Profiles are public by default
         if user_data.get("name") and (user_data.get("company_or_school") or user_data.get("role")):
             try:
-                # Check if public profile exists (may return None or raise 404)
-                existing_profile = None
-                try:
-                    existing_profile = get_public_profile_by_user_id_service(user_id)
-                except HTTPException as e:
-                    if e.status_code == 404:
-                        existing_profile = None  # No profile exists yet
-                    else:
-                        raise  # Re-raise other HTTP exceptions
-                
                 # Create or update public profile (always public by default)
                 create_or_update_public_profile_service(
                     user_id=user_id,
@@ -536,10 +673,6 @@ def update_profile(payload: UserUpdate, token: str = Depends(oauth2_scheme)):
                 print(f"Note: Could not auto-update public profile: {pub_error}")
         
         return user_data
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
     except NotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -555,8 +688,19 @@ def create_contact_endpoint(payload: ContactCreate):
 
 
 @app.get("/users/{user_id}/contacts", response_model=List[dict])
-def list_contacts_endpoint(user_id: int):
-    return list_contacts_for_user(user_id)
+async def list_contacts_endpoint(
+    user_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    try:
+        items, next_cursor = await list_contacts_page_async(user_id, limit=limit, cursor=cursor, fields=_parse_fields(fields))
+    except InvalidQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    _set_next_cursor(response, next_cursor)
+    return items
 
 
 @app.put("/contacts", response_model=dict)
@@ -568,22 +712,15 @@ def update_contact_endpoint(payload: ContactUpdate):
 
 
 @app.put("/contacts/{contact_id}", response_model=dict)
-def update_contact_by_id_endpoint(contact_id: int, payload: ContactUpdatePartial, token: str = Depends(oauth2_scheme)):
+def update_contact_by_id_endpoint(contact_id: int, payload: ContactUpdatePartial, user_id: int = Depends(get_current_user_id)):
     """REST-style endpoint: PUT /contacts/{contact_id}"""
     try:
-        jwt_payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = jwt_payload["user_id"]
-        
         # Merge path parameter and body data
         update_data = payload.dict()
         update_data["contact_id"] = contact_id
         update_data["user_id"] = user_id
         
         return update_contact_service(**update_data)
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
     except NotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -631,8 +768,19 @@ def list_meetings_endpoint(contact_id: int):
 
 
 @app.get("/users/{user_id}/meetings", response_model=List[dict])
-def list_user_meetings_endpoint(user_id: int):
-    return list_meetings_for_user(user_id)
+async def list_user_meetings_endpoint(
+    user_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    try:
+        items, next_cursor = await list_meetings_page_async(user_id, limit=limit, cursor=cursor, fields=_parse_fields(fields))
+    except InvalidQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    _set_next_cursor(response, next_cursor)
+    return items
 
 
 @app.get("/users/{user_id}/meetings/upcoming", response_model=List[dict])
@@ -651,8 +799,8 @@ def get_upcoming_follow_ups_endpoint(user_id: int, days: int = 7):
 
 
 @app.get("/users/{user_id}/goals", response_model=List[dict])
-def list_goals_endpoint(user_id: int):
-    return get_goals_for_user(user_id)
+async def list_goals_endpoint(user_id: int):
+    return await get_goals_for_user_async(user_id)
 
 
 @app.post("/goals", response_model=dict)
@@ -714,8 +862,19 @@ def list_interactions_for_contact_endpoint(contact_id: int, user_id: int):
     return get_interactions_for_contact(contact_id, user_id)
 
 @app.get("/users/{user_id}/interactions", response_model=List[dict])
-def list_interactions_for_user_endpoint(user_id: int):
-    return get_interactions_for_user(user_id)
+async def list_interactions_for_user_endpoint(
+    user_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    try:
+        items, next_cursor = await list_interactions_page_async(user_id, limit=limit, cursor=cursor, fields=_parse_fields(fields))
+    except InvalidQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    _set_next_cursor(response, next_cursor)
+    return items
 
 @app.post("/interactions", response_model=dict)
 def create_interaction_endpoint(payload: InteractionCreate):
@@ -898,12 +1057,9 @@ def migrate_add_user_fields():
 
 # ---------- PUBLIC PROFILES ENDPOINTS ----------
 @app.post("/public-profiles", response_model=dict)
-def create_or_update_public_profile_endpoint(payload: PublicProfileCreate, token: str = Depends(oauth2_scheme)):
+def create_or_update_public_profile_endpoint(payload: PublicProfileCreate, user_id: int = Depends(get_current_user_id)):
     """Create or update a public profile. Requires authentication."""
     try:
-        jwt_payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = jwt_payload["user_id"]
-        
         profile_data = create_or_update_public_profile_service(
             user_id=user_id,
             display_name=payload.display_name,
@@ -915,10 +1071,6 @@ def create_or_update_public_profile_endpoint(payload: PublicProfileCreate, token
             visibility=payload.visibility,
         )
         return profile_data
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create/update public profile: {str(e)}")
 
@@ -1007,22 +1159,15 @@ def debug_public_profiles_endpoint():
 
 
 @app.delete("/public-profiles/{user_id}", response_model=dict)
-def delete_public_profile_endpoint(user_id: int, token: str = Depends(oauth2_scheme)):
+def delete_public_profile_endpoint(user_id: int, authenticated_user_id: int = Depends(get_current_user_id)):
     """Delete/hide a public profile. Users can only delete their own profile."""
     try:
-        jwt_payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        authenticated_user_id = jwt_payload["user_id"]
-        
         # Ensure users can only delete their own profile
         if authenticated_user_id != user_id:
             raise HTTPException(status_code=403, detail="You can only delete your own public profile")
         
         result = delete_public_profile_service(user_id=user_id)
         return result
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
     except HTTPException:
         raise
     except Exception as e:
@@ -1034,13 +1179,10 @@ def delete_public_profile_endpoint(user_id: int, token: str = Depends(oauth2_sch
 def get_recommendations_endpoint(
     threshold: Optional[float] = 0.65,
     use_ml: bool = True,
-    token: str = Depends(oauth2_scheme)
+    user_id: int = Depends(get_current_user_id)
 ):
     """Get personalized connection recommendations for the authenticated user."""
     try:
-        jwt_payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = jwt_payload["user_id"]
-        
         if get_recommendations_for_user is None:
             raise HTTPException(status_code=503, detail="Recommendation service not available")
         recommendations = get_recommendations_for_user(
@@ -1049,10 +1191,6 @@ def get_recommendations_endpoint(
             use_ml=use_ml
         )
         return recommendations
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get recommendations: {str(e)}")
 
@@ -1148,51 +1286,124 @@ def test_database_connection():
         }
 
 
+@app.get("/api/debug/db-pool", response_model=dict)
+def get_db_pool_metrics():
+    """
+    Connection pool metrics per engine (shared sync engine and async engine):
+    pool profile, checkout wait time, overflow use, checkout timeouts and
+    pre-ping failures since process start, plus current checked-out count.
+    """
+    return {
+        "pools": get_pool_metrics(),
+        "timestamp": datetime.datetime.utcnow().isoformat()
+    }
+
+
 # =====================================================
 # Gmail Plugin Integration Endpoints
 # =====================================================
 
+# Response field -> gmail table columns, for ?fields= projection
+GMAIL_CONTACT_FIELDS = {
+    "email": ["email"],
+    "name": ["name"],
+    "last_contact_ts": ["last_contact_ts"],
+    "checklist": ["has_reached_out", "has_contact_responded", "has_scheduled_meeting", "awaiting_reply_from_user"],
+}
+GMAIL_THREAD_FIELDS = {
+    name: [name] for name in (
+        "thread_id", "contact_email", "subject", "is_networking",
+        "first_message_ts", "last_updated_ts", "meeting_scheduled",
+    )
+}
+
+
+def _gmail_select_columns(field_map: Dict[str, List[str]], fields: Optional[List[str]], key_columns: List[str]) -> tuple[List[str], List[str]]:
+    """(response fields, SQL columns) for a gmail list query; sort key columns are always selected."""
+    if fields:
+        unknown = [f for f in fields if f not in field_map]
+        if unknown:
+            raise InvalidQueryError(f"unknown fields: {', '.join(unknown)}")
+        fields = list(dict.fromkeys(fields))
+    else:
+        fields = list(field_map)
+    columns = list(dict.fromkeys([c for f in fields for c in field_map[f]] + key_columns))
+    return fields, columns
+
+
+def _gmail_keyset(ts_column: str, key_column: str, cursor: Optional[str]) -> tuple[str, Dict[str, Any]]:
+    """
+    Keyset condition for ORDER BY <ts_column> DESC NULLS LAST, <key_column> ASC.
+    Returns ("" , {}) without a cursor.
+    """
+    if not cursor:
+        return "", {}
+    ts, key = decode_cursor(cursor, 2)
+    if ts is None:
+        return f" AND {ts_column} IS NULL AND {key_column} > :cursor_key", {"cursor_key": key}
+    return (
+        f" AND ({ts_column} < :cursor_ts OR ({ts_column} = :cursor_ts AND {key_column} > :cursor_key)"
+        f" OR {ts_column} IS NULL)",
+        {"cursor_ts": ts, "cursor_key": key},
+    )
+
+
 @app.get("/api/gmail/contacts", response_model=List[dict])
-def get_gmail_contacts(token: str = Depends(oauth2_scheme)):
-    """Get Gmail contacts for the authenticated user."""
+def get_gmail_contacts(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    user_id: int = Depends(get_current_user_id)
+):
+    """Get Gmail contacts for the authenticated user (most recent first, keyset-paginated)."""
     try:
-        jwt_payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = jwt_payload["user_id"]
+        fields, columns = _gmail_select_columns(
+            GMAIL_CONTACT_FIELDS, _parse_fields(fields), ["last_contact_ts", "email"]
+        )
+        keyset_sql, params = _gmail_keyset("last_contact_ts", "email", cursor)
+        if cursor and not limit:
+            limit = MAX_PAGE_SIZE
+        limit_sql = " LIMIT :limit" if limit else ""
         
         with get_session() as session:
             # Query gmail_contacts table
             result = session.execute(
-                text("""
-                    SELECT email, name, last_contact_ts,
-                           has_reached_out, has_contact_responded, 
-                           has_scheduled_meeting, awaiting_reply_from_user
+                text(f"""
+                    SELECT {", ".join(columns)}
                     FROM gmail_contacts
-                    WHERE user_id = :user_id
-                    ORDER BY last_contact_ts DESC
+                    WHERE user_id = :user_id{keyset_sql}
+                    ORDER BY last_contact_ts DESC NULLS LAST, email ASC{limit_sql}
                 """),
-                {"user_id": user_id}
+                {"user_id": user_id, "limit": (limit or 0) + 1, **params}
             )
-            rows = result.fetchall()
-            
-            contacts = []
-            for row in rows:
-                contacts.append({
-                    "email": row[0],
-                    "name": row[1],
-                    "last_contact_ts": row[2],
-                    "checklist": {
-                        "has_reached_out": row[3],
-                        "has_contact_responded": row[4],
-                        "has_scheduled_meeting": row[5],
-                        "awaiting_reply_from_user": row[6]
-                    }
-                })
-            
-            return contacts
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+            rows = [dict(row._mapping) for row in result.fetchall()]
+        
+        next_cursor = None
+        if limit and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1]["last_contact_ts"], rows[-1]["email"]])
+        _set_next_cursor(response, next_cursor)
+        
+        contacts = []
+        for row in rows:
+            contact = {
+                "email": row["email"],
+                "name": row.get("name"),
+                "last_contact_ts": row["last_contact_ts"],
+            }
+            if "checklist" in fields:
+                contact["checklist"] = {
+                    "has_reached_out": row["has_reached_out"],
+                    "has_contact_responded": row["has_contact_responded"],
+                    "has_scheduled_meeting": row["has_scheduled_meeting"],
+                    "awaiting_reply_from_user": row["awaiting_reply_from_user"]
+                }
+            contacts.append({f: contact[f] for f in fields})
+        
+        return contacts
+    except InvalidQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error fetching Gmail contacts: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get Gmail contacts: {str(e)}")
@@ -1200,70 +1411,60 @@ def get_gmail_contacts(token: str = Depends(oauth2_scheme)):
 
 @app.get("/api/gmail/threads", response_model=List[dict])
 def get_gmail_threads(
+    response: Response,
     contact_email: Optional[str] = None,
-    token: str = Depends(oauth2_scheme)
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    user_id: int = Depends(get_current_user_id)
 ):
     """Get Gmail threads for the authenticated user, optionally filtered by contact email."""
     try:
-        jwt_payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = jwt_payload["user_id"]
+        fields, columns = _gmail_select_columns(
+            GMAIL_THREAD_FIELDS, _parse_fields(fields), ["last_updated_ts", "thread_id"]
+        )
+        keyset_sql, params = _gmail_keyset("last_updated_ts", "thread_id", cursor)
+        if cursor and not limit:
+            limit = MAX_PAGE_SIZE
+        limit_sql = " LIMIT :limit" if limit else ""
+        params.update({"user_id": user_id, "limit": (limit or 0) + 1})
+        
+        contact_sql = ""
+        if contact_email:
+            # Use case-insensitive matching for email
+            contact_sql = " AND LOWER(contact_email) = LOWER(:contact_email)"
+            params["contact_email"] = contact_email
         
         with get_session() as session:
-            if contact_email:
-                # Use case-insensitive matching for email
-                result = session.execute(
-                    text("""
-                        SELECT thread_id, contact_email, subject, is_networking,
-                               first_message_ts, last_updated_ts, meeting_scheduled
-                        FROM gmail_threads
-                        WHERE user_id = :user_id AND LOWER(contact_email) = LOWER(:contact_email)
-                        ORDER BY last_updated_ts DESC NULLS LAST
-                    """),
-                    {"user_id": user_id, "contact_email": contact_email}
-                )
-            else:
-                result = session.execute(
-                    text("""
-                        SELECT thread_id, contact_email, subject, is_networking,
-                               first_message_ts, last_updated_ts, meeting_scheduled
-                        FROM gmail_threads
-                        WHERE user_id = :user_id
-                        ORDER BY last_updated_ts DESC NULLS LAST
-                    """),
-                    {"user_id": user_id}
-                )
-            
-            rows = result.fetchall()
-            
-            threads = []
-            for row in rows:
-                threads.append({
-                    "thread_id": row[0],
-                    "contact_email": row[1],
-                    "subject": row[2],
-                    "is_networking": row[3],
-                    "first_message_ts": row[4],
-                    "last_updated_ts": row[5],
-                    "meeting_scheduled": row[6]
-                })
-            
-            return threads
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+            result = session.execute(
+                text(f"""
+                    SELECT {", ".join(columns)}
+                    FROM gmail_threads
+                    WHERE user_id = :user_id{contact_sql}{keyset_sql}
+                    ORDER BY last_updated_ts DESC NULLS LAST, thread_id ASC{limit_sql}
+                """),
+                params
+            )
+            rows = [dict(row._mapping) for row in result.fetchall()]
+        
+        next_cursor = None
+        if limit and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1]["last_updated_ts"], rows[-1]["thread_id"]])
+        _set_next_cursor(response, next_cursor)
+        
+        return [{f: row[f] for f in fields} for row in rows]
+    except InvalidQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error fetching Gmail threads: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get Gmail threads: {str(e)}")
 
 
 @app.get("/api/gmail/threads/{thread_id}/messages", response_model=List[dict])
-def get_gmail_thread_messages(thread_id: str, token: str = Depends(oauth2_scheme)):
+def get_gmail_thread_messages(thread_id: str, user_id: int = Depends(get_current_user_id)):
     """Get all messages in a Gmail thread."""
     try:
-        jwt_payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = jwt_payload["user_id"]
-        
         with get_session() as session:
             result = session.execute(
                 text("""
@@ -1289,22 +1490,15 @@ def get_gmail_thread_messages(thread_id: str, token: str = Depends(oauth2_scheme
                 })
             
             return messages
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
     except Exception as e:
         print(f"Error fetching Gmail messages: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get Gmail messages: {str(e)}")
 
 
 @app.get("/api/gmail/sync-status", response_model=dict)
-def get_gmail_sync_status(token: str = Depends(oauth2_scheme)):
+def get_gmail_sync_status(user_id: int = Depends(get_current_user_id)):
     """Check if user has Gmail data synced and OAuth connection status."""
     try:
-        jwt_payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = jwt_payload["user_id"]
-        
         # Get OAuth connection status
         oauth_status = {}
         if get_gmail_oauth_status:
@@ -1341,10 +1535,6 @@ def get_gmail_sync_status(token: str = Depends(oauth2_scheme)):
                 "connected_at": oauth_status.get("connected_at"),
                 "auto_sync_enabled": oauth_status.get("auto_sync_enabled", True)
             }
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
     except Exception as e:
         print(f"Error checking Gmail sync status: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to check Gmail sync status: {str(e)}")
@@ -1355,22 +1545,15 @@ def get_gmail_sync_status(token: str = Depends(oauth2_scheme)):
 # =====================================================
 
 @app.get("/api/gmail/oauth/authorize")
-def gmail_oauth_authorize(token: str = Depends(oauth2_scheme)):
+def gmail_oauth_authorize(user_id: int = Depends(get_current_user_id)):
     """Get OAuth authorization URL for Gmail integration."""
     try:
-        jwt_payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = jwt_payload["user_id"]
-        
         if not get_authorization_url:
             raise HTTPException(status_code=503, detail="Gmail sync service not available")
         
         auth_url = get_authorization_url(user_id)
         return {"authorization_url": auth_url}
     
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
     except Exception as e:
         print(f"Error generating OAuth URL: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate OAuth URL: {str(e)}")
@@ -1413,22 +1596,15 @@ def gmail_oauth_callback(code: str, state: str):
 
 
 @app.post("/api/gmail/sync")
-def trigger_gmail_sync(token: str = Depends(oauth2_scheme)):
+def trigger_gmail_sync(user_id: int = Depends(get_current_user_id)):
     """Trigger manual Gmail sync for the authenticated user (on-demand)."""
     try:
-        jwt_payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = jwt_payload["user_id"]
-        
         if not sync_gmail_for_user:
             raise HTTPException(status_code=503, detail="Gmail sync service not available")
         
         result = sync_gmail_for_user(user_id)
         return result
     
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
     except ValueError as e:
         # No credentials found
         raise HTTPException(status_code=400, detail=str(e))
@@ -1438,12 +1614,9 @@ def trigger_gmail_sync(token: str = Depends(oauth2_scheme)):
 
 
 @app.put("/api/gmail/auto-sync")
-def set_gmail_auto_sync(payload: dict, token: str = Depends(oauth2_scheme)):
+def set_gmail_auto_sync(payload: dict, user_id: int = Depends(get_current_user_id)):
     """Enable or disable automatic Gmail sync for the authenticated user."""
     try:
-        jwt_payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = jwt_payload["user_id"]
-        
         enabled = payload.get("enabled", True)
         
         if not set_auto_sync_enabled:
@@ -1454,10 +1627,6 @@ def set_gmail_auto_sync(payload: dict, token: str = Depends(oauth2_scheme)):
             raise HTTPException(status_code=500, detail=result.get("error", "Failed to update auto-sync setting"))
         
         return {"status": "success", "auto_sync_enabled": result.get("auto_sync_enabled", enabled)}
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
     except Exception as e:
         print(f"Error setting Gmail auto-sync: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to set auto-sync: {str(e)}")
@@ -1530,6 +1699,7 @@ def root(code: Optional[str] = None, state: Optional[str] = None):
 @app.on_event("startup")
 async def startup_event():
     """Start background services on application startup."""
+    start_stats_refresher()
     if start_background_sync:
         try:
             start_background_sync()
@@ -1540,9 +1710,14 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Stop background services on application shutdown."""
+    stop_stats_refresher()
     if stop_background_sync:
         try:
             stop_background_sync()
         except Exception as e:
             print(f"Warning: Failed to stop background Gmail sync: {e}")
+    if async_engine is not None:
+        await async_engine.dispose()
+    if _password_executor is not None:
+        _password_executor.shutdown(wait=False)
 
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the per-user query indexes.
+Index definitions live on the models (__table_args__); this script creates any
+that are missing. Safe to run repeatedly.
+
+    python migrate_add_query_indexes.py           # create missing indexes
+    python migrate_add_query_indexes.py --check   # fail if a hot query plans a full table scan
+
+tests/test_query_plans.py runs the same guard against the real queries in
+models/database_functions.py.
+
+The --check mode runs EXPLAIN on the hot per-user queries and exits non-zero if
+any of them falls back to a sequential scan, so it can run after deploys / in CI.
+"""
+import os
+import sys
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dotenv import load_dotenv
+
+# Load environment variables before importing models (they read DATABASE_URL)
+env_path = Path(__file__).parent / '.env'
+load_dotenv(dotenv_path=env_path)
+
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+
+from models.database_functions import Base, engine, DATABASE_URL
+from services.gmail_db import Base as GmailBase
+
+IS_POSTGRES = "postgresql" in DATABASE_URL.lower()
+
+# Hot per-user query shapes (table, query). Parameters are bound to dummy values;
+# only the plan matters.
+HOT_QUERIES = [
+    ("contacts", "SELECT * FROM contacts WHERE user_id = :user_id ORDER BY contact_id"),
+    ("contacts", "SELECT * FROM contacts WHERE user_id = :user_id AND date_next_follow_up >= :day AND date_next_follow_up <= :day"),
+    ("contacts", "SELECT contact_id FROM contacts WHERE user_id = :user_id AND lower(email) IN (:email)"),
+    ("meetings", "SELECT * FROM meetings WHERE user_id = :user_id AND meeting_date >= :day AND meeting_date <= :day ORDER BY meeting_date, start_time"),
+    ("meetings", "SELECT * FROM meetings WHERE user_id = :user_id AND meeting_date = :day ORDER BY start_time"),
+    ("interactions", "SELECT * FROM interactions WHERE user_id = :user_id ORDER BY interaction_date DESC, date_created DESC"),
+    ("interactions", "SELECT * FROM interactions WHERE contact_id = :contact_id AND user_id = :user_id ORDER BY interaction_date DESC, date_created DESC"),
+    ("interactions", "SELECT * FROM interactions WHERE user_id = :user_id AND follow_up_required = true AND follow_up_date < :day"),
+    ("goals", "SELECT * FROM goals WHERE user_id = :user_id ORDER BY date_created DESC"),
+    ("goal_steps", "SELECT * FROM goal_steps WHERE goal_id = :goal_id ORDER BY order_index"),
+    ("gmail_contacts", "SELECT * FROM gmail_contacts WHERE user_id = :user_id ORDER BY last_contact_ts DESC"),
+    ("gmail_threads", "SELECT * FROM gmail_threads WHERE user_id = :user_id ORDER BY last_updated_ts DESC"),
+    ("gmail_threads", "SELECT * FROM gmail_threads WHERE user_id = :user_id AND contact_email = :email ORDER BY last_updated_ts DESC"),
+    ("gmail_messages", "SELECT * FROM gmail_messages WHERE user_id = :user_id AND contact_email IN (:email)"),
+    ("gmail_messages", "SELECT * FROM gmail_messages WHERE user_id = :user_id AND thread_id = :thread_id ORDER BY timestamp ASC"),
+]
+# Indexes replaced by a model-declared one; dropped by migrate()
+OBSOLETE_INDEXES = [
+    ("interactions", "ix_interactions_user_id_contact_id"),  # -> ix_interactions_user_id_contact_date
+]
+QUERY_PARAMS = {
+    "user_id": 1, "contact_id": 1, "goal_id": 1,
+    "day": "2024-01-01", "email": "someone@example.com", "thread_id": "t",
+}
+
+
+def _all_indexes():
+    for metadata in (Base.metadata, GmailBase.metadata):
+        for table in metadata.sorted_tables:
+            for index in sorted(table.indexes, key=lambda i: i.name):
+                yield table, index
+
+
+def migrate():
+    """Create every model-declared index that doesn't exist yet."""
+    created = 0
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction block
+    conn_opts = {"isolation_level": "AUTOCOMMIT"} if IS_POSTGRES else {}
+    with engine.connect().execution_options(**conn_opts) as conn:
+        for table, index in _all_indexes():
+            if not engine.dialect.has_table(conn, table.name):
+                print(f"⚠️  Table {table.name} does not exist - skipping {index.name}")
+                continue
+            ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=engine.dialect))
+            if IS_POSTGRES:
+                # Don't block writes on the live tables while building
+                ddl = ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)
+            print(f"➕ {ddl}")
+            conn.execute(text(ddl))
+            if not IS_POSTGRES:
+                conn.commit()
+            created += 1
+        for table_name, index_name in OBSOLETE_INDEXES:
+            if not engine.dialect.has_table(conn, table_name):
+                continue
+            ddl = f"DROP INDEX {'CONCURRENTLY ' if IS_POSTGRES else ''}IF EXISTS {index_name}"
+            print(f"➖ {ddl}")
+            conn.execute(text(ddl))
+            if not IS_POSTGRES:
+                conn.commit()
+    print(f"✅ Ensured {created} indexes")
+
+
+def _plan_uses_seq_scan(conn, table: str, query: str) -> tuple[bool, str]:
+    if IS_POSTGRES:
+        rows = conn.execute(text(f"EXPLAIN {query}"), QUERY_PARAMS).fetchall()
+        plan = "\n".join(r[0] for r in rows)
+        return f"Seq Scan on {table}" in plan, plan
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {query}"), QUERY_PARAMS).fetchall()
+    plan = "\n".join(str(r[-1]) for r in rows)
+    # SQLite reports full scans as "SCAN <table>" (no "USING ... INDEX")
+    full_scan = any(
+        line.strip().startswith(f"SCAN {table}") and "INDEX" not in line
+        for line in plan.splitlines()
+    )
+    return full_scan, plan
+
+
+def check_query_plans() -> bool:
+    """EXPLAIN every hot query; returns False if any of them plans a full table scan."""
+    failures = 0
+    with engine.connect() as conn:
+        if IS_POSTGRES:
+            # Small tables make a seq scan the cheapest plan; this checks an index is *usable*
+            conn.execute(text("SET enable_seqscan = off"))
+        for table, query in HOT_QUERIES:
+            seq_scan, plan = _plan_uses_seq_scan(conn, table, query)
+            if seq_scan:
+                failures += 1
+                print(f"❌ Sequential scan on {table}:\n   {query}\n   {plan}")
+            else:
+                print(f"✅ {query}")
+        conn.rollback()
+    if failures:
+        print(f"\n❌ {failures} hot queries fall back to a sequential scan")
+    return failures == 0
+
+
+if __name__ == "__main__":
+    try:
+        if "--check" in sys.argv:
+            sys.exit(0 if check_query_plans() else 1)
+        migrate()
+        print("\n✅ Migration completed successfully!")
+    except Exception as e:
+        print(f"\n❌ Migration failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,115 @@
+# async_database.py
+# ---------------------------------------------------------------------
+# Async data access for the hot read endpoints (dashboard, list views).
+# Runs alongside the sync helpers in database_functions: same models,
+# same query builders, but on an async engine so requests awaiting the
+# database don't hold a threadpool worker.
+#
+# Drivers: asyncpg (PostgreSQL / Supabase) or aiosqlite (local SQLite).
+# If the driver isn't installed ASYNC_DB_AVAILABLE is False and callers
+# fall back to the sync helpers in a worker thread.
+# ---------------------------------------------------------------------
+from __future__ import annotations
+
+import os
+import ssl
+from typing import Any, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from models.database_functions import (
+    DATABASE_URL,
+    connect_args,
+    page_query,
+    page_result,
+    dashboard_queries,
+    goals_query,
+    Goal,
+)
+from models.engine_factory import create_db_engine, is_pooler_url
+
+ASYNC_DB_AVAILABLE = False
+async_engine = None
+AsyncSessionLocal: Optional[async_sessionmaker[AsyncSession]] = None
+
+
+def _async_url(url: str) -> str:
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+asyncpg://", 1)
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+
+def _async_connect_args() -> dict[str, Any]:
+    """asyncpg equivalents of the psycopg2 connect_args in database_functions."""
+    args: dict[str, Any] = {
+        # Same 30s statement timeout the sync engine sets on connect
+        "server_settings": {"statement_timeout": "30000"},
+        "timeout": 30,
+    }
+    if is_pooler_url(DATABASE_URL):
+        # pgbouncer transaction mode doesn't support prepared statement caching
+        args["statement_cache_size"] = 0
+    if connect_args.get("sslrootcert"):
+        args["ssl"] = ssl.create_default_context(cafile=connect_args["sslrootcert"])
+    elif connect_args.get("sslmode"):
+        args["ssl"] = connect_args["sslmode"]
+    return args
+
+
+# Same pool profile as the sync engine (engine_factory.py); ASYNC_DB_POOL_SIZE /
+# ASYNC_DB_MAX_OVERFLOW size this pool separately from the sync one
+_pool_overrides: dict[str, int] = {}
+if os.getenv("ASYNC_DB_POOL_SIZE"):
+    _pool_overrides["pool_size"] = int(os.environ["ASYNC_DB_POOL_SIZE"])
+if os.getenv("ASYNC_DB_MAX_OVERFLOW"):
+    _pool_overrides["max_overflow"] = int(os.environ["ASYNC_DB_MAX_OVERFLOW"])
+
+try:
+    async_engine = create_db_engine(
+        _async_url(DATABASE_URL),
+        name="async",
+        is_async=True,
+        overrides=_pool_overrides,
+        connect_args=_async_connect_args() if DATABASE_URL.lower().startswith("postgres") else None,
+    )
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+    ASYNC_DB_AVAILABLE = True
+    print("✅ Async database engine configured")
+except ImportError as e:
+    # asyncpg / aiosqlite not installed
+    print(f"Warning: async database engine not available ({e}) - using sync engine in threadpool")
+
+
+async def list_page_async(
+    model,
+    *,
+    where: list,
+    order_by: list[tuple[str, bool]],
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[list[str]] = None,
+) -> tuple[list[Any], Optional[str]]:
+    """Async version of database_functions.list_page()."""
+    stmt, limit = page_query(model, where=where, order_by=order_by, limit=limit, cursor=cursor, fields=fields)
+    async with AsyncSessionLocal() as s:
+        result = await s.execute(stmt)
+        return page_result(result, order_by=order_by, limit=limit, fields=fields)
+
+
+async def load_dashboard_async(user_id: int) -> dict[str, list]:
+    """Async version of database_functions.load_dashboard() (one session, 5 queries)."""
+    async with AsyncSessionLocal() as s:
+        return {
+            name: list((await s.execute(stmt)).scalars().all())
+            for name, stmt in dashboard_queries(user_id).items()
+        }
+
+
+async def list_goals_for_user_async(user_id: int) -> list[Goal]:
+    """Async version of database_functions.list_goals_for_user() (steps eager-loaded)."""
+    async with AsyncSessionLocal() as s:
+        return list((await s.execute(goals_query(user_id))).scalars().all())
@@ -3,18 +3,22 @@ from __future__ import annotations
 
 from datetime import datetime, date, time, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
+import base64
+import json
 import os
 
 from sqlalchemy import (
-    create_engine, String, Integer, DateTime, Date, Time,
-    Text, Boolean, ForeignKey, event, select, func, text
+    String, Integer, DateTime, Date, Time,
+    Text, Boolean, ForeignKey, Index, event, select, func, text, and_, or_
 )
 from sqlalchemy.orm import (
     DeclarativeBase, Mapped, mapped_column, relationship,
-    sessionmaker, Session
+    sessionmaker, Session, selectinload
 )
 
+from models.engine_factory import create_db_engine, select_pool_profile, pool_options
+
 # ----- Base -----
 class Base(DeclarativeBase):
     pass
@@ -45,6 +49,11 @@ class User(Base):
 
 class Contact(Base):
     __tablename__ = "contacts"
+    __table_args__ = (
+        Index("ix_contacts_user_id_contact_id", "user_id", "contact_id"),  # per-user listing / pagination
+        Index("ix_contacts_user_id_follow_up", "user_id", "date_next_follow_up"),  # upcoming follow-ups
+        Index("ix_contacts_user_id_email_lower", "user_id", func.lower(text("email"))),  # Gmail reconciliation
+    )
 
     contact_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
@@ -74,6 +83,10 @@ class Contact(Base):
 
 class Meeting(Base):
     __tablename__ = "meetings"
+    __table_args__ = (
+        Index("ix_meetings_user_id_date", "user_id", "meeting_date", "start_time"),  # upcoming / by-date
+        Index("ix_meetings_contact_id", "contact_id"),
+    )
 
     meeting_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
@@ -94,6 +107,9 @@ class Meeting(Base):
 
 class Goal(Base):
     __tablename__ = "goals"
+    __table_args__ = (
+        Index("ix_goals_user_id_date_created", "user_id", "date_created"),
+    )
 
     goal_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
@@ -108,11 +124,16 @@ class Goal(Base):
 
     # relationships
     user: Mapped["User"] = relationship(back_populates="goals")
-    steps: Mapped[list["GoalStep"]] = relationship(back_populates="goal", cascade="all, delete-orphan")
+    steps: Mapped[list["GoalStep"]] = relationship(
+        back_populates="goal", cascade="all, delete-orphan", order_by="GoalStep.order_index"
+    )
 
 
 class GoalStep(Base):
     __tablename__ = "goal_steps"
+    __table_args__ = (
+        Index("ix_goal_steps_goal_id_order", "goal_id", "order_index"),
+    )
 
     step_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     goal_id: Mapped[int] = mapped_column(ForeignKey("goals.goal_id", ondelete="CASCADE"), nullable=False)
@@ -128,6 +149,11 @@ class GoalStep(Base):
 
 class Interaction(Base):
     __tablename__ = "interactions"
+    __table_args__ = (
+        Index("ix_interactions_user_id_date", "user_id", "interaction_date", "date_created"),  # timeline
+        Index("ix_interactions_user_id_contact_date", "user_id", "contact_id", "interaction_date", "date_created"),  # per-contact timeline
+        Index("ix_interactions_user_id_follow_up", "user_id", "follow_up_required", "follow_up_date"),
+    )
 
     interaction_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
@@ -313,25 +339,26 @@ if "supabase" in DATABASE_URL.lower():
     connect_args_final["keepalives_interval"] = 10
     connect_args_final["keepalives_count"] = 5
 
-engine = create_engine(
-    DATABASE_URL, 
-    echo=False, 
+# Pool size / recycle / pre-ping come from the configured pool profile
+# (DB_POOL_PROFILE: free_tier, pooler or dedicated - see engine_factory.py).
+# This engine is shared with the Gmail plugin (services/gmail_db.py).
+engine = create_db_engine(
+    DATABASE_URL,
+    name="main",
     future=True,
-    pool_pre_ping=True,  # Verify connections before using them (checks if connection is alive)
-    pool_recycle=180,    # Recycle connections after 3 minutes (shorter for Supabase free tier)
-    pool_size=2,         # Very small pool for free tier (max 60 direct connections)
-    max_overflow=3,      # Minimal overflow for free tier limits
     connect_args=connect_args_final,
     pool_reset_on_return='commit',  # Reset connections properly
-    pool_timeout=20      # Wait up to 20 seconds for a connection from pool
 )
+_pool_profile = select_pool_profile(DATABASE_URL)
+_pool_options = pool_options(_pool_profile)
 print(f"✅ Database engine configured")
 if "supabase" in DATABASE_URL.lower():
     print(f"   Target: Supabase PostgreSQL")
-    print(f"   Pool size: 2 (free tier optimized)")
-    print(f"   Connection recycle: 180 seconds")
+    print(f"   Pool profile: {_pool_profile} (size {_pool_options['pool_size']} + overflow {_pool_options['max_overflow']})")
+    print(f"   Connection recycle: {_pool_options['pool_recycle']} seconds")
     print(f"   Note: Connection will be established on first database operation")
-    print(f"   💡 Tip: If connection fails, try using Supabase connection pooler URL")
+    if _pool_profile != "pooler":
+        print(f"   💡 Tip: If connection fails, try using Supabase connection pooler URL")
 elif "postgresql" in DATABASE_URL.lower():
     print(f"   Target: PostgreSQL")
     print(f"   Note: Connection will be established on first database operation")
@@ -508,6 +535,7 @@ SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False
 # --- Optional: simple app-level errors ---
 class AlreadyExistsError(Exception): ...
 class NotFoundError(Exception): ...
+class InvalidQueryError(Exception): ...  # bad cursor / unknown fields on list endpoints
 
 
 # --- Session helper (context-managed) ---
@@ -538,6 +566,138 @@ class get_session:
                     pass
 
 
+# ---------- PAGINATION ----------
+# Keyset pagination: a page ends at the sort key of its last row; the next page
+# selects rows strictly after it. Cursors are opaque base64 JSON of those values.
+MAX_PAGE_SIZE = 500
+
+_CURSOR_TYPES = {"d": date.fromisoformat, "t": time.fromisoformat, "dt": datetime.fromisoformat}
+
+
+def encode_cursor(values: list[Any]) -> str:
+    encoded = []
+    for v in values:
+        if isinstance(v, datetime):
+            encoded.append({"dt": v.isoformat()})
+        elif isinstance(v, date):
+            encoded.append({"d": v.isoformat()})
+        elif isinstance(v, time):
+            encoded.append({"t": v.isoformat()})
+        else:
+            encoded.append(v)
+    return base64.urlsafe_b64encode(json.dumps(encoded).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, size: int) -> list[Any]:
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        values = []
+        for v in raw:
+            if isinstance(v, dict):
+                (tag, iso), = v.items()
+                v = _CURSOR_TYPES[tag](iso)
+            values.append(v)
+    except Exception:
+        raise InvalidQueryError("invalid cursor")
+    if len(values) != size:
+        raise InvalidQueryError("invalid cursor")
+    return values
+
+
+def _keyset_after(keys: list[tuple[Any, bool, bool]], values: list[Any]):
+    """
+    WHERE clause selecting rows after `values` in ORDER BY `keys` (column, descending, nullable).
+    Nullable columns sort NULLS LAST in both directions.
+    """
+    (column, descending, nullable), value = keys[0], values[0]
+    if value is None:
+        after, same = None, column.is_(None)
+    else:
+        after = column < value if descending else column > value
+        if nullable:
+            after = or_(after, column.is_(None))
+        same = column == value
+    if len(keys) == 1:
+        return after if after is not None else False
+    rest = and_(same, _keyset_after(keys[1:], values[1:]))
+    return or_(after, rest) if after is not None else rest
+
+
+def page_query(
+    model,
+    *,
+    where: list,
+    order_by: list[tuple[str, bool]],
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[list[str]] = None,
+):
+    """SELECT for one page (see list_page). Returns (statement, effective limit)."""
+    keys = [
+        (getattr(model, name), descending, model.__table__.c[name].nullable)
+        for name, descending in order_by
+    ]
+    if fields:
+        # Sort key columns are selected too (for the cursor) but not returned
+        key_names = [name for name, _ in order_by if name not in fields]
+        stmt = select(*[getattr(model, f) for f in fields + key_names])
+    else:
+        stmt = select(model)
+    ordering = []
+    for col, descending, nullable in keys:
+        clause = col.desc() if descending else col.asc()
+        ordering.append(clause.nulls_last() if nullable else clause)
+    stmt = stmt.where(*where).order_by(*ordering)
+    if cursor:
+        stmt = stmt.where(_keyset_after(keys, decode_cursor(cursor, len(keys))))
+        limit = limit or MAX_PAGE_SIZE
+    if limit:
+        stmt = stmt.limit(limit + 1)
+    return stmt, limit
+
+
+def page_result(
+    result,
+    *,
+    order_by: list[tuple[str, bool]],
+    limit: Optional[int],
+    fields: Optional[list[str]],
+) -> tuple[list[Any], Optional[str]]:
+    """(rows, next_cursor) from the executed page_query() result."""
+    rows = [dict(r._mapping) for r in result] if fields else list(result.scalars())
+
+    next_cursor = None
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        get = last.get if fields else lambda name: getattr(last, name)
+        next_cursor = encode_cursor([get(name) for name, _ in order_by])
+    if fields:
+        rows = [{f: r[f] for f in fields} for r in rows]
+    return rows, next_cursor
+
+
+def list_page(
+    model,
+    *,
+    where: list,
+    order_by: list[tuple[str, bool]],
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[list[str]] = None,
+) -> tuple[list[Any], Optional[str]]:
+    """
+    One page of `model` rows matching `where`, in `order_by` order ([(attribute, descending)],
+    ending with a unique column). Returns (rows, next_cursor); next_cursor is None on the last page.
+
+    Without `fields` rows are ORM objects; with `fields` only those columns are selected and
+    rows are dicts. Without `limit` and `cursor` every row is returned.
+    """
+    stmt, limit = page_query(model, where=where, order_by=order_by, limit=limit, cursor=cursor, fields=fields)
+    with get_session() as s:
+        return page_result(s.execute(stmt), order_by=order_by, limit=limit, fields=fields)
+
+
 # ---------- USERS ----------
 def add_user(*, email: str, password_hash: str, name: str, company_or_school: Optional[str] = None, role: Optional[str] = None, experience_level: Optional[str] = None) -> User:
     """Create a new user if email not taken. Returns the persisted User."""
@@ -576,6 +736,15 @@ def update_user(*, user_id: int, name: Optional[str] = None, company_or_school:
         return user
 
 
+def update_user_password_hash(*, user_id: int, password_hash: str) -> None:
+    """Replace a user's stored password hash (e.g. rehash with a new bcrypt cost)."""
+    with get_session() as s:
+        user = s.get(User, user_id)
+        if not user:
+            raise NotFoundError(f"user with id {user_id} not found")
+        user.password_hash = password_hash
+
+
 # ---------- CONTACTS ----------
 def add_contact(
     *,
@@ -850,12 +1019,20 @@ def add_goal(
         return goal
 
 
+def goals_query(user_id: int):
+    """A user's goals, newest first, with steps eager-loaded (one extra IN query)."""
+    return (
+        select(Goal)
+        .where(Goal.user_id == user_id)
+        .order_by(Goal.date_created.desc())
+        .options(selectinload(Goal.steps))
+    )
+
+
 def list_goals_for_user(user_id: int) -> list[Goal]:
-    """List all goals for a given user_id."""
+    """List all goals for a given user_id, with their steps (2 queries: goals, then all steps via IN)."""
     with get_session() as s:
-        results = s.execute(
-            select(Goal).where(Goal.user_id == user_id).order_by(Goal.date_created.desc())
-        ).scalars().all()
+        results = s.execute(goals_query(user_id)).scalars().all()
         return list(results)
 
 
@@ -1150,6 +1327,34 @@ def get_upcoming_interaction_follow_ups(user_id: int, days_ahead: int = 7) -> li
         return list(results)
 
 
+# ---------- DASHBOARD ----------
+def dashboard_queries(user_id: int) -> dict[str, Any]:
+    """The dashboard's SELECTs (see load_dashboard), keyed by payload section."""
+    return {
+        "contacts": select(Contact).where(Contact.user_id == user_id).order_by(Contact.contact_id),
+        "meetings": select(Meeting).where(Meeting.user_id == user_id).order_by(Meeting.meeting_id),
+        "interactions": (
+            select(Interaction)
+            .where(Interaction.user_id == user_id)
+            .order_by(Interaction.interaction_date.desc(), Interaction.date_created.desc())
+        ),
+        "goals": goals_query(user_id),
+    }
+
+
+def load_dashboard(user_id: int) -> dict[str, list]:
+    """
+    Everything the dashboard shows, from one session: contacts, meetings, interactions
+    and goals (steps eager-loaded) - 5 queries on one pooled connection.
+    Date-window views (follow-ups, upcoming meetings) are derived from these lists.
+    """
+    with get_session() as s:
+        return {
+            name: list(s.execute(stmt).scalars().all())
+            for name, stmt in dashboard_queries(user_id).items()
+        }
+
+
 # ---------- Convenience variants ----------
 def add_contact_for_user_email(*, user_email: str, name: str, **kwargs) -> Contact:
     """Find user by email, then add the contact."""
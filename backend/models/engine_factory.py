@@ -0,0 +1,219 @@
+# engine_factory.py
+# ---------------------------------------------------------------------
+# Shared SQLAlchemy engine factory with named connection pool profiles
+# and pool metrics.
+#
+# Profiles (DB_POOL_PROFILE):
+#   free_tier  - Supabase free tier, direct connection (max 60 connections)
+#   pooler     - Supabase connection pooler / pgbouncer transaction mode
+#                (the pooler multiplexes server connections, so a larger
+#                client pool is cheap)
+#   dedicated  - dedicated / paid Postgres instance
+# If DB_POOL_PROFILE isn't set the profile is picked from DATABASE_URL:
+# pooler URLs (pooler.supabase.com or port 6543) get "pooler", everything
+# else "free_tier". DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_RECYCLE /
+# DB_POOL_TIMEOUT override individual profile values.
+#
+# Each worker process opens two pools from the same profile: the sync engine
+# (models/database_functions.py) and the async engine (models/async_database.py).
+# Peak connections per worker = 2 * (pool_size + max_overflow), i.e. 10 on
+# free_tier; the default single uvicorn worker uses 10 of the 60 direct
+# connections, and up to 5 workers (50) stay under the limit.
+#
+# Every engine built here uses a metered QueuePool that records checkout
+# wait time, overflow use, checkout timeouts and pre-ping failures; see
+# get_pool_metrics().
+# ---------------------------------------------------------------------
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Optional
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+POOL_PROFILES: dict[str, dict[str, Any]] = {
+    "free_tier": {
+        "pool_size": 2,
+        "max_overflow": 3,
+        "pool_recycle": 180,   # Supabase drops idle direct connections aggressively
+        "pool_timeout": 20,
+        "pool_pre_ping": True,
+    },
+    "pooler": {
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_recycle": 300,
+        "pool_timeout": 20,
+        "pool_pre_ping": True,
+    },
+    "dedicated": {
+        "pool_size": 10,
+        "max_overflow": 20,
+        "pool_recycle": 1800,
+        "pool_timeout": 30,
+        "pool_pre_ping": True,
+    },
+}
+
+_ENV_OVERRIDES = {
+    "pool_size": "DB_POOL_SIZE",
+    "max_overflow": "DB_MAX_OVERFLOW",
+    "pool_recycle": "DB_POOL_RECYCLE",
+    "pool_timeout": "DB_POOL_TIMEOUT",
+}
+
+_metrics_lock = threading.Lock()
+_metrics: dict[str, dict[str, Any]] = {}
+_engines: dict[str, Engine] = {}
+
+
+def is_pooler_url(url: str) -> bool:
+    """True for Supabase pooler / pgbouncer transaction mode URLs."""
+    return "pooler.supabase.com" in url.lower() or ":6543" in url
+
+
+def select_pool_profile(url: str) -> str:
+    """Profile name from DB_POOL_PROFILE, or inferred from the database URL."""
+    profile = os.getenv("DB_POOL_PROFILE", "").strip().lower()
+    if profile:
+        if profile not in POOL_PROFILES:
+            raise ValueError(
+                f"Unknown DB_POOL_PROFILE '{profile}' (expected one of: {', '.join(POOL_PROFILES)})"
+            )
+        return profile
+    return "pooler" if is_pooler_url(url) else "free_tier"
+
+
+def pool_options(profile: str, overrides: Optional[dict[str, int]] = None) -> dict[str, Any]:
+    """Pool keyword arguments for a profile, with DB_* env and explicit overrides applied."""
+    options = dict(POOL_PROFILES[profile])
+    for key, env_var in _ENV_OVERRIDES.items():
+        if os.getenv(env_var):
+            options[key] = int(os.environ[env_var])
+    options.update(overrides or {})
+    return options
+
+
+def _new_metrics(name: str, profile: str, options: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "engine": name,
+        "profile": profile,
+        "pool_size": options.get("pool_size"),
+        "max_overflow": options.get("max_overflow"),
+        "checkouts": 0,
+        "checkout_wait_total_ms": 0.0,
+        "checkout_wait_max_ms": 0.0,
+        "checkout_timeouts": 0,
+        "overflow_checkouts": 0,
+        "overflow_high_water": 0,
+        "pre_ping_failures": 0,
+        "invalidations": 0,
+    }
+
+
+def _metered_pool_class(base: type, metrics: dict[str, Any]) -> type:
+    """
+    Pool class that times QueuePool._do_get() and records overflow use.
+    Bound to its metrics dict as a class attribute so pools recreated by
+    engine.dispose() (which instantiates self.__class__) keep reporting.
+    """
+
+    class MeteredPool(base):
+        _metrics = metrics
+
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                conn = super()._do_get()
+            except exc.TimeoutError:
+                with _metrics_lock:
+                    self._metrics["checkout_timeouts"] += 1
+                raise
+            wait_ms = (time.perf_counter() - start) * 1000
+            overflow = max(0, self.overflow())
+            with _metrics_lock:
+                m = self._metrics
+                m["checkouts"] += 1
+                m["checkout_wait_total_ms"] += wait_ms
+                m["checkout_wait_max_ms"] = max(m["checkout_wait_max_ms"], wait_ms)
+                if self.checkedout() > self.size():
+                    m["overflow_checkouts"] += 1
+                m["overflow_high_water"] = max(m["overflow_high_water"], overflow)
+            return conn
+
+    MeteredPool.__name__ = f"Metered{base.__name__}"
+    MeteredPool.__qualname__ = MeteredPool.__name__
+    return MeteredPool
+
+
+def _listen_for_invalidations(engine: Engine, metrics: dict[str, Any]) -> None:
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        with _metrics_lock:
+            metrics["invalidations"] += 1
+            # A failed pre-ping surfaces as InvalidatePoolError on checkout
+            if isinstance(exception, exc.InvalidatePoolError):
+                metrics["pre_ping_failures"] += 1
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and (":memory:" in url or url.rstrip("/") in ("sqlite:", "sqlite+aiosqlite:"))
+
+
+def create_db_engine(
+    url: str,
+    *,
+    name: str,
+    connect_args: Optional[dict[str, Any]] = None,
+    overrides: Optional[dict[str, int]] = None,
+    is_async: bool = False,
+    **engine_kwargs: Any,
+):
+    """
+    Create a (sync or async) engine using the configured pool profile.
+    `name` identifies the engine in get_pool_metrics().
+    """
+    profile = select_pool_profile(url)
+    options = pool_options(profile, overrides)
+    metrics = _new_metrics(name, profile, options)
+
+    kwargs: dict[str, Any] = {"echo": False, **engine_kwargs}
+    if connect_args:
+        kwargs["connect_args"] = connect_args
+    if not _is_memory_sqlite(url):
+        base = AsyncAdaptedQueuePool if is_async else QueuePool
+        kwargs["poolclass"] = _metered_pool_class(base, metrics)
+        kwargs.update(options)
+
+    if is_async:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        engine = create_async_engine(url, **kwargs)
+        _listen_for_invalidations(engine.sync_engine, metrics)
+    else:
+        engine = create_engine(url, **kwargs)
+        _listen_for_invalidations(engine, metrics)
+
+    with _metrics_lock:
+        _metrics[name] = metrics
+    _engines[name] = engine.sync_engine if is_async else engine
+    return engine
+
+
+def get_pool_metrics() -> dict[str, dict[str, Any]]:
+    """Pool counters since process start plus the current pool status, per engine."""
+    with _metrics_lock:
+        snapshot = {name: dict(m) for name, m in _metrics.items()}
+    for name, m in snapshot.items():
+        m["checkout_wait_avg_ms"] = round(m["checkout_wait_total_ms"] / m["checkouts"], 3) if m["checkouts"] else 0.0
+        m["checkout_wait_total_ms"] = round(m["checkout_wait_total_ms"], 3)
+        m["checkout_wait_max_ms"] = round(m["checkout_wait_max_ms"], 3)
+        pool = _engines[name].pool
+        if isinstance(pool, QueuePool):
+            m["checked_out"] = pool.checkedout()
+            m["checked_in"] = pool.checkedin()
+            m["overflow"] = max(0, pool.overflow())
+    return snapshot
@@ -4,18 +4,21 @@ import os
 import re
 from email.header import decode_header, make_header
 from email.utils import getaddresses
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set, Tuple
 
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 
 # Config values - use environment variables or defaults
 import os
 GOOGLE_CREDENTIALS_FILE = os.getenv("GOOGLE_CREDENTIALS_FILE")  # Not used in server-side flow
 GMAIL_TOKEN_FILE = os.getenv("GMAIL_TOKEN_FILE")  # Not used in server-side flow
 MAX_MESSAGES_PER_POLL = int(os.getenv("MAX_MESSAGES_PER_POLL", "50"))
+# Gmail allows up to 100 calls per batch, but recommends <= 50 to avoid rate limiting
+GMAIL_BATCH_SIZE = max(1, min(int(os.getenv("GMAIL_BATCH_SIZE", "50")), 100))
 
 SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
 
@@ -136,6 +139,12 @@ def get_gmail_service():
     """
     creds = None
 
+    if not GMAIL_TOKEN_FILE or not GOOGLE_CREDENTIALS_FILE:
+        raise RuntimeError(
+            "get_gmail_service() needs GMAIL_TOKEN_FILE and GOOGLE_CREDENTIALS_FILE (standalone plugin only); "
+            "the backend uses gmail_sync_service.get_gmail_service_for_user()"
+        )
+
     if os.path.exists(GMAIL_TOKEN_FILE):
         creds = Credentials.from_authorized_user_file(GMAIL_TOKEN_FILE, SCOPES)
 
@@ -159,14 +168,131 @@ def get_gmail_service():
 # Fetch Recent Messages
 # =====================================================================
 
-def fetch_recent_messages(
+# Gmail tab labels that are NOT the Primary tab ("category:primary" excludes these)
+_NON_PRIMARY_CATEGORIES = {
+    "CATEGORY_SOCIAL",
+    "CATEGORY_PROMOTIONS",
+    "CATEGORY_UPDATES",
+    "CATEGORY_FORUMS",
+}
+
+
+class HistoryCursorExpiredError(Exception):
+    """Raised when Gmail no longer has history records for the stored historyId."""
+
+
+def _parse_message(msg: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Shape a raw Gmail API message into the dict used by the processor.
+    """
+    payload = msg.get("payload", {}) or {}
+    headers = payload.get("headers", []) or []
+    header_map = {h.get("name", "").lower(): h.get("value", "") for h in headers}
+
+    return {
+        "id": msg.get("id"),
+        "thread_id": msg.get("threadId", "") or "",
+        "label_ids": msg.get("labelIds", []) or [],
+        "subject": _decode_header_value(header_map.get("subject", "")),
+        "from_list": _parse_address_list(header_map.get("from", "")),
+        "to_list": _parse_address_list(header_map.get("to", "")),
+        "body_text": _extract_body_text(msg),
+        "internal_date": int(msg.get("internalDate", 0) or 0),
+    }
+
+
+def _is_synced_label_set(label_ids: List[str]) -> bool:
+    """
+    True if a message belongs to what a full sync would fetch:
+    Primary-tab INBOX messages or SENT messages.
+    """
+    labels = set(label_ids or [])
+    if "SENT" in labels:
+        return True
+    return "INBOX" in labels and not (labels & _NON_PRIMARY_CATEGORIES)
+
+
+def _get_message_request(service, message_id: str, metadata_only: bool):
+    if metadata_only:
+        return service.users().messages().get(
+            userId="me",
+            id=message_id,
+            format="metadata",
+            metadataHeaders=["From", "To", "Subject"],
+        )
+    return service.users().messages().get(userId="me", id=message_id, format="full")
+
+
+def fetch_messages_by_ids(
+    service,
+    message_ids: List[str],
+    known_ids: Optional[Set[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Fetch Gmail messages for the given IDs, in the given order, using HTTP
+    batch requests of up to GMAIL_BATCH_SIZE calls each.
+
+    IDs in known_ids (already stored for this user) are fetched with
+    format="metadata" - headers only, no body - and marked metadata_only.
+    Messages deleted between listing and fetching are skipped.
+    """
+    known_ids = known_ids or set()
+    raw_by_id: Dict[str, Dict[str, Any]] = {}
+    failed: List[str] = []
+
+    def _on_response(request_id, response, exception):
+        if exception is None:
+            raw_by_id[request_id] = response
+        elif isinstance(exception, HttpError) and exception.resp.status == 404:
+            return
+        else:
+            failed.append(request_id)
+
+    unique_ids = list(dict.fromkeys(mid for mid in message_ids if mid))
+
+    for start in range(0, len(unique_ids), GMAIL_BATCH_SIZE):
+        chunk = unique_ids[start : start + GMAIL_BATCH_SIZE]
+        batch = service.new_batch_http_request(callback=_on_response)
+        for message_id in chunk:
+            batch.add(
+                _get_message_request(service, message_id, message_id in known_ids),
+                request_id=message_id,
+            )
+        batch.execute()
+
+    # Individual calls inside a batch can fail (e.g. per-user rate limits);
+    # retry those one at a time
+    for message_id in failed:
+        try:
+            raw_by_id[message_id] = _get_message_request(
+                service, message_id, message_id in known_ids
+            ).execute()
+        except HttpError as e:
+            if e.resp.status == 404:
+                continue
+            raise
+
+    out: List[Dict[str, Any]] = []
+    for message_id in unique_ids:
+        msg = raw_by_id.get(message_id)
+        if msg is None:
+            continue
+        parsed = _parse_message(msg)
+        if message_id in known_ids:
+            parsed["body_text"] = ""
+            parsed["metadata_only"] = True
+        out.append(parsed)
+
+    return out
+
+
+def list_recent_message_ids(
     service,
     label_ids: Optional[List[str]] = None,
     query: Optional[str] = None,
-) -> List[Dict[str, Any]]:
+) -> List[str]:
     """
-    Fetch up to MAX_MESSAGES_PER_POLL recent Gmail messages.
-    Used by the inbound message processor.
+    List up to MAX_MESSAGES_PER_POLL recent Gmail message IDs (newest first).
     """
     if label_ids is None:
         label_ids = ["INBOX"]
@@ -184,43 +310,95 @@ def fetch_recent_messages(
     resp = list_req.execute()
 
     refs = resp.get("messages", []) or []
-    if not refs:
+    return [ref["id"] for ref in refs if ref.get("id")]
+
+
+def fetch_recent_messages(
+    service,
+    label_ids: Optional[List[str]] = None,
+    query: Optional[str] = None,
+    known_ids: Optional[Set[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Fetch up to MAX_MESSAGES_PER_POLL recent Gmail messages.
+    Used by the inbound message processor.
+    """
+    message_ids = list_recent_message_ids(service, label_ids=label_ids, query=query)
+    if not message_ids:
         return []
 
-    out: List[Dict[str, Any]] = []
+    return fetch_messages_by_ids(service, message_ids, known_ids=known_ids)
 
-    for ref in refs:
-        msg = (
-            service.users()
-            .messages()
-            .get(userId="me", id=ref["id"], format="full")
-            .execute()
-        )
-        payload = msg.get("payload", {}) or {}
-        headers = payload.get("headers", []) or []
-        header_map = {h.get("name", "").lower(): h.get("value", "") for h in headers}
 
-        subject = _decode_header_value(header_map.get("subject", ""))
-        from_list = _parse_address_list(header_map.get("from", ""))
-        to_list = _parse_address_list(header_map.get("to", ""))
-        body_text = _extract_body_text(msg)
-        internal_date = int(msg.get("internalDate", 0) or 0)
-        thread_id = msg.get("threadId", "") or ""
+# =====================================================================
+# Incremental Sync (History API)
+# =====================================================================
 
-        out.append(
-            {
-                "id": msg.get("id"),
-                "thread_id": thread_id,
-                "label_ids": msg.get("labelIds", []) or [],
-                "subject": subject,
-                "from_list": from_list,
-                "to_list": to_list,
-                "body_text": body_text,
-                "internal_date": internal_date,
-            }
-        )
+def get_current_history_id(service) -> Optional[str]:
+    """
+    Returns the mailbox's current historyId, used as the starting cursor
+    for the next incremental sync.
+    """
+    profile = service.users().getProfile(userId="me").execute()
+    history_id = profile.get("historyId")
+    return str(history_id) if history_id else None
 
-    return out
+
+def fetch_history_message_ids(
+    service,
+    start_history_id: str,
+) -> Tuple[List[str], str]:
+    """
+    List message IDs added to (or labelled into) INBOX Primary / SENT since
+    start_history_id.
+
+    Returns (message_ids, latest_history_id). Raises HistoryCursorExpiredError
+    if the cursor is too old for Gmail to answer (HTTP 404).
+    """
+    message_ids: List[str] = []
+    seen = set()
+    latest_history_id = str(start_history_id)
+    page_token = None
+
+    while True:
+        try:
+            resp = (
+                service.users()
+                .history()
+                .list(
+                    userId="me",
+                    startHistoryId=start_history_id,
+                    historyTypes=["messageAdded", "labelAdded"],
+                    pageToken=page_token,
+                )
+                .execute()
+            )
+        except HttpError as e:
+            if e.resp.status == 404:
+                raise HistoryCursorExpiredError(
+                    f"historyId {start_history_id} is no longer available"
+                ) from e
+            raise
+
+        for record in resp.get("history", []) or []:
+            changes = (record.get("messagesAdded", []) or []) + (record.get("labelsAdded", []) or [])
+            for change in changes:
+                message = change.get("message", {}) or {}
+                message_id = message.get("id")
+                if not message_id or message_id in seen:
+                    continue
+                if _is_synced_label_set(message.get("labelIds", []) or []):
+                    seen.add(message_id)
+                    message_ids.append(message_id)
+
+        if resp.get("historyId"):
+            latest_history_id = str(resp["historyId"])
+
+        page_token = resp.get("nextPageToken")
+        if not page_token:
+            break
+
+    return message_ids, latest_history_id
 
 
 # =====================================================================
@@ -6,18 +6,20 @@
 import os
 from pathlib import Path
 from contextlib import contextmanager
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Set
 
-from sqlalchemy import create_engine, text, Integer, BigInteger, String, Text, Boolean
+from sqlalchemy import create_engine, text, bindparam, Index, Integer, BigInteger, String, Text, Boolean
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, Session, sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 
-# Import DATABASE_URL from models.database_functions (uses same database)
+# Import DATABASE_URL and the shared engine from models.database_functions (same database,
+# one connection pool for API requests and the Gmail sync thread)
 try:
-    from models.database_functions import DATABASE_URL
+    from models.database_functions import DATABASE_URL, engine
 except ImportError:
-    # Fallback to config if running from GmailPluginRoot
+    # Fallback to config if running from GmailPluginRoot (standalone engine below)
     from config import DATABASE_URL
+    engine = None
 
 
 # -------------------------------------------------------------------
@@ -31,6 +33,9 @@ class Base(DeclarativeBase):
 class GmailContact(Base):
     """Gmail plugin contacts table (separate from main Ripple contacts)."""
     __tablename__ = "gmail_contacts"
+    __table_args__ = (
+        Index("ix_gmail_contacts_user_id_last_contact", "user_id", "last_contact_ts"),
+    )
 
     email: Mapped[str] = mapped_column(String(255), primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, primary_key=True, nullable=False, index=True)  # FK enforced at DB level
@@ -43,10 +48,22 @@ class GmailContact(Base):
     has_scheduled_meeting: Mapped[bool] = mapped_column(Boolean, default=False)
     awaiting_reply_from_user: Mapped[bool] = mapped_column(Boolean, default=False)
 
+    # Incremental checklist state (earliest sent / latest received message timestamps)
+    first_sent_ts: Mapped[Optional[int]] = mapped_column(BigInteger)
+    last_received_ts: Mapped[Optional[int]] = mapped_column(BigInteger)
+    checklist_backfilled: Mapped[bool] = mapped_column(Boolean, default=False)  # False = needs one full recompute
+
+    # Changed since the last reconciliation into the main contacts table
+    pending_main_sync: Mapped[bool] = mapped_column(Boolean, default=True)
+
 
 class GmailThread(Base):
     """Gmail plugin threads table."""
     __tablename__ = "gmail_threads"
+    __table_args__ = (
+        Index("ix_gmail_threads_user_id_contact", "user_id", "contact_email", "last_updated_ts"),
+        Index("ix_gmail_threads_user_id_updated", "user_id", "last_updated_ts"),
+    )
 
     thread_id: Mapped[str] = mapped_column(String(500), primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, primary_key=True, nullable=False, index=True)  # FK enforced at DB level
@@ -61,6 +78,10 @@ class GmailThread(Base):
 class GmailMessage(Base):
     """Gmail plugin messages table."""
     __tablename__ = "gmail_messages"
+    __table_args__ = (
+        Index("ix_gmail_messages_user_id_contact", "user_id", "contact_email", "timestamp"),
+        Index("ix_gmail_messages_user_id_thread", "user_id", "thread_id", "timestamp"),
+    )
 
     gmail_id: Mapped[str] = mapped_column(String(500), primary_key=True)
     user_id: Mapped[int] = mapped_column(Integer, primary_key=True, nullable=False, index=True)  # FK enforced at DB level
@@ -71,6 +92,19 @@ class GmailMessage(Base):
     summary: Mapped[Optional[str]] = mapped_column(Text)
 
 
+class GmailLLMCache(Base):
+    """Cached LLM results (classification, summaries, meeting detection), keyed by content hash."""
+    __tablename__ = "gmail_llm_cache"
+
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)  # sha256 of kind/model/prompt version/input
+    kind: Mapped[str] = mapped_column(String(20))  # "classify", "summary" or "meeting"
+    model: Mapped[str] = mapped_column(String(100))
+    prompt_version: Mapped[str] = mapped_column(String(16))
+    result_json: Mapped[str] = mapped_column(Text)
+    created_at: Mapped[int] = mapped_column(BigInteger, index=True)  # epoch seconds
+    expires_at: Mapped[int] = mapped_column(BigInteger, index=True)  # epoch seconds
+
+
 # -------------------------------------------------------------------
 # Database Engine Setup
 # -------------------------------------------------------------------
@@ -91,51 +125,53 @@ def _validate_database_url(url: str) -> tuple[bool, str]:
     return True, ""
 
 
-# Validate and configure connection
-is_valid, error_msg = _validate_database_url(DATABASE_URL)
-if not is_valid:
-    print(f"❌ DATABASE_URL Validation Error: {error_msg}")
-    raise ValueError(f"Invalid DATABASE_URL: {error_msg}")
-elif error_msg:
-    print(f"⚠️  DATABASE_URL: {error_msg}")
-
-# Configure connection args for Supabase
-connect_args = {}
-if "supabase" in DATABASE_URL.lower():
-    # Check for SSL certificate file
-    cert_paths = [
-        Path(__file__).parent.parent / "prod-supabase.cer",
-        Path(__file__).parent.parent.parent / "prod-supabase.cer",
-    ]
+# Standalone engine (GmailPluginRoot only); inside the backend the shared engine is used
+if engine is None:
+    # Validate and configure connection
+    is_valid, error_msg = _validate_database_url(DATABASE_URL)
+    if not is_valid:
+        print(f"❌ DATABASE_URL Validation Error: {error_msg}")
+        raise ValueError(f"Invalid DATABASE_URL: {error_msg}")
+    elif error_msg:
+        print(f"⚠️  DATABASE_URL: {error_msg}")
+
+    # Configure connection args for Supabase
+    connect_args = {}
+    if "supabase" in DATABASE_URL.lower():
+        # Check for SSL certificate file
+        cert_paths = [
+            Path(__file__).parent.parent / "prod-supabase.cer",
+            Path(__file__).parent.parent.parent / "prod-supabase.cer",
+        ]
     
-    cert_file = None
-    for path in cert_paths:
-        if path.exists():
-            cert_file = str(path)
-            break
+        cert_file = None
+        for path in cert_paths:
+            if path.exists():
+                cert_file = str(path)
+                break
     
-    if cert_file:
-        connect_args["sslmode"] = "require"
-        connect_args["sslrootcert"] = cert_file
-        print(f"✅ Using SSL certificate: {cert_file}")
-    else:
-        connect_args["sslmode"] = "prefer"
-        print("✅ SSL mode: prefer")
+        if cert_file:
+            connect_args["sslmode"] = "require"
+            connect_args["sslrootcert"] = cert_file
+            print(f"✅ Using SSL certificate: {cert_file}")
+        else:
+            connect_args["sslmode"] = "prefer"
+            print("✅ SSL mode: prefer")
     
-    connect_args["connect_timeout"] = 10
-
-# Create engine
-engine = create_engine(
-    DATABASE_URL,
-    echo=False,
-    future=True,
-    pool_pre_ping=True,
-    pool_recycle=300,
-    pool_size=5,
-    max_overflow=10,
-    connect_args=connect_args,
-    pool_reset_on_return='commit'
-)
+        connect_args["connect_timeout"] = 10
+
+    # Create engine
+    engine = create_engine(
+        DATABASE_URL,
+        echo=False,
+        future=True,
+        pool_pre_ping=True,
+        pool_recycle=300,
+        pool_size=5,
+        max_overflow=10,
+        connect_args=connect_args,
+        pool_reset_on_return='commit'
+    )
 
 # Create session factory
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
@@ -174,6 +210,43 @@ def init_db() -> None:
         raise
 
 
+# Columns added to gmail_contacts after the original table script
+# (see scripts/add_gmail_contact_checklist_columns.sql and
+# scripts/add_gmail_contact_pending_sync_column.sql). Checked once per process.
+_CONTACT_COLUMNS = [
+    ("first_sent_ts", "BIGINT"),
+    ("last_received_ts", "BIGINT"),
+    ("checklist_backfilled", "BOOLEAN DEFAULT FALSE"),
+    ("pending_main_sync", "BOOLEAN DEFAULT TRUE"),
+]
+_contact_columns_checked = False
+
+
+def _ensure_gmail_contact_columns() -> None:
+    """Ensure incremental checklist / reconciliation columns exist in gmail_contacts."""
+    global _contact_columns_checked
+    if _contact_columns_checked:
+        return
+    try:
+        with get_session() as session:
+            if "postgresql" in DATABASE_URL.lower():
+                for col_name, col_type in _CONTACT_COLUMNS:
+                    session.execute(text(
+                        f"ALTER TABLE gmail_contacts ADD COLUMN IF NOT EXISTS {col_name} {col_type}"
+                    ))
+            else:
+                result = session.execute(text("PRAGMA table_info(gmail_contacts)"))
+                columns = [row[1] for row in result.fetchall()]
+                for col_name, col_type in _CONTACT_COLUMNS:
+                    if col_name not in columns:
+                        session.execute(text(
+                            f"ALTER TABLE gmail_contacts ADD COLUMN {col_name} {col_type}"
+                        ))
+        _contact_columns_checked = True
+    except Exception as e:
+        print(f"Warning: Could not auto-migrate gmail_contacts checklist columns: {e}")
+
+
 # -------------------------------------------------------------------
 # User Lookup and Validation
 # -------------------------------------------------------------------
@@ -237,6 +310,21 @@ def message_exists(gmail_id: str, user_id: int) -> bool:
         return result.fetchone() is not None
 
 
+def get_known_message_ids(gmail_ids: List[str], user_id: int) -> Set[str]:
+    """Returns the subset of gmail_ids already stored for this user (one query)."""
+    ids = [gid for gid in set(gmail_ids or []) if gid]
+    if not ids or not user_id:
+        return set()
+    
+    with get_session() as session:
+        result = session.execute(
+            text("SELECT gmail_id FROM gmail_messages WHERE user_id = :user_id AND gmail_id IN :gmail_ids")
+            .bindparams(bindparam("gmail_ids", expanding=True)),
+            {"user_id": user_id, "gmail_ids": ids}
+        )
+        return {row[0] for row in result.fetchall()}
+
+
 def upsert_contact(name: Optional[str], email: str, last_contact_ts: int, user_id: int) -> None:
     """Insert or update a contact. Only called for networking threads."""
     if not email or not user_id:
@@ -244,6 +332,7 @@ def upsert_contact(name: Optional[str], email: str, last_contact_ts: int, user_i
         return
     
     email_norm = email.lower()
+    _ensure_gmail_contact_columns()
     
     with get_session() as session:
         # Use composite key lookup (email + user_id)
@@ -260,7 +349,7 @@ def upsert_contact(name: Optional[str], email: str, last_contact_ts: int, user_i
             session.execute(
                 text("""
                     UPDATE gmail_contacts 
-                    SET name = :name, last_contact_ts = :last_contact_ts
+                    SET name = :name, last_contact_ts = :last_contact_ts, pending_main_sync = true
                     WHERE email = :email AND user_id = :user_id
                 """),
                 {
@@ -297,6 +386,30 @@ def get_thread_networking_status(thread_id: str, user_id: int) -> Optional[bool]
         return bool(row[0])
 
 
+def get_thread_states(thread_ids: List[str], user_id: int) -> Dict[str, Dict[str, bool]]:
+    """
+    Batch version of get_thread_networking_status (one query).
+    Returns {thread_id: {"is_networking": bool, "meeting_scheduled": bool}} for threads already seen.
+    """
+    ids = [tid for tid in set(thread_ids or []) if tid]
+    if not ids or not user_id:
+        return {}
+    
+    with get_session() as session:
+        result = session.execute(
+            text("""
+                SELECT thread_id, is_networking, meeting_scheduled
+                FROM gmail_threads
+                WHERE user_id = :user_id AND thread_id IN :thread_ids
+            """).bindparams(bindparam("thread_ids", expanding=True)),
+            {"user_id": user_id, "thread_ids": ids}
+        )
+        return {
+            row[0]: {"is_networking": bool(row[1]), "meeting_scheduled": bool(row[2])}
+            for row in result.fetchall()
+        }
+
+
 def upsert_thread(
     thread_id: str,
     contact_email: str,
@@ -394,6 +507,233 @@ def insert_networking_message(
         session.add(new_message)
 
 
+# -------------------------------------------------------------------
+# Batch Persistence
+# -------------------------------------------------------------------
+
+def _merge_thread(current: Optional[Dict[str, Any]], update: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply one upsert_thread() call to a thread row held in memory (same rules as upsert_thread)."""
+    is_networking = bool(update["is_networking"])
+    email_norm = (update.get("contact_email") or "").lower() or None if is_networking else None
+    subj = (update.get("subject") or "").strip() or None
+    message_ts = update.get("message_ts")
+    
+    if current is None:
+        return {
+            "contact_email": email_norm,
+            "subject": subj,
+            "is_networking": is_networking,
+            "first_message_ts": message_ts,
+            "last_updated_ts": message_ts,
+        }
+    return {
+        "contact_email": email_norm or current["contact_email"],
+        "subject": current["subject"] or subj,
+        "is_networking": True if (current["is_networking"] == True or is_networking) else False,
+        "first_message_ts": current["first_message_ts"] or message_ts,
+        "last_updated_ts": max(current["last_updated_ts"] or 0, message_ts or 0),
+    }
+
+
+def save_processed_batch(
+    user_id: int,
+    contacts: List[Dict[str, Any]],
+    threads: List[Dict[str, Any]],
+    messages: List[Dict[str, Any]],
+) -> None:
+    """
+    Persist the results of processing a batch of Gmail messages in ONE transaction.
+
+    Each list holds the same arguments the single-row helpers take, in processing order:
+      contacts: {"name", "email", "last_contact_ts"}                          (upsert_contact)
+      threads:  {"thread_id", "contact_email", "subject", "message_ts", "is_networking"}  (upsert_thread)
+      messages: {"gmail_id", "thread_id", "contact_email", "timestamp", "direction", "summary"}
+                                                                              (insert_networking_message)
+    Existing rows are loaded with one query per table, merged in memory and written back with
+    bulk INSERT/UPDATE. Checklist flags are maintained incrementally from the new messages'
+    direction and timestamp; contacts without incremental state yet (rows from before
+    first_sent_ts/last_received_ts existed) get one full recompute at the end of the batch.
+    """
+    if not user_id or not (contacts or threads or messages):
+        return
+
+    _ensure_gmail_contact_columns()
+
+    with get_session() as session:
+        # ---- Messages not stored yet ----
+        unique_messages = {m["gmail_id"]: m for m in messages if m.get("gmail_id")}
+        new_messages = []
+        if unique_messages:
+            already_stored = {
+                r[0] for r in session.execute(
+                    text("SELECT gmail_id FROM gmail_messages WHERE user_id = :user_id AND gmail_id IN :gmail_ids")
+                    .bindparams(bindparam("gmail_ids", expanding=True)),
+                    {"user_id": user_id, "gmail_ids": list(unique_messages)}
+                ).fetchall()
+            }
+            new_messages = [m for gmail_id, m in unique_messages.items() if gmail_id not in already_stored]
+
+        # Checklist deltas from the new messages: earliest sent / latest received per contact
+        deltas: Dict[str, Dict[str, Optional[int]]] = {}
+        for m in new_messages:
+            email_norm = (m.get("contact_email") or "").lower()
+            if not email_norm:
+                continue
+            delta = deltas.setdefault(email_norm, {"first_sent_ts": None, "last_received_ts": None})
+            ts = m.get("timestamp") or 0
+            direction = (m.get("direction") or "").strip().lower()
+            if direction == "sent":
+                delta["first_sent_ts"] = _min_ts(delta["first_sent_ts"], ts)
+            elif direction == "received":
+                delta["last_received_ts"] = _max_ts(delta["last_received_ts"], ts)
+
+        # ---- Contacts ----
+        contact_rows: Dict[str, Dict[str, Any]] = {}
+        for c in contacts:
+            if c.get("email"):
+                email_norm = c["email"].lower()
+                row = contact_rows.setdefault(email_norm, {"name": None, "last_contact_ts": 0})
+                if c.get("name"):
+                    row["name"] = c["name"].strip()
+                row["last_contact_ts"] = max(row["last_contact_ts"], c.get("last_contact_ts") or 0)
+
+        needs_full_recompute: List[str] = []
+        if contact_rows:
+            existing_contacts = {
+                r[0]: r[1:]
+                for r in session.execute(
+                    text("""
+                        SELECT email, name, last_contact_ts, first_sent_ts, last_received_ts,
+                               has_scheduled_meeting, checklist_backfilled
+                        FROM gmail_contacts
+                        WHERE user_id = :user_id AND email IN :emails
+                    """).bindparams(bindparam("emails", expanding=True)),
+                    {"user_id": user_id, "emails": list(contact_rows)}
+                ).fetchall()
+            }
+            contact_updates = []
+            new_contacts = []
+            for email_norm, row in contact_rows.items():
+                delta = deltas.get(email_norm, {"first_sent_ts": None, "last_received_ts": None})
+                if email_norm in existing_contacts:
+                    existing_name, existing_ts, first_sent_ts, last_received_ts, has_meeting, backfilled = existing_contacts[email_norm]
+                    first_sent_ts = _min_ts(first_sent_ts, delta["first_sent_ts"])
+                    last_received_ts = _max_ts(last_received_ts, delta["last_received_ts"])
+                    if not backfilled:
+                        # Incremental state unknown: recomputed once below, after the inserts
+                        needs_full_recompute.append(email_norm)
+                    contact_updates.append({
+                        "name": row["name"] or existing_name,
+                        "last_contact_ts": max(existing_ts or 0, row["last_contact_ts"]),
+                        "first_sent_ts": first_sent_ts,
+                        "last_received_ts": last_received_ts,
+                        **_checklist_flags(first_sent_ts, last_received_ts, bool(has_meeting)),
+                        "email": email_norm,
+                        "user_id": user_id,
+                    })
+                else:
+                    flags = _checklist_flags(delta["first_sent_ts"], delta["last_received_ts"], False)
+                    new_contacts.append(GmailContact(
+                        email=email_norm,
+                        user_id=user_id,
+                        name=row["name"],
+                        last_contact_ts=row["last_contact_ts"],
+                        first_sent_ts=delta["first_sent_ts"],
+                        last_received_ts=delta["last_received_ts"],
+                        checklist_backfilled=True,
+                        pending_main_sync=True,
+                        has_reached_out=flags["has_reached_out"],
+                        has_contact_responded=flags["has_contact_responded"],
+                        has_scheduled_meeting=False,
+                        awaiting_reply_from_user=flags["awaiting_reply"],
+                    ))
+            if contact_updates:
+                session.execute(
+                    text("""
+                        UPDATE gmail_contacts
+                        SET name = :name, last_contact_ts = :last_contact_ts,
+                            first_sent_ts = :first_sent_ts, last_received_ts = :last_received_ts,
+                            pending_main_sync = true,
+                            has_reached_out = :has_reached_out,
+                            has_contact_responded = :has_contact_responded,
+                            has_scheduled_meeting = :has_scheduled_meeting,
+                            awaiting_reply_from_user = :awaiting_reply
+                        WHERE email = :email AND user_id = :user_id
+                    """),
+                    contact_updates
+                )
+            if new_contacts:
+                session.add_all(new_contacts)
+            print(f"  👥 Gmail contacts: {len(new_contacts)} created, {len(contact_updates)} updated")
+
+        # ---- Threads ----
+        thread_ids = list(dict.fromkeys(t["thread_id"] for t in threads if t.get("thread_id")))
+        if thread_ids:
+            existing_threads = {
+                r[0]: {
+                    "contact_email": r[1],
+                    "subject": r[2],
+                    "is_networking": r[3],
+                    "first_message_ts": r[4],
+                    "last_updated_ts": r[5],
+                }
+                for r in session.execute(
+                    text("""
+                        SELECT thread_id, contact_email, subject, is_networking, first_message_ts, last_updated_ts
+                        FROM gmail_threads
+                        WHERE user_id = :user_id AND thread_id IN :thread_ids
+                    """).bindparams(bindparam("thread_ids", expanding=True)),
+                    {"user_id": user_id, "thread_ids": thread_ids}
+                ).fetchall()
+            }
+            merged: Dict[str, Dict[str, Any]] = {}
+            for t in threads:
+                tid = t.get("thread_id")
+                if tid:
+                    merged[tid] = _merge_thread(merged.get(tid, existing_threads.get(tid)), t)
+
+            thread_updates = [
+                {**row, "thread_id": tid, "user_id": user_id}
+                for tid, row in merged.items() if tid in existing_threads
+            ]
+            if thread_updates:
+                session.execute(
+                    text("""
+                        UPDATE gmail_threads
+                        SET contact_email = :contact_email, subject = :subject,
+                            is_networking = :is_networking, first_message_ts = :first_message_ts,
+                            last_updated_ts = :last_updated_ts
+                        WHERE thread_id = :thread_id AND user_id = :user_id
+                    """),
+                    thread_updates
+                )
+            session.add_all([
+                GmailThread(thread_id=tid, user_id=user_id, **row)
+                for tid, row in merged.items() if tid not in existing_threads
+            ])
+
+        # ---- Messages ----
+        if new_messages:
+            session.add_all([
+                GmailMessage(
+                    gmail_id=m["gmail_id"],
+                    user_id=user_id,
+                    thread_id=m.get("thread_id"),
+                    contact_email=(m.get("contact_email") or "").lower() or None,
+                    timestamp=m.get("timestamp") or 0,
+                    direction=m.get("direction"),
+                    summary=m.get("summary"),
+                )
+                for m in new_messages
+            ])
+
+        # ---- Deferred full recompute (once per contact per batch) ----
+        if needs_full_recompute:
+            # Flush so the aggregate query below sees the new messages
+            session.flush()
+            _recompute_checklists(session, needs_full_recompute, user_id)
+
+
 # -------------------------------------------------------------------
 # Thread Analysis Helpers
 # -------------------------------------------------------------------
@@ -424,91 +764,169 @@ def get_thread_messages_for_analysis(thread_id: str, user_id: int) -> List[Dict]
     ]
 
 
+def get_meeting_candidate_threads(thread_ids: List[str], user_id: int) -> List[Dict[str, str]]:
+    """
+    Of the given networking threads, return those that are eligible for meeting detection
+    (at least one sent AND one received message, meeting not yet scheduled). One query.
+    """
+    ids = [tid for tid in set(thread_ids or []) if tid]
+    if not ids or not user_id:
+        return []
+    
+    with get_session() as session:
+        rows = session.execute(
+            text("""
+                SELECT t.thread_id, t.contact_email
+                FROM gmail_threads t
+                JOIN gmail_messages m
+                  ON m.thread_id = t.thread_id AND m.user_id = t.user_id
+                WHERE t.user_id = :user_id
+                  AND t.thread_id IN :thread_ids
+                  AND t.is_networking = true
+                  AND COALESCE(t.meeting_scheduled, false) = false
+                GROUP BY t.thread_id, t.contact_email
+                HAVING SUM(CASE WHEN LOWER(m.direction) = 'sent' THEN 1 ELSE 0 END) > 0
+                   AND SUM(CASE WHEN LOWER(m.direction) = 'received' THEN 1 ELSE 0 END) > 0
+            """).bindparams(bindparam("thread_ids", expanding=True)),
+            {"user_id": user_id, "thread_ids": ids}
+        ).fetchall()
+    
+    return [{"thread_id": r[0], "contact_email": r[1]} for r in rows]
+
+
 def set_thread_meeting_scheduled(thread_id: str, user_id: int) -> None:
-    """Mark a thread as having a scheduled meeting. Once set, never unset."""
+    """
+    Mark a thread as having a scheduled meeting. Once set, never unset.
+    The thread's contact gets has_scheduled_meeting in the same transaction
+    (no checklist recompute needed: the flag is monotonic).
+    """
     if not thread_id or not user_id:
         return
-    
+
     with get_session() as session:
         session.execute(
             text("""
-                UPDATE gmail_threads 
+                UPDATE gmail_threads
                 SET meeting_scheduled = true
                 WHERE thread_id = :thread_id AND user_id = :user_id
             """),
             {"thread_id": thread_id, "user_id": user_id}
         )
+        session.execute(
+            text("""
+                UPDATE gmail_contacts
+                SET has_scheduled_meeting = true
+                WHERE user_id = :user_id
+                  AND email = (
+                      SELECT contact_email FROM gmail_threads
+                      WHERE thread_id = :thread_id AND user_id = :user_id
+                  )
+            """),
+            {"thread_id": thread_id, "user_id": user_id}
+        )
 
 
 # -------------------------------------------------------------------
-# Contact Checklist Recomputation
+# Contact Checklist Maintenance
 # -------------------------------------------------------------------
 
-def recompute_contact_checklist(contact_email: str, user_id: int) -> None:
-    """Compute checklist flags for a contact."""
-    if not contact_email or not user_id:
+def _min_ts(a: Optional[int], b: Optional[int]) -> Optional[int]:
+    return b if a is None else a if b is None else min(a, b)
+
+
+def _max_ts(a: Optional[int], b: Optional[int]) -> Optional[int]:
+    return b if a is None else a if b is None else max(a, b)
+
+
+def _checklist_flags(
+    first_sent_ts: Optional[int],
+    last_received_ts: Optional[int],
+    has_scheduled_meeting: bool,
+) -> Dict[str, bool]:
+    """
+    Checklist flags from a contact's earliest sent and latest received message timestamps.
+    "Contact responded" means a received message after the user's first outbound one,
+    i.e. last_received_ts > first_sent_ts.
+    """
+    has_sent = first_sent_ts is not None
+    has_received = last_received_ts is not None
+    return {
+        "has_reached_out": has_sent,
+        "has_contact_responded": has_sent and has_received and last_received_ts > first_sent_ts,
+        "has_scheduled_meeting": has_scheduled_meeting,
+        "awaiting_reply": has_received and not has_sent,
+    }
+
+
+def _recompute_checklists(session: Session, emails: List[str], user_id: int) -> None:
+    """
+    Full checklist recompute for several contacts inside an open session:
+    one aggregate query over their messages, one meeting query, one bulk update.
+    Also (re)builds the incremental state (first_sent_ts / last_received_ts).
+    """
+    emails = sorted({e.lower() for e in emails if e})
+    if not emails or not user_id:
         return
-    
-    email = contact_email.lower()
-    
-    with get_session() as session:
-        # Get all messages for this contact and user
-        messages = session.execute(
-            text("""
-                SELECT timestamp, direction
-                FROM gmail_messages
-                WHERE contact_email = :email AND user_id = :user_id
-                ORDER BY timestamp ASC
-            """),
-            {"email": email, "user_id": user_id}
-        ).fetchall()
-        
-        directions = [(d or "").strip().lower() for _, d in messages]
-        
-        has_sent = any(d == "sent" for d in directions)
-        has_received = any(d == "received" for d in directions)
-        
-        has_reached_out = has_sent
-        awaiting_reply = has_received and not has_sent
-        
-        # Contact responded after user's outbound
-        has_contact_responded = False
-        if has_sent:
-            first_sent_idx = next((i for i, d in enumerate(directions) if d == "sent"), None)
-            if first_sent_idx is not None:
-                if any(d == "received" for d in directions[first_sent_idx + 1:]):
-                    has_contact_responded = True
-        
-        # Meeting scheduled anywhere across all threads for this user
-        meeting_result = session.execute(
+
+    state: Dict[str, tuple] = {e: (None, None) for e in emails}
+    for email, first_sent_ts, last_received_ts in session.execute(
+        text("""
+            SELECT contact_email,
+                   MIN(CASE WHEN LOWER(direction) = 'sent' THEN timestamp END),
+                   MAX(CASE WHEN LOWER(direction) = 'received' THEN timestamp END)
+            FROM gmail_messages
+            WHERE user_id = :user_id AND contact_email IN :emails
+            GROUP BY contact_email
+        """).bindparams(bindparam("emails", expanding=True)),
+        {"user_id": user_id, "emails": emails}
+    ).fetchall():
+        state[email] = (first_sent_ts, last_received_ts)
+
+    # Meeting scheduled anywhere across all threads for this user
+    with_meeting = {
+        r[0] for r in session.execute(
             text("""
-                SELECT 1
+                SELECT DISTINCT contact_email
                 FROM gmail_threads
-                WHERE contact_email = :email
-                  AND user_id = :user_id
+                WHERE user_id = :user_id
+                  AND contact_email IN :emails
                   AND meeting_scheduled = true
-                LIMIT 1
-            """),
-            {"email": email, "user_id": user_id}
-        ).fetchone()
-        has_scheduled_meeting = meeting_result is not None
-        
-        # Update contact (use composite key: email + user_id)
-        session.execute(
-            text("""
-                UPDATE gmail_contacts
-                SET has_reached_out = :has_reached_out,
-                    has_contact_responded = :has_contact_responded,
-                    has_scheduled_meeting = :has_scheduled_meeting,
-                    awaiting_reply_from_user = :awaiting_reply
-                WHERE email = :email AND user_id = :user_id
-            """),
+            """).bindparams(bindparam("emails", expanding=True)),
+            {"user_id": user_id, "emails": emails}
+        ).fetchall()
+    }
+
+    # Update contacts (use composite key: email + user_id)
+    session.execute(
+        text("""
+            UPDATE gmail_contacts
+            SET first_sent_ts = :first_sent_ts,
+                last_received_ts = :last_received_ts,
+                checklist_backfilled = true,
+                has_reached_out = :has_reached_out,
+                has_contact_responded = :has_contact_responded,
+                has_scheduled_meeting = :has_scheduled_meeting,
+                awaiting_reply_from_user = :awaiting_reply
+            WHERE email = :email AND user_id = :user_id
+        """),
+        [
             {
-                "has_reached_out": has_reached_out,
-                "has_contact_responded": has_contact_responded,
-                "has_scheduled_meeting": has_scheduled_meeting,
-                "awaiting_reply": awaiting_reply,
+                **_checklist_flags(state[email][0], state[email][1], email in with_meeting),
+                "first_sent_ts": state[email][0],
+                "last_received_ts": state[email][1],
                 "email": email,
-                "user_id": user_id
+                "user_id": user_id,
             }
-        )
+            for email in emails
+        ]
+    )
+
+
+def recompute_contact_checklist(contact_email: str, user_id: int) -> None:
+    """Full recompute of checklist flags for a contact (repair path; syncs maintain them incrementally)."""
+    if not contact_email or not user_id:
+        return
+
+    _ensure_gmail_contact_columns()
+    with get_session() as session:
+        _recompute_checklists(session, [contact_email], user_id)
@@ -0,0 +1,181 @@
+# gmail_llm_cache.py
+# ---------------------------------------------------------------------
+# Persistent, content-addressed cache for Gmail LLM results.
+# Key = sha256(kind, model, prompt version, sha256(prepared input)).
+# Entries expire after a TTL; the table is trimmed to a max size.
+# ---------------------------------------------------------------------
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Import from local directory (backend/services)
+# Try multiple import strategies for compatibility
+try:
+    # Strategy 1: Direct import from same directory
+    from gmail_db import get_session, text, engine, GmailLLMCache
+except ImportError:
+    try:
+        # Strategy 2: Relative import (same package)
+        from .gmail_db import get_session, text, engine, GmailLLMCache
+    except ImportError:
+        # Strategy 3: Absolute import from services package
+        from services.gmail_db import get_session, text, engine, GmailLLMCache
+
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_DAYS", "30")) * 86400
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+# Run eviction after this many writes (per process)
+_EVICT_EVERY_N_PUTS = 200
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+_puts_since_evict = 0
+_table_checked = False
+
+
+def _ensure_cache_table() -> bool:
+    """Create gmail_llm_cache if missing. Returns False if the cache can't be used."""
+    global _table_checked
+    if _table_checked:
+        return True
+    try:
+        GmailLLMCache.__table__.create(engine, checkfirst=True)
+        _table_checked = True
+        return True
+    except Exception as e:
+        print(f"⚠️  LLM cache unavailable: {e}")
+        return False
+
+
+def _count(kind: str, field: str) -> None:
+    with _stats_lock:
+        counters = _stats.setdefault(kind, {"hits": 0, "misses": 0, "writes": 0, "errors": 0})
+        counters[field] += 1
+
+
+def prompt_version(template: str) -> str:
+    """Short hash of a prompt template, so editing a prompt invalidates its cached results."""
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+
+
+def make_cache_key(kind: str, model: str, template: str, prepared_input: str) -> str:
+    input_hash = hashlib.sha256((prepared_input or "").encode("utf-8")).hexdigest()
+    raw = "|".join([kind, model or "", prompt_version(template), input_hash])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def cache_get(cache_key: str, kind: str) -> Optional[Dict[str, Any]]:
+    """Return the cached result dict, or None on miss / expiry / cache disabled."""
+    if not LLM_CACHE_ENABLED or not _ensure_cache_table():
+        return None
+    try:
+        with get_session() as session:
+            row = session.execute(
+                text("""
+                    SELECT result_json FROM gmail_llm_cache
+                    WHERE cache_key = :cache_key AND expires_at > :now
+                """),
+                {"cache_key": cache_key, "now": int(time.time())}
+            ).fetchone()
+    except Exception as e:
+        _count(kind, "errors")
+        print(f"⚠️  LLM cache read failed: {e}")
+        return None
+
+    if row is None:
+        _count(kind, "misses")
+        return None
+    try:
+        result = json.loads(row[0])
+    except Exception:
+        _count(kind, "misses")
+        return None
+    _count(kind, "hits")
+    return result
+
+
+def cache_put(cache_key: str, kind: str, model: str, template: str, result: Dict[str, Any]) -> None:
+    """Store a successful LLM result. Failures are logged and ignored."""
+    global _puts_since_evict
+    if not LLM_CACHE_ENABLED or not _ensure_cache_table():
+        return
+    now = int(time.time())
+    params = {
+        "cache_key": cache_key,
+        "kind": kind,
+        "model": model,
+        "prompt_version": prompt_version(template),
+        "result_json": json.dumps(result),
+        "created_at": now,
+        "expires_at": now + LLM_CACHE_TTL_SECONDS,
+    }
+    try:
+        with get_session() as session:
+            # Delete + insert works on both Postgres and SQLite and tolerates concurrent writers
+            session.execute(text("DELETE FROM gmail_llm_cache WHERE cache_key = :cache_key"), {"cache_key": cache_key})
+            session.execute(
+                text("""
+                    INSERT INTO gmail_llm_cache (cache_key, kind, model, prompt_version, result_json, created_at, expires_at)
+                    VALUES (:cache_key, :kind, :model, :prompt_version, :result_json, :created_at, :expires_at)
+                """),
+                params
+            )
+    except Exception as e:
+        _count(kind, "errors")
+        print(f"⚠️  LLM cache write failed: {e}")
+        return
+    _count(kind, "writes")
+
+    with _stats_lock:
+        _puts_since_evict += 1
+        due = _puts_since_evict >= _EVICT_EVERY_N_PUTS
+        if due:
+            _puts_since_evict = 0
+    if due:
+        evict_llm_cache()
+
+
+def evict_llm_cache() -> int:
+    """Delete expired entries, then the oldest entries beyond LLM_CACHE_MAX_ENTRIES. Returns rows removed."""
+    if not _ensure_cache_table():
+        return 0
+    removed = 0
+    try:
+        with get_session() as session:
+            removed += session.execute(
+                text("DELETE FROM gmail_llm_cache WHERE expires_at <= :now"),
+                {"now": int(time.time())}
+            ).rowcount or 0
+
+            total = session.execute(text("SELECT COUNT(*) FROM gmail_llm_cache")).scalar() or 0
+            excess = total - LLM_CACHE_MAX_ENTRIES
+            if excess > 0:
+                removed += session.execute(
+                    text("""
+                        DELETE FROM gmail_llm_cache
+                        WHERE cache_key IN (
+                            SELECT cache_key FROM gmail_llm_cache
+                            ORDER BY created_at ASC
+                            LIMIT :excess
+                        )
+                    """),
+                    {"excess": excess}
+                ).rowcount or 0
+    except Exception as e:
+        print(f"⚠️  LLM cache eviction failed: {e}")
+        return removed
+
+    if removed:
+        print(f"🧹 LLM cache: evicted {removed} entries")
+    return removed
+
+
+def get_llm_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Per-kind hit/miss/write/error counters since process start."""
+    with _stats_lock:
+        return {kind: dict(counters) for kind, counters in _stats.items()}
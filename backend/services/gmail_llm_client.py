@@ -6,10 +6,14 @@
 # ---------------------------------------------------------------------
 
 import json
+import random
 import re
-from typing import Tuple, List, Dict
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Tuple, List, Dict, Optional
 
-from openai import OpenAI
+from openai import OpenAI, RateLimitError, APIConnectionError, APITimeoutError, InternalServerError
 import os
 
 # Get config from environment variables or defaults
@@ -18,6 +22,19 @@ OPENAI_CLASSIFY_MODEL_NAME = os.getenv("OPENAI_CLASSIFY_MODEL_NAME")
 OPENAI_SUMMARY_MODEL_NAME = os.getenv("OPENAI_SUMMARY_MODEL_NAME")
 OPENAI_MEETING_MODEL_NAME = os.getenv("OPENAI_MEETING_MODEL_NAME")
 
+# Persistent result cache (optional: without it every call goes to OpenAI)
+try:
+    from gmail_llm_cache import make_cache_key, cache_get, cache_put
+except ImportError:
+    try:
+        from .gmail_llm_cache import make_cache_key, cache_get, cache_put
+    except ImportError:
+        try:
+            from services.gmail_llm_cache import make_cache_key, cache_get, cache_put
+        except ImportError:
+            make_cache_key = None
+            cache_get = cache_put = None
+
 # Fallback to config if running from GmailPluginRoot
 if not OPENAI_API_KEY:
     try:
@@ -30,11 +47,20 @@ if not OPENAI_API_KEY:
     except ImportError:
         pass
 
+# Throughput limits (match your OpenAI account tier) and client-side concurrency
+OPENAI_RPM_LIMIT = int(os.getenv("OPENAI_RPM_LIMIT", "500"))
+OPENAI_TPM_LIMIT = int(os.getenv("OPENAI_TPM_LIMIT", "200000"))
+OPENAI_MAX_CONCURRENCY = max(1, int(os.getenv("OPENAI_MAX_CONCURRENCY", "4")))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+# Emails per classification request (1 = one email per call, the original behavior)
+OPENAI_CLASSIFY_BATCH_SIZE = max(1, min(int(os.getenv("OPENAI_CLASSIFY_BATCH_SIZE", "1")), 20))
+
 # -----------------------
 # OpenAI client
 # -----------------------
 
-_client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+# Retries are handled by _chat_completion (rate-limit aware), not by the SDK
+_client = OpenAI(api_key=OPENAI_API_KEY, max_retries=0) if OPENAI_API_KEY else None
 
 _CLASSIFY_MODEL = OPENAI_CLASSIFY_MODEL_NAME or "gpt-4.1-mini"  # Default matches GmailPluginRoot/automation/config.py
 _SUMMARY_MODEL  = OPENAI_SUMMARY_MODEL_NAME or _CLASSIFY_MODEL
@@ -218,6 +244,200 @@ THREAD TRANSCRIPT:
 """.strip()
 
 
+# Batch mode: same definitions and guidelines as CLASSIFY_PROMPT (everything
+# before "YOUR TASK"), several emails in, one JSON array out.
+BATCH_CLASSIFY_PROMPT = CLASSIFY_PROMPT.split("YOUR TASK")[0] + """YOUR TASK
+---------
+You are given {count} separate emails, numbered 1 to {count}. Judge each one on its own.
+For EACH email:
+1. Decide whether it is networking or not.
+2. If (and only if) it IS networking, write a short summary capturing:
+   - The main purpose of the email.
+   - Any concrete asks or offers.
+   - Any next steps, deadlines, or dates (if they exist).
+   - Focus on the big picture, not line-by-line detail.
+
+SUMMARY STYLE REQUIREMENTS (IMPORTANT):
+- Output MUST be one short phrase (max ~15–20 words), starting with an action verb in the past tense.
+- Be punchy and direct. The flow of the summary MUST be easy to skim quickly.
+- Focus ONLY on the new content in each email, not quoted previous messages.
+
+OUTPUT FORMAT (IMPORTANT)
+-------------------------
+Return *only* a single JSON object with this exact schema, with exactly one
+entry per email:
+
+{{
+  "results": [
+    {{
+      "index": 1,
+      "networking": true or false,
+      "summary": "one short, punchy sentence or phrase if networking is true, otherwise an empty string"
+    }}
+  ]
+}}
+
+EMAILS
+------
+{emails}
+""".rstrip()
+
+
+# =====================================================================
+# Rate limiting + retrying chat completion
+# =====================================================================
+
+class _TokenBucket:
+    """Token bucket refilled continuously at `per_minute` units per minute."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(max(1, per_minute))
+        self.tokens = self.capacity
+        self.rate = self.capacity / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)  # a single oversized request must still go through
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.tokens -= amount
+
+
+class _RateLimiter:
+    """Requests-per-minute + tokens-per-minute limiter shared by all LLM calls in the process."""
+
+    def __init__(self, rpm: int, tpm: int):
+        self._requests = _TokenBucket(rpm)
+        self._tokens = _TokenBucket(tpm)
+        self._lock = threading.Lock()
+
+    def acquire(self, estimated_tokens: int) -> None:
+        while True:
+            with self._lock:
+                wait = max(self._requests.wait_time(1), self._tokens.wait_time(estimated_tokens))
+                if wait <= 0:
+                    self._requests.take(1)
+                    self._tokens.take(estimated_tokens)
+                    return
+            time.sleep(min(wait, 5.0))
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """Correct the token bucket once the real usage is known."""
+        if actual_tokens is None:
+            return
+        with self._lock:
+            self._tokens.take(actual_tokens - estimated_tokens)
+            self._tokens.tokens = min(self._tokens.tokens, self._tokens.capacity)
+
+
+_rate_limiter = _RateLimiter(OPENAI_RPM_LIMIT, OPENAI_TPM_LIMIT)
+
+# Expected completion size for our JSON-only prompts
+_EXPECTED_OUTPUT_TOKENS = 150
+
+
+def _estimate_tokens(prompt: str, expected_output_tokens: int = _EXPECTED_OUTPUT_TOKENS) -> int:
+    # ~4 characters per token for English text
+    return len(prompt) // 4 + expected_output_tokens
+
+
+def _retry_after_seconds(error: Exception, attempt: int) -> float:
+    """Honor the server's Retry-After header, else exponential backoff with jitter."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return min(60.0, (2 ** attempt) + random.uniform(0, 1))
+
+
+def _chat_completion(model: str, prompt: str, expected_output_tokens: int = _EXPECTED_OUTPUT_TOKENS) -> str:
+    """
+    Single-prompt chat completion through the shared rate limiter.
+    Retries 429s, timeouts, connection and 5xx errors with backoff; re-raises after OPENAI_MAX_RETRIES.
+    """
+    estimated = _estimate_tokens(prompt, expected_output_tokens)
+    attempt = 0
+    while True:
+        _rate_limiter.acquire(estimated)
+        try:
+            resp = _client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0,
+            )
+        except (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError) as e:
+            if attempt >= OPENAI_MAX_RETRIES:
+                raise
+            delay = _retry_after_seconds(e, attempt)
+            print(f"  ⏳ OpenAI {type(e).__name__}, retrying in {delay:.1f}s (attempt {attempt + 1}/{OPENAI_MAX_RETRIES})")
+            time.sleep(delay)
+            attempt += 1
+            continue
+        usage = getattr(resp, "usage", None)
+        _rate_limiter.settle(estimated, getattr(usage, "total_tokens", None))
+        return resp.choices[0].message.content.strip()
+
+
+# =====================================================================
+# Concurrent execution
+# =====================================================================
+
+# One pool for the whole process, so concurrent user syncs share the same cap
+_llm_executor: Optional[ThreadPoolExecutor] = None
+_llm_executor_lock = threading.Lock()
+
+
+def _get_llm_executor() -> ThreadPoolExecutor:
+    global _llm_executor
+    with _llm_executor_lock:
+        if _llm_executor is None:
+            _llm_executor = ThreadPoolExecutor(
+                max_workers=OPENAI_MAX_CONCURRENCY,
+                thread_name_prefix="GmailLLM"
+            )
+        return _llm_executor
+
+
+def run_concurrently(fn: Callable[..., Any], args_list: List[Tuple]) -> List[Any]:
+    """
+    Run fn(*args) for every args tuple on the shared LLM pool (OPENAI_MAX_CONCURRENCY workers).
+    Results come back in input order; a call that raised yields its exception object instead.
+    fn must not itself call run_concurrently (the pool would deadlock).
+    """
+    if not args_list:
+        return []
+    if len(args_list) == 1 or OPENAI_MAX_CONCURRENCY == 1:
+        results = []
+        for args in args_list:
+            try:
+                results.append(fn(*args))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    executor = _get_llm_executor()
+    futures = [executor.submit(fn, *args) for args in args_list]
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            results.append(e)
+    return results
+
+
 # =====================================================================
 # JSON helper (UPGRADED)
 # =====================================================================
@@ -290,6 +510,31 @@ def _prepare_body_for_llm(body: str, max_chars: int = 3750) -> str:
     )
 
 
+# =====================================================================
+# Result cache helpers
+# =====================================================================
+
+def _cached(kind: str, model: str, template: str, prepared_input: str):
+    """(cache_key, cached_result or None). cache_key is None when no cache is available."""
+    if make_cache_key is None:
+        return None, None
+    try:
+        key = make_cache_key(kind, model, template, prepared_input)
+        return key, cache_get(key, kind)
+    except Exception as e:
+        print(f"  ⚠️  LLM cache lookup failed: {e}")
+        return None, None
+
+
+def _store(cache_key, kind: str, model: str, template: str, result: Dict) -> None:
+    if cache_key is None:
+        return
+    try:
+        cache_put(cache_key, kind, model, template, result)
+    except Exception as e:
+        print(f"  ⚠️  LLM cache write failed: {e}")
+
+
 # =====================================================================
 # Classification + Summary
 # =====================================================================
@@ -303,14 +548,15 @@ def classify_and_summarize(subject: str, body: str) -> Tuple[bool, str]:
         subject=subject or "(no subject)",
         body=prepared or "(no body)",
     )
+    cache_key, cached = _cached(
+        "classify", _CLASSIFY_MODEL, CLASSIFY_PROMPT, f"{subject or '(no subject)'}\n{prepared or '(no body)'}"
+    )
+    if cached is not None:
+        print("  💾 Classification cache hit")
+        return bool(cached.get("networking", False)), cached.get("summary", "")
     try:
         print(f"  🤖 Calling OpenAI API with model: {_CLASSIFY_MODEL}")
-        resp = _client.chat.completions.create(
-            model=_CLASSIFY_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0,
-        )
-        raw = resp.choices[0].message.content.strip()
+        raw = _chat_completion(_CLASSIFY_MODEL, prompt)
         print(f"  📥 OpenAI raw response: {raw[:200]}...")  # Log first 200 chars
     except Exception as e:
         print(f"  ❌ OpenAI API error: {type(e).__name__}: {str(e)}")
@@ -324,7 +570,9 @@ def classify_and_summarize(subject: str, body: str) -> Tuple[bool, str]:
         networking = bool(parsed.get("networking", False))
         summary = parsed.get("summary", "") if networking else ""
         print(f"  📊 Parsed result: networking={networking}, summary='{summary[:50]}...'")
-        return networking, summary.strip()[:400]
+        summary = summary.strip()[:400]
+        _store(cache_key, "classify", _CLASSIFY_MODEL, CLASSIFY_PROMPT, {"networking": networking, "summary": summary})
+        return networking, summary
     except Exception as e:
         print(f"  ❌ JSON parse error: {type(e).__name__}: {str(e)}. JSON text: {json_text[:200]}...")
         return False, ""
@@ -338,13 +586,13 @@ def summarize_email(subject: str, body: str) -> str:
         subject=subject or "(no subject)",
         body=prepared or "(no body)",
     )
+    cache_key, cached = _cached(
+        "summary", _SUMMARY_MODEL, SUMMARY_PROMPT, f"{subject or '(no subject)'}\n{prepared or '(no body)'}"
+    )
+    if cached is not None:
+        return cached.get("summary", "")
     try:
-        resp = _client.chat.completions.create(
-            model=_SUMMARY_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0,
-        )
-        raw = resp.choices[0].message.content.strip()
+        raw = _chat_completion(_SUMMARY_MODEL, prompt)
     except Exception:
         return ""
     json_text = _extract_first_valid_json(raw)
@@ -352,9 +600,98 @@ def summarize_email(subject: str, body: str) -> str:
         return ""
     try:
         parsed = json.loads(json_text)
-        return parsed.get("summary", "").strip()[:400]
+        summary = parsed.get("summary", "").strip()[:400]
     except Exception:
         return ""
+    _store(cache_key, "summary", _SUMMARY_MODEL, SUMMARY_PROMPT, {"summary": summary})
+    return summary
+
+
+def _parse_batch_results(raw: str, count: int) -> Dict[int, Tuple[bool, str]]:
+    """Validated {index: (networking, summary)} from a batch response. Invalid entries are dropped."""
+    json_text = _extract_first_valid_json(raw)
+    if not json_text:
+        return {}
+    try:
+        entries = json.loads(json_text).get("results")
+    except Exception:
+        return {}
+    if not isinstance(entries, list):
+        return {}
+
+    parsed = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        index = entry.get("index")
+        networking = entry.get("networking")
+        summary = entry.get("summary", "")
+        if not isinstance(index, int) or isinstance(index, bool) or not 1 <= index <= count:
+            continue
+        if not isinstance(networking, bool) or not isinstance(summary, str):
+            continue
+        if index in parsed:
+            # Ambiguous: the model answered the same email twice
+            parsed[index] = None
+            continue
+        parsed[index] = (networking, summary.strip()[:400] if networking else "")
+    return {i: r for i, r in parsed.items() if r is not None}
+
+
+def classify_and_summarize_batch(items: List[Tuple[str, str]]) -> List[Tuple[bool, str]]:
+    """
+    classify_and_summarize for several (subject, body) pairs with one OpenAI call per
+    OPENAI_CLASSIFY_BATCH_SIZE emails. Cached items are answered from the cache; items the
+    batch response doesn't validly cover fall back to single classify_and_summarize calls.
+    Results are returned in input order.
+    """
+    if not items:
+        return []
+    if len(items) == 1 or OPENAI_CLASSIFY_BATCH_SIZE == 1 or not OPENAI_API_KEY or _client is None:
+        return [classify_and_summarize(subject, body) for subject, body in items]
+
+    results: List[Optional[Tuple[bool, str]]] = [None] * len(items)
+    pending = []  # (position, subject, prepared, cache_key)
+    for pos, (subject, body) in enumerate(items):
+        prepared = _prepare_body_for_llm(body or "")
+        cache_key, cached = _cached(
+            "classify", _CLASSIFY_MODEL, CLASSIFY_PROMPT, f"{subject or '(no subject)'}\n{prepared or '(no body)'}"
+        )
+        if cached is not None:
+            results[pos] = (bool(cached.get("networking", False)), cached.get("summary", ""))
+        else:
+            pending.append((pos, subject or "(no subject)", prepared or "(no body)", cache_key))
+
+    for start in range(0, len(pending), OPENAI_CLASSIFY_BATCH_SIZE):
+        chunk = pending[start:start + OPENAI_CLASSIFY_BATCH_SIZE]
+        if len(chunk) == 1:
+            continue  # a lone email uses the regular single-email prompt below
+        emails = "\n\n".join(
+            f"=== EMAIL {n} ===\nSubject: {subject}\n\nBody:\n{prepared}"
+            for n, (_, subject, prepared, _) in enumerate(chunk, start=1)
+        )
+        prompt = BATCH_CLASSIFY_PROMPT.format(count=len(chunk), emails=emails)
+        try:
+            print(f"  🤖 Calling OpenAI API with model: {_CLASSIFY_MODEL} (batch of {len(chunk)})")
+            raw = _chat_completion(_CLASSIFY_MODEL, prompt, _EXPECTED_OUTPUT_TOKENS * len(chunk))
+            parsed = _parse_batch_results(raw, len(chunk))
+        except Exception as e:
+            print(f"  ❌ OpenAI batch API error: {type(e).__name__}: {str(e)}")
+            parsed = {}
+
+        for n, (pos, _, _, cache_key) in enumerate(chunk, start=1):
+            if n in parsed:
+                networking, summary = parsed[n]
+                results[pos] = (networking, summary)
+                _store(cache_key, "classify", _CLASSIFY_MODEL, CLASSIFY_PROMPT, {"networking": networking, "summary": summary})
+        if len(parsed) < len(chunk):
+            print(f"  ⚠️  Batch classification covered {len(parsed)}/{len(chunk)} emails, falling back to single calls for the rest")
+
+    # Single-call fallback for anything the batch didn't validly answer
+    for pos, (subject, body) in enumerate(items):
+        if results[pos] is None:
+            results[pos] = classify_and_summarize(subject, body)
+    return results
 
 
 # =====================================================================
@@ -380,13 +717,12 @@ def analyze_thread_for_meeting_full_emails(messages: List[Dict]) -> Dict:
     if not thread_body:
         return default
     prompt = MEETING_PROMPT.format(thread_body=thread_body)
+    # An unchanged thread snapshot is never re-analyzed
+    cache_key, cached = _cached("meeting", _MEETING_MODEL, MEETING_PROMPT, thread_body)
+    if cached is not None:
+        return {"meeting_scheduled": bool(cached.get("meeting_scheduled", False))}
     try:
-        resp = _client.chat.completions.create(
-            model=_MEETING_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0,
-        )
-        raw = resp.choices[0].message.content.strip()
+        raw = _chat_completion(_MEETING_MODEL, prompt)
     except Exception:
         return default
     json_text = _extract_first_valid_json(raw)
@@ -394,6 +730,8 @@ def analyze_thread_for_meeting_full_emails(messages: List[Dict]) -> Dict:
         return default
     try:
         parsed = json.loads(json_text)
-        return {"meeting_scheduled": bool(parsed.get("meeting_scheduled", False))}
+        result = {"meeting_scheduled": bool(parsed.get("meeting_scheduled", False))}
     except Exception:
-        return default
\ No newline at end of file
+        return default
+    _store(cache_key, "meeting", _MEETING_MODEL, MEETING_PROMPT, result)
+    return result
\ No newline at end of file
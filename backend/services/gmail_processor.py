@@ -1,6 +1,6 @@
 # processor.py (copied from GmailPluginRoot/automation)
 import traceback
-from typing import Dict, Any, Optional, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 # Import from local directory (backend/services)
 # Try multiple import strategies for compatibility
@@ -8,69 +8,43 @@ from typing import Dict, Any, Optional, Tuple
 try:
     # Strategy 1: Direct import from same directory (most reliable)
     from gmail_db import (
-        message_exists,
-        upsert_contact,
-        upsert_thread,
-        insert_networking_message,
-        get_thread_networking_status,
-        get_thread_messages_for_analysis,
+        get_known_message_ids,
+        get_thread_states,
+        save_processed_batch,
+        get_meeting_candidate_threads,
         set_thread_meeting_scheduled,
-        recompute_contact_checklist,
         get_user_id_from_email,
         is_gmail_email,
     )
     from gmail_client import fetch_thread_full, get_gmail_service
-    from gmail_llm_client import classify_and_summarize, summarize_email, analyze_thread_for_meeting_full_emails
+    from gmail_llm_client import classify_and_summarize_batch, summarize_email, analyze_thread_for_meeting_full_emails, run_concurrently, OPENAI_CLASSIFY_BATCH_SIZE
 except ImportError:
     try:
         # Strategy 2: Relative import (same package)
         from .gmail_db import (
-            message_exists,
-            upsert_contact,
-            upsert_thread,
-            insert_networking_message,
-            get_thread_networking_status,
-            get_thread_messages_for_analysis,
+            get_known_message_ids,
+            get_thread_states,
+            save_processed_batch,
+            get_meeting_candidate_threads,
             set_thread_meeting_scheduled,
-            recompute_contact_checklist,
             get_user_id_from_email,
             is_gmail_email,
         )
         from .gmail_client import fetch_thread_full, get_gmail_service
-        from .gmail_llm_client import classify_and_summarize, summarize_email, analyze_thread_for_meeting_full_emails
+        from .gmail_llm_client import classify_and_summarize_batch, summarize_email, analyze_thread_for_meeting_full_emails, run_concurrently, OPENAI_CLASSIFY_BATCH_SIZE
     except ImportError:
-        try:
-            # Strategy 3: Absolute import from services package
-            from services.gmail_db import (
-                message_exists,
-                upsert_contact,
-                upsert_thread,
-                insert_networking_message,
-                get_thread_networking_status,
-                get_thread_messages_for_analysis,
-                set_thread_meeting_scheduled,
-                recompute_contact_checklist,
-                get_user_id_from_email,
-                is_gmail_email,
-            )
-            from services.gmail_client import fetch_thread_full, get_gmail_service
-            from services.gmail_llm_client import classify_and_summarize, summarize_email, analyze_thread_for_meeting_full_emails
-        except ImportError:
-            # Strategy 4: Fallback to original imports if running from GmailPluginRoot
-            from db import (
-                message_exists,
-                upsert_contact,
-                upsert_thread,
-                insert_networking_message,
-                get_thread_networking_status,
-                get_thread_messages_for_analysis,
-                set_thread_meeting_scheduled,
-                recompute_contact_checklist,
-                get_user_id_from_email,
-                is_gmail_email,
-            )
-            from gmail_client import fetch_thread_full, get_gmail_service
-            from llm_client import classify_and_summarize, summarize_email, analyze_thread_for_meeting_full_emails
+        # Strategy 3: Absolute import from services package
+        from services.gmail_db import (
+            get_known_message_ids,
+            get_thread_states,
+            save_processed_batch,
+            get_meeting_candidate_threads,
+            set_thread_meeting_scheduled,
+            get_user_id_from_email,
+            is_gmail_email,
+        )
+        from services.gmail_client import fetch_thread_full, get_gmail_service
+        from services.gmail_llm_client import classify_and_summarize_batch, summarize_email, analyze_thread_for_meeting_full_emails, run_concurrently, OPENAI_CLASSIFY_BATCH_SIZE
 
 
 # ================================================================
@@ -113,243 +87,299 @@ def _contact_name(msg: Dict[str, Any], email: str) -> Optional[str]:
     return None
 
 
-def _thread_has_meeting(thread_id: str, user_id: int) -> bool:
+def _run_llm_step(kind: str, inputs: List[Tuple[str, str]]) -> List[Any]:
     """
-    True if thread already has meeting_scheduled = true for this user.
+    One LLM task of the processing pipeline over (subject, body) pairs.
+    "classify" → [(bool, summary)] (one request per OPENAI_CLASSIFY_BATCH_SIZE emails),
+    "summarize" → [summary].
     """
-    from db import get_session, text
-    if not thread_id or not user_id:
-        return False
-
-    with get_session() as session:
-        result = session.execute(
-            text("SELECT meeting_scheduled FROM gmail_threads WHERE thread_id = :thread_id AND user_id = :user_id"),
-            {"thread_id": thread_id, "user_id": user_id}
-        )
-        row = result.fetchone()
-        return bool(row and row[0] == True)
+    if kind == "classify":
+        return classify_and_summarize_batch(inputs)
+    return [summarize_email(subject, body) for subject, body in inputs]
 
 
 # ================================================================
-# PROCESSOR: Main pipeline for each Gmail message
+# PROCESSOR: Batch pipeline for a fetched list of Gmail messages
 # ================================================================
 
-def process_message(msg: Dict[str, Any], user_id: int, gmail_email: str) -> bool:
+def process_messages(
+    msgs: List[Dict[str, Any]],
+    user_id: int,
+    gmail_email: str,
+    get_service: Optional[Callable[[], Any]] = None,
+) -> Dict[str, Any]:
     """
-    Full networking message processing pipeline.
+    Networking message processing pipeline for a whole batch of fetched messages.
     Includes:
-      ✔ classification
-      ✔ summaries
-      ✔ DB persistence
+      ✔ classification (first message of a new thread)
+      ✔ summaries (later messages of networking threads)
+      ✔ DB persistence (one transaction for the whole batch)
       ✔ checklist recomputation
       ✔ inbound-first logic
-      ✔ meeting detection (full thread)
-    
+      ✔ meeting detection (full thread, once per eligible thread)
+
+    Known gmail_ids and thread statuses are resolved with one query each up front;
+    thread statuses decided earlier in the batch are reused for later messages.
+    LLM calls run concurrently on the shared, rate-limited pool in gmail_llm_client.
+
     Args:
-        msg: Gmail message dictionary
+        msgs: Gmail message dictionaries (see gmail_client._parse_message)
         user_id: Ripple user_id (must be provided, validated before calling)
+        gmail_email: The authenticated Gmail account email address
+        get_service: Returns the user's Gmail API service (called on the thread that uses it).
+            Defaults to the local file-based get_gmail_service() of the standalone plugin.
+
+    Returns:
+        Dict with networking_messages count, networking gmail_ids, per-message errors,
+        failed_ids (gmail_ids that hit an error and were not stored) and saved (False if
+        the batch could not be looked up or persisted; callers must not advance their
+        sync cursor then)
     """
+    result = {"networking_messages": 0, "networking_ids": [], "errors": [], "failed_ids": [], "saved": True}
+    if not msgs or not user_id:
+        return result
+
+    # 1. Drop messages without ids, duplicates and messages already processed for this user
+    candidates = {}
+    for msg in msgs:
+        gmail_id = msg.get("id")
+        if gmail_id and msg.get("thread_id") and not msg.get("metadata_only"):
+            candidates.setdefault(gmail_id, msg)
+    if not candidates:
+        return result
 
-    gmail_id = msg.get("id")
-    thread_id = msg.get("thread_id")
-
-    if not gmail_id or not user_id:
-        return False
-
-    # 1. Skip if already processed for this user
     try:
-        if message_exists(gmail_id, user_id):
-            return False
-    except Exception:
+        known_ids = get_known_message_ids(list(candidates), user_id)
+    except Exception as e:
         traceback.print_exc()
+        result["errors"].append(f"Known message lookup failed: {e}")
+        result["saved"] = False
+        return result
+
+    # Oldest first, so a thread is classified on its opening message
+    pending = sorted(
+        (m for gid, m in candidates.items() if gid not in known_ids),
+        key=lambda m: int(m.get("internal_date", 0) or 0)
+    )
+    if not pending:
+        return result
 
-    if not thread_id:
-        return False
-
-    # 2. Fetch known networking status for this user
+    # 2. Known networking status for every thread in the batch
     try:
-        thread_status = get_thread_networking_status(thread_id, user_id)
-    except Exception:
+        thread_states = get_thread_states([m["thread_id"] for m in pending], user_id)
+    except Exception as e:
         traceback.print_exc()
-        thread_status = None
+        result["errors"].append(f"Thread status lookup failed: {e}")
+        result["saved"] = False
+        return result
+    thread_status: Dict[str, Optional[bool]] = {
+        tid: state["is_networking"] for tid, state in thread_states.items()
+    }
 
     # 3. Determine direction + counterparty email
-    try:
-        direction, contact_email = _direction_and_contact(msg, gmail_email)
-        if not direction or not contact_email:
-            return False
-    except Exception:
-        traceback.print_exc()
-        return False
-
-    subject = msg.get("subject", "") or ""
-    body = msg.get("body_text", "") or ""
-    ts = int(msg.get("internal_date", 0) or 0)
-
-    # ----------------------------------------------------------
-    # Case A: Thread known to be NOT networking
-    # ----------------------------------------------------------
-    if thread_status is False:
-        return False
-
-    # ----------------------------------------------------------
-    # Case B: Thread already networking → summarize this email
-    # ----------------------------------------------------------
-    if thread_status is True:
-
-        try:
-            summary = summarize_email(subject, body)
-        except Exception:
-            traceback.print_exc()
-            return False
-
-        if not summary:
-            return False
-
-        # Update metadata
-        try:
-            name = _contact_name(msg, contact_email)
-            upsert_contact(name=name, email=contact_email, last_contact_ts=ts, user_id=user_id)
-            upsert_thread(
-                thread_id=thread_id,
-                contact_email=contact_email,
-                subject=subject,
-                message_ts=ts,
-                is_networking=True,
-                user_id=user_id,
-            )
-        except Exception:
-            traceback.print_exc()
-            return False
-
+    items: List[Dict[str, Any]] = []
+    for msg in pending:
         try:
-            insert_networking_message(
-                gmail_id=gmail_id,
-                thread_id=thread_id,
-                contact_email=contact_email,
-                timestamp=ts,
-                direction=direction,
-                summary=summary,
-                user_id=user_id,
-            )
-        except Exception:
-            traceback.print_exc()
-            return False
-
-        # Recompute checklist
-        try:
-            recompute_contact_checklist(contact_email, user_id)
-        except Exception:
+            direction, contact_email = _direction_and_contact(msg, gmail_email)
+            if not direction or not contact_email:
+                continue
+        except Exception as e:
             traceback.print_exc()
+            result["errors"].append(str(e))
+            result["failed_ids"].append(msg["id"])
+            continue
+
+        # ----------------------------------------------------------
+        # Case A: Thread known to be NOT networking
+        # ----------------------------------------------------------
+        if thread_status.get(msg["thread_id"]) is False:
+            continue
+
+        items.append({
+            "msg": msg,
+            "direction": direction,
+            "contact_email": contact_email,
+            "subject": msg.get("subject", "") or "",
+            "body": msg.get("body_text", "") or "",
+            "ts": int(msg.get("internal_date", 0) or 0),
+        })
+
+    # 4. LLM stage (concurrent, rate limited - see gmail_llm_client.run_concurrently)
+    #    Round 1: Case C - classify the opening message of every new thread
+    #             Case B - summarize messages of threads already known to be networking
+    #    Round 2: summarize the remaining messages of threads classified as networking in round 1
+    classify_idx: Dict[str, int] = {}
+    for i, item in enumerate(items):
+        thread_id = item["msg"]["thread_id"]
+        if thread_status.get(thread_id) is None and thread_id not in classify_idx:
+            classify_idx[thread_id] = i
+    summary_idx = [i for i, item in enumerate(items) if thread_status.get(item["msg"]["thread_id"]) is True]
+
+    # Each task is (kind, [item indices]); classification is grouped for batch-prompt mode
+    to_classify = list(classify_idx.values())
+    tasks = [
+        ("classify", to_classify[start:start + OPENAI_CLASSIFY_BATCH_SIZE])
+        for start in range(0, len(to_classify), OPENAI_CLASSIFY_BATCH_SIZE)
+    ] + [("summarize", [i]) for i in summary_idx]
+    outcomes: Dict[int, Tuple[bool, str]] = {}
+    classified = set(to_classify)
+    for _round in (1, 2):
+        results = run_concurrently(
+            _run_llm_step,
+            [(kind, [(items[i]["subject"], items[i]["body"]) for i in indices]) for kind, indices in tasks]
+        )
+        for (kind, indices), res in zip(tasks, results):
+            if isinstance(res, Exception):
+                result["errors"].append(str(res))
+                continue
+            for i, item_res in zip(indices, res):
+                item = items[i]
+                if kind == "classify":
+                    is_networking, summary = item_res
+                    print(f"  🔍 Classified email from {item['contact_email']}: networking={is_networking}, subject='{item['subject'][:50]}...'")
+                    # Later messages of this thread reuse the decision
+                    thread_status[item["msg"]["thread_id"]] = bool(is_networking)
+                    outcomes[i] = (bool(is_networking), summary)
+                else:
+                    outcomes[i] = (True, item_res)
+        # Round 2 work: messages of newly classified networking threads
+        tasks = [
+            ("summarize", [i]) for i, item in enumerate(items)
+            if i not in outcomes and i not in classified
+            and item["msg"]["thread_id"] in classify_idx
+            and thread_status.get(item["msg"]["thread_id"]) is True
+        ]
+        if not tasks:
+            break
+
+    # Messages without an outcome whose thread isn't known to be non-networking hit an
+    # LLM error (their classification or summary failed) and are not stored
+    result["failed_ids"].extend(
+        item["msg"]["id"] for i, item in enumerate(items)
+        if i not in outcomes and thread_status.get(item["msg"]["thread_id"]) is not False
+    )
 
-        # Attempt meeting detection
-        _maybe_detect_meeting(thread_id, contact_email, user_id, gmail_email)
-
-        return True
-
-    # ----------------------------------------------------------
-    # Case C: New thread → classify
-    # ----------------------------------------------------------
+    # 5. Build rows in chronological order
+    contacts: List[Dict[str, Any]] = []
+    threads: List[Dict[str, Any]] = []
+    messages: List[Dict[str, Any]] = []
+    networking_threads: Dict[str, str] = {}
+
+    for i, item in enumerate(items):
+        if i not in outcomes:
+            continue
+        is_networking, summary = outcomes[i]
+        msg = item["msg"]
+        thread_id = msg["thread_id"]
+        contact_email = item["contact_email"]
+        ts = item["ts"]
+
+        # Summarized follow-ups without a summary are not stored
+        if i not in classified and not summary:
+            continue
+
+        # Always persist thread networking status
+        threads.append({
+            "thread_id": thread_id,
+            "contact_email": contact_email,
+            "subject": item["subject"],
+            "message_ts": ts,
+            "is_networking": is_networking,
+        })
+
+        # Not networking → we're done (thread is recorded, but no contact row)
+        if not is_networking:
+            continue
+
+        # For networking threads, we need a contact row (FK)
+        contacts.append({
+            "name": _contact_name(msg, contact_email),
+            "email": contact_email,
+            "last_contact_ts": ts,
+        })
+        messages.append({
+            "gmail_id": msg["id"],
+            "thread_id": thread_id,
+            "contact_email": contact_email,
+            "timestamp": ts,
+            "direction": item["direction"],
+            "summary": summary,
+        })
+        networking_threads[thread_id] = contact_email
+
+    # 6. Persist everything (contacts, threads, messages, checklists) in one transaction
     try:
-        is_networking, summary = classify_and_summarize(subject, body)
-        print(f"  🔍 Classified email from {contact_email}: networking={is_networking}, subject='{subject[:50]}...'")
-    except Exception:
+        save_processed_batch(user_id, contacts, threads, messages)
+    except Exception as e:
         traceback.print_exc()
-        return False
+        result["errors"].append(f"Saving processed messages failed: {e}")
+        result["saved"] = False
+        return result
+
+    result["networking_messages"] = len(messages)
+    result["networking_ids"] = [m["gmail_id"] for m in messages]
 
-    # For networking threads, we need a contact row (FK);
-    # for non-networking, we do NOT create a contact at all.
-    if is_networking:
-        print(f"  ✅ Creating Gmail contact for {contact_email} (networking thread)")
+    # 7. Meeting detection for threads that now have both directions and no meeting yet
+    if networking_threads:
         try:
-            name = _contact_name(msg, contact_email)
-            upsert_contact(name=name, email=contact_email, last_contact_ts=ts, user_id=user_id)
+            meeting_candidates = get_meeting_candidate_threads(list(networking_threads), user_id)
         except Exception:
             traceback.print_exc()
-            return False
+            meeting_candidates = []
+        run_concurrently(_maybe_detect_meeting, [
+            (
+                candidate["thread_id"],
+                candidate["contact_email"] or networking_threads[candidate["thread_id"]],
+                user_id,
+                gmail_email,
+                get_service,
+            )
+            for candidate in meeting_candidates
+        ])
 
-    # Always persist thread networking status
-    try:
-        upsert_thread(
-            thread_id=thread_id,
-            contact_email=contact_email,
-            subject=subject,
-            message_ts=ts,
-            is_networking=is_networking,
-            user_id=user_id,
-        )
-    except Exception:
-        traceback.print_exc()
-        return False
+    return result
 
-    # Not networking → we're done (thread is recorded, but no contact row)
-    if not is_networking:
-        return False
 
-    # Networking → store message
-    try:
-        insert_networking_message(
-            gmail_id=gmail_id,
-            thread_id=thread_id,
-            contact_email=contact_email,
-            timestamp=ts,
-            direction=direction,
-            summary=summary,
-            user_id=user_id,
-        )
-    except Exception:
-        traceback.print_exc()
-        return False
-
-    # Checklist update
-    try:
-        recompute_contact_checklist(contact_email, user_id)
-    except Exception:
-        traceback.print_exc()
-
-    # Meeting detection
-    _maybe_detect_meeting(thread_id, contact_email, user_id, gmail_email)
+def process_message(msg: Dict[str, Any], user_id: int, gmail_email: str) -> bool:
+    """
+    Full networking message processing pipeline for a single message.
+    Thin wrapper over process_messages(); prefer the batch API when processing a sync.
 
-    return True
+    Args:
+        msg: Gmail message dictionary
+        user_id: Ripple user_id (must be provided, validated before calling)
+    """
+    if not msg or not user_id:
+        return False
+    return process_messages([msg], user_id, gmail_email)["networking_messages"] > 0
 
 
 # ================================================================
 # MEETING DETECTION WRAPPER
 # ================================================================
 
-def _maybe_detect_meeting(thread_id: str, contact_email: str, user_id: int, gmail_email: str) -> None:
+def _maybe_detect_meeting(
+    thread_id: str,
+    contact_email: str,
+    user_id: int,
+    gmail_email: str,
+    get_service: Optional[Callable[[], Any]] = None,
+) -> None:
     """
-    Run meeting detection only when:
-      - thread has >=1 sent AND >=1 received networking message
-      - meeting not already logged
+    Run meeting detection on the full Gmail thread.
+    Callers only pass threads from get_meeting_candidate_threads(), i.e. threads with
+    >=1 sent AND >=1 received networking message and no meeting logged yet.
     """
     try:
-        # Already has meeting → done
-        if _thread_has_meeting(thread_id, user_id):
-            return
-
-        msgs = get_thread_messages_for_analysis(thread_id, user_id)
-        if not msgs:
-            return
-
-        has_sent = any(m["direction"] == "sent" for m in msgs)
-        has_received = any(m["direction"] == "received" for m in msgs)
-
-        if not (has_sent and has_received):
-            return
-
         # Fetch full Gmail thread for LLM
-        service = get_gmail_service()
+        service = get_service() if get_service else get_gmail_service()
         full_thread = fetch_thread_full(service, thread_id, gmail_email)
 
         result = analyze_thread_for_meeting_full_emails(full_thread)
         if result.get("meeting_scheduled"):
 
-            # Update thread → mark meeting scheduled
+            # Update thread → mark meeting scheduled (also sets the contact's checklist flag)
             set_thread_meeting_scheduled(thread_id, user_id)
 
-            # Recompute contact-level checklist
-            recompute_contact_checklist(contact_email, user_id)
-
     except Exception:
-        traceback.print_exc()
\ No newline at end of file
+        traceback.print_exc()
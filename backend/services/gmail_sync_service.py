@@ -2,22 +2,28 @@
 # Server-side Gmail sync service for Ripple backend
 
 import os
+import itertools
 import json
+import random
 import threading
 import time
-from typing import Optional, Dict, Any
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Set
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 
+import httplib2
+import requests
+from google.auth.exceptions import RefreshError
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 from google_auth_oauthlib.flow import Flow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
-from models.database_functions import get_session, User, Contact
-from services.service_api import create_contact, update_contact_service
-from sqlalchemy import text, select
+from models.database_functions import get_session, User, Contact, DATABASE_URL
+from sqlalchemy import text, select, insert, update, func, bindparam
 
 # Gmail API scopes
 SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
@@ -116,8 +122,11 @@ def handle_oauth_callback(code: str, state: str) -> Dict[str, Any]:
             token_uri=credentials.token_uri,
             client_id=credentials.client_id,
             client_secret=credentials.client_secret,
-            scopes=credentials.scopes
+            scopes=credentials.scopes,
+            expiry=credentials.expiry
         )
+        # Reconnected: drop any cached (possibly revoked) credentials
+        evict_gmail_service(user_id)
         
         return {"success": True, "user_id": user_id}
     
@@ -133,9 +142,10 @@ def store_gmail_tokens(
     token_uri: str,
     client_id: str,
     client_secret: str,
-    scopes: list
+    scopes: list,
+    expiry: Optional[datetime] = None
 ):
-    """Store Gmail OAuth tokens in database."""
+    """Store Gmail OAuth tokens in database (expiry is naive UTC, as on google Credentials)."""
     with get_session() as session:
         # Check if tokens already exist
         result = session.execute(
@@ -150,7 +160,8 @@ def store_gmail_tokens(
             "token_uri": token_uri,
             "client_id": client_id,
             "client_secret": client_secret,
-            "scopes": scopes
+            "scopes": scopes,
+            "expiry": expiry.isoformat() if expiry else None
         })
         
         if existing:
@@ -183,33 +194,205 @@ def store_gmail_tokens(
             )
 
 
-def get_gmail_credentials(user_id: int) -> Optional[Credentials]:
-    """Get Gmail credentials for user from database."""
+# Columns added to gmail_oauth_tokens after the original table script
+# (see scripts/add_*.sql). Checked once per process before the first sync.
+_SYNC_STATE_COLUMNS = [
+    ("history_id", "VARCHAR(64)"),
+    ("sync_interval_seconds", "INTEGER"),
+    ("next_sync_at", "TIMESTAMP"),
+    ("retry_message_ids", "TEXT"),
+]
+_sync_columns_checked = False
+
+
+def _ensure_gmail_sync_columns() -> None:
+    """Ensure sync-state columns exist in gmail_oauth_tokens."""
+    global _sync_columns_checked
+    if _sync_columns_checked:
+        return
+    try:
+        with get_session() as session:
+            if "postgresql" in DATABASE_URL.lower():
+                for col_name, col_type in _SYNC_STATE_COLUMNS:
+                    session.execute(text(
+                        f"ALTER TABLE gmail_oauth_tokens ADD COLUMN IF NOT EXISTS {col_name} {col_type}"
+                    ))
+            else:
+                result = session.execute(text("PRAGMA table_info(gmail_oauth_tokens)"))
+                columns = [row[1] for row in result.fetchall()]
+                for col_name, col_type in _SYNC_STATE_COLUMNS:
+                    if col_name not in columns:
+                        session.execute(text(
+                            f"ALTER TABLE gmail_oauth_tokens ADD COLUMN {col_name} {col_type}"
+                        ))
+        _sync_columns_checked = True
+    except Exception as e:
+        print(f"Warning: Could not auto-migrate gmail_oauth_tokens sync columns: {e}")
+
+
+def _get_sync_state(user_id: int) -> Dict[str, Any]:
+    """
+    Get the stored sync state for user.
+    history_id is None if never synced; sync_interval_seconds is None until the first adaptive update;
+    retry_message_ids maps gmail_ids that failed processing to their failed attempts.
+    """
     with get_session() as session:
         result = session.execute(
-            text("SELECT tokens_json FROM gmail_oauth_tokens WHERE user_id = :user_id"),
+            text("""
+                SELECT history_id, sync_interval_seconds, retry_message_ids
+                FROM gmail_oauth_tokens
+                WHERE user_id = :user_id
+            """),
             {"user_id": user_id}
         )
         row = result.fetchone()
-        
-        if not row:
+        return {
+            "history_id": row[0] if row and row[0] else None,
+            "sync_interval_seconds": row[1] if row and row[1] else None,
+            "retry_message_ids": json.loads(row[2]) if row and row[2] else {},
+        }
+
+
+def _next_sync_interval(current: Optional[int], messages_processed: int, networking_messages: int) -> int:
+    """
+    Adapt a user's poll interval to their mailbox activity.
+    
+    - New networking mail: poll again soon (minimum interval)
+    - Other new mail: go back to the base interval
+    - Nothing new: double the interval, up to the maximum
+    """
+    current = current or SYNC_INTERVAL_SECONDS
+    if networking_messages > 0:
+        return SYNC_MIN_INTERVAL_SECONDS
+    if messages_processed > 0:
+        return SYNC_INTERVAL_SECONDS
+    return min(max(current * 2, SYNC_MIN_INTERVAL_SECONDS), SYNC_MAX_INTERVAL_SECONDS)
+
+
+def _to_epoch(value) -> Optional[float]:
+    """Convert a naive-UTC TIMESTAMP column value (datetime, or str on SQLite) to epoch seconds."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
             return None
-        
-        tokens_data = json.loads(row[0])
-        
-        credentials = Credentials(
-            token=tokens_data["token"],
-            refresh_token=tokens_data.get("refresh_token"),
-            token_uri=tokens_data["token_uri"],
-            client_id=tokens_data["client_id"],
-            client_secret=tokens_data["client_secret"],
-            scopes=tokens_data["scopes"]
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+# ============================================================================
+# Per-user Gmail credential / service cache
+# ============================================================================
+
+# Refresh access tokens this long before they expire
+TOKEN_REFRESH_MARGIN_SECONDS = int(os.getenv("GMAIL_TOKEN_REFRESH_MARGIN_SECONDS", "300"))
+# Built Gmail service objects kept per worker thread
+_MAX_SERVICES_PER_THREAD = 32
+
+# One pooled requests.Session for every token refresh in the process
+_refresh_transport = Request(requests.Session())
+
+# user_id -> {"credentials": Credentials, "generation": int, "lock": Lock}
+_credentials_cache: Dict[int, Dict[str, Any]] = {}
+_credentials_cache_lock = threading.Lock()
+_cache_generation = itertools.count(1)
+
+# googleapiclient / httplib2 objects are not thread-safe, so each thread keeps its own
+# httplib2.Http (shared by every user synced on that thread) and its own service per user
+_thread_local = threading.local()
+
+
+def _credentials_from_tokens(tokens_data: Dict[str, Any]) -> Credentials:
+    expiry = None
+    if tokens_data.get("expiry"):
+        try:
+            expiry = datetime.fromisoformat(tokens_data["expiry"])
+        except ValueError:
+            expiry = None
+    return Credentials(
+        token=tokens_data["token"],
+        refresh_token=tokens_data.get("refresh_token"),
+        token_uri=tokens_data["token_uri"],
+        client_id=tokens_data["client_id"],
+        client_secret=tokens_data["client_secret"],
+        scopes=tokens_data["scopes"],
+        expiry=expiry
+    )
+
+
+def _load_credentials(user_id: int) -> Optional[Credentials]:
+    """Load Gmail credentials for user from database."""
+    with get_session() as session:
+        result = session.execute(
+            text("SELECT tokens_json FROM gmail_oauth_tokens WHERE user_id = :user_id"),
+            {"user_id": user_id}
         )
-        
-        # Refresh if expired
-        if credentials.expired and credentials.refresh_token:
+        row = result.fetchone()
+    
+    if not row:
+        return None
+    return _credentials_from_tokens(json.loads(row[0]))
+
+
+def _needs_refresh(credentials: Credentials) -> bool:
+    """True if the access token is unknown-age or expires within the refresh margin."""
+    if not credentials.refresh_token:
+        return False
+    if not credentials.token or credentials.expiry is None:
+        return True
+    # Credentials.expiry is naive UTC
+    return (credentials.expiry - datetime.utcnow()).total_seconds() < TOKEN_REFRESH_MARGIN_SECONDS
+
+
+def evict_gmail_service(user_id: int) -> None:
+    """Drop cached credentials/services for user (re-auth, revocation, 401)."""
+    with _credentials_cache_lock:
+        _credentials_cache.pop(user_id, None)
+
+
+def _is_auth_error(error: Exception) -> bool:
+    if isinstance(error, RefreshError):
+        return True
+    return isinstance(error, HttpError) and getattr(error.resp, "status", None) == 401
+
+
+def _get_credentials_entry(user_id: int) -> Optional[Dict[str, Any]]:
+    with _credentials_cache_lock:
+        entry = _credentials_cache.get(user_id)
+    if entry is not None:
+        return entry
+    
+    credentials = _load_credentials(user_id)
+    if credentials is None:
+        return None
+    with _credentials_cache_lock:
+        # Another thread may have loaded it meanwhile; keep the first one
+        entry = _credentials_cache.setdefault(user_id, {
+            "credentials": credentials,
+            "generation": next(_cache_generation),
+            "lock": threading.Lock(),
+        })
+    return entry
+
+
+def get_gmail_credentials(user_id: int) -> Optional[Credentials]:
+    """
+    Get Gmail credentials for user (cached per process).
+    Tokens are refreshed shortly before expiry and the refreshed token is persisted.
+    Returns None if the user has no tokens or the grant was revoked.
+    """
+    entry = _get_credentials_entry(user_id)
+    if entry is None:
+        return None
+    
+    with entry["lock"]:
+        credentials = entry["credentials"]
+        if _needs_refresh(credentials):
             try:
-                credentials.refresh(Request())
+                credentials.refresh(_refresh_transport)
                 # Update stored token
                 store_gmail_tokens(
                     user_id=user_id,
@@ -218,28 +401,60 @@ def get_gmail_credentials(user_id: int) -> Optional[Credentials]:
                     token_uri=credentials.token_uri,
                     client_id=credentials.client_id,
                     client_secret=credentials.client_secret,
-                    scopes=credentials.scopes
+                    scopes=credentials.scopes,
+                    expiry=credentials.expiry
                 )
+            except RefreshError as e:
+                # Revoked / invalid grant: forget the cached entry so reconnecting starts clean
+                print(f"Error refreshing token for user {user_id} (grant revoked or invalid): {e}")
+                evict_gmail_service(user_id)
+                return None
             except Exception as e:
                 print(f"Error refreshing token for user {user_id}: {e}")
                 return None
-        
-        return credentials
+    
+    return credentials
 
 
 def get_gmail_service_for_user(user_id: int):
-    """Get authenticated Gmail service for user."""
+    """
+    Get authenticated Gmail service for user.
+    Services are built once per user per thread and reused until the user's
+    credentials are evicted; all users on a thread share one HTTP connection pool.
+    """
     credentials = get_gmail_credentials(user_id)
     if not credentials:
         raise ValueError(f"No Gmail credentials found for user {user_id}")
+    with _credentials_cache_lock:
+        entry = _credentials_cache.get(user_id)
+    generation = entry["generation"] if entry else 0
     
-    return build("gmail", "v1", credentials=credentials)
+    services = getattr(_thread_local, "services", None)
+    if services is None:
+        services = _thread_local.services = {}
+        _thread_local.http = httplib2.Http(timeout=60)
+    
+    cached = services.get(user_id)
+    if cached and cached[0] == generation:
+        return cached[1]
+    
+    service = build(
+        "gmail", "v1",
+        http=AuthorizedHttp(credentials, http=_thread_local.http),
+        cache_discovery=False
+    )
+    services.pop(user_id, None)
+    if len(services) >= _MAX_SERVICES_PER_THREAD:
+        services.pop(next(iter(services)))
+    services[user_id] = (generation, service)
+    return service
 
 
 def sync_gmail_for_user(user_id: int) -> Dict[str, Any]:
     """
     Sync Gmail messages for a user.
     This is the main function that processes emails and stores them in the database.
+    Manual and background syncs for the same user never run at the same time.
     
     Args:
         user_id: Ripple user ID
@@ -247,6 +462,16 @@ def sync_gmail_for_user(user_id: int) -> Dict[str, Any]:
     Returns:
         Dict with sync status and statistics
     """
+    lock = _get_user_sync_lock(user_id)
+    if not lock.acquire(blocking=False):
+        return {"success": False, "error": "A Gmail sync is already in progress for this user"}
+    try:
+        return _sync_gmail_for_user_locked(user_id)
+    finally:
+        lock.release()
+
+
+def _sync_gmail_for_user_locked(user_id: int) -> Dict[str, Any]:
     try:
         # Get Gmail service
         service = get_gmail_service_for_user(user_id)
@@ -273,8 +498,15 @@ def sync_gmail_for_user(user_id: int) -> Dict[str, Any]:
         
         # Strategy 1: Try direct import (same directory, most reliable)
         try:
-            from gmail_processor import process_message
-            from gmail_client import fetch_recent_messages
+            from gmail_processor import process_messages
+            from gmail_db import get_known_message_ids
+            from gmail_client import (
+                list_recent_message_ids,
+                fetch_messages_by_ids,
+                fetch_history_message_ids,
+                get_current_history_id,
+                HistoryCursorExpiredError,
+            )
             plugin_imported = True
             print("✅ Imported Gmail plugin from direct imports")
         except ImportError as e:
@@ -282,8 +514,15 @@ def sync_gmail_for_user(user_id: int) -> Dict[str, Any]:
             
             # Strategy 2: Try relative import (same package)
             try:
-                from .gmail_processor import process_message
-                from .gmail_client import fetch_recent_messages
+                from .gmail_processor import process_messages
+                from .gmail_db import get_known_message_ids
+                from .gmail_client import (
+                    list_recent_message_ids,
+                    fetch_messages_by_ids,
+                    fetch_history_message_ids,
+                    get_current_history_id,
+                    HistoryCursorExpiredError,
+                )
                 plugin_imported = True
                 print("✅ Imported Gmail plugin from relative imports")
             except ImportError as e2:
@@ -291,80 +530,92 @@ def sync_gmail_for_user(user_id: int) -> Dict[str, Any]:
                 
                 # Strategy 3: Try absolute import from services package
                 try:
-                    from services.gmail_processor import process_message
-                    from services.gmail_client import fetch_recent_messages
+                    from services.gmail_processor import process_messages
+                    from services.gmail_db import get_known_message_ids
+                    from services.gmail_client import (
+                        list_recent_message_ids,
+                        fetch_messages_by_ids,
+                        fetch_history_message_ids,
+                        get_current_history_id,
+                        HistoryCursorExpiredError,
+                    )
                     plugin_imported = True
                     print("✅ Imported Gmail plugin from services package")
                 except ImportError as e3:
                     import_error_messages.append(f"Services package import failed: {e3}")
-                    
-                    # Strategy 4: Try importing from GmailPluginRoot/automation (for local dev)
-                    plugin_paths = [
-                        Path(__file__).parent.parent.parent / "GmailPluginRoot" / "automation",
-                        Path(__file__).parent.parent / "GmailPluginRoot" / "automation",
-                    ]
-                    
-                    for plugin_path in plugin_paths:
-                        if plugin_path.exists() and str(plugin_path) not in sys.path:
-                            sys.path.insert(0, str(plugin_path))
-                            try:
-                                from processor import process_message
-                                from gmail_client import fetch_recent_messages
-                                plugin_imported = True
-                                print(f"✅ Imported Gmail plugin from {plugin_path}")
-                                break
-                            except ImportError as e4:
-                                import_error_messages.append(f"GmailPluginRoot import failed: {e4}")
-                                continue
         
         if not plugin_imported:
             error_msg = "Gmail plugin modules not found. Import attempts:\n" + "\n".join(import_error_messages)
             print(f"❌ {error_msg}")
-            return {"success": False, "error": "Gmail plugin modules not found. Please ensure Gmail plugin files are in backend/services/ or GmailPluginRoot/automation exists."}
+            return {"success": False, "error": "Gmail plugin modules not found. Please ensure Gmail plugin files are in backend/services/."}
         
-        # Fetch recent messages
-        messages = []
+        # Fetch new messages: incremental via History API when we have a cursor,
+        # otherwise (first sync or expired cursor) a bounded full rescan
+        _ensure_gmail_sync_columns()
+        sync_state = _get_sync_state(user_id)
+        history_cursor = sync_state["history_id"]
+        new_history_id = None
+        message_ids = []
+        sync_mode = "incremental"
         
-        # Fetch inbound-only from Primary category
-        inbox_primary = fetch_recent_messages(
-            service,
-            label_ids=["INBOX"],
-            query="category:primary",
-        )
+        if history_cursor:
+            try:
+                message_ids, new_history_id = fetch_history_message_ids(service, history_cursor)
+                print(f"📬 Incremental sync: {len(message_ids)} new/changed messages since historyId {history_cursor}")
+            except HistoryCursorExpiredError as e:
+                print(f"⚠️  {e} - falling back to full rescan")
+                history_cursor = None
         
-        # Fetch outbound messages from Sent
-        sent_msgs = fetch_recent_messages(
-            service,
-            label_ids=["SENT"],
-            query=None,
-        )
+        if not history_cursor:
+            sync_mode = "full"
+            # Take the cursor BEFORE listing so nothing arriving mid-scan is missed
+            new_history_id = get_current_history_id(service)
+            
+            # Inbound-only from Primary category, plus outbound from Sent
+            inbox_ids = list_recent_message_ids(service, label_ids=["INBOX"], query="category:primary")
+            sent_ids = list_recent_message_ids(service, label_ids=["SENT"], query=None)
+            message_ids = list(dict.fromkeys(inbox_ids + sent_ids))
+            
+            print(f"📬 Listed {len(inbox_ids)} inbox messages and {len(sent_ids)} sent messages (unique: {len(message_ids)})")
         
-        messages.extend(inbox_primary)
-        messages.extend(sent_msgs)
+        # Messages that failed processing on earlier runs are fetched again
+        retry_ids = sync_state["retry_message_ids"]
+        if retry_ids:
+            message_ids = list(dict.fromkeys(message_ids + list(retry_ids)))
+            print(f"🔁 Retrying {len(retry_ids)} previously failed messages")
         
-        print(f"📬 Fetched {len(inbox_primary)} inbox messages and {len(sent_msgs)} sent messages (total: {len(messages)})")
+        # Already-stored messages only need headers; new ones are fetched in full.
+        # Both go through Gmail batch requests.
+        known_ids = get_known_message_ids(message_ids, user_id)
+        messages = fetch_messages_by_ids(service, message_ids, known_ids=known_ids)
+        print(f"📬 Fetched {len(messages)} messages ({len(known_ids)} already stored, metadata only)")
         
-        # Process messages
-        networking_count = 0
+        # Process messages (one batch: set-based lookups, one write transaction)
         errors = []
         processed_emails = set()
         
         for msg in messages:
-            try:
-                # Extract email addresses from message for logging
-                from_list = msg.get("from_list", []) or []
-                to_list = msg.get("to_list", []) or []
-                msg_emails = [e for _, e in from_list + to_list if e and e.lower() != gmail_email.lower()]
-                if msg_emails:
-                    processed_emails.add(msg_emails[0].lower())
-                
-                if process_message(msg, user_id, gmail_email):
-                    networking_count += 1
-                    print(f"  ✅ Processed networking message from/to: {', '.join(msg_emails[:2])}")
-            except Exception as e:
-                error_msg = str(e)
-                errors.append(error_msg)
-                print(f"  ❌ Error processing message: {error_msg}")
+            # Extract email addresses from message for logging
+            from_list = msg.get("from_list", []) or []
+            to_list = msg.get("to_list", []) or []
+            msg_emails = [e for _, e in from_list + to_list if e and e.lower() != gmail_email.lower()]
+            if msg_emails:
+                processed_emails.add(msg_emails[0].lower())
+        
+        try:
+            batch_result = process_messages(
+                messages, user_id, gmail_email,
+                get_service=lambda: get_gmail_service_for_user(user_id)
+            )
+            networking_count = batch_result["networking_messages"]
+            errors.extend(batch_result["errors"])
+            saved = batch_result["saved"]
+            failed_ids = batch_result["failed_ids"]
+        except Exception as e:
+            networking_count = 0
+            saved = False
+            errors.append(str(e))
+            print(f"  ❌ Error processing messages: {e}")
         
         print(f"📊 Processed {len(messages)} messages, found {networking_count} networking emails")
         print(f"📧 Unique email addresses seen: {len(processed_emails)}")
@@ -382,39 +633,86 @@ def sync_gmail_for_user(user_id: int) -> Dict[str, Any]:
             traceback.print_exc()
             errors.append(f"Contact sync error: {str(e)}")
         
-        # Update last sync time
+        if not saved:
+            # Keep the old history cursor and schedule so the next run fetches the same
+            # ids again (already-saved messages are skipped as known)
+            print(f"⚠️  Gmail batch for user {user_id} was not saved; history cursor not advanced")
+            return {
+                "success": False,
+                "error": "Saving Gmail messages failed; history cursor not advanced",
+                "sync_mode": sync_mode,
+                "messages_processed": len(messages),
+                "networking_messages": networking_count,
+                "errors": errors[:5]
+            }
+        
+        # The cursor moves on; messages that failed individually are retried by id on
+        # the next runs until they succeed or reach SYNC_MAX_MESSAGE_RETRIES attempts
+        retry_ids = {}
+        for gmail_id in dict.fromkeys(failed_ids):
+            attempts = sync_state["retry_message_ids"].get(gmail_id, 0) + 1
+            if attempts < SYNC_MAX_MESSAGE_RETRIES:
+                retry_ids[gmail_id] = attempts
+            else:
+                print(f"  ⚠️  Giving up on message {gmail_id} after {attempts} failed attempts")
+        
+        # Adapt the poll interval to mailbox activity (known messages don't count as activity)
+        new_message_count = sum(1 for m in messages if not m.get("metadata_only"))
+        sync_interval = _next_sync_interval(
+            sync_state["sync_interval_seconds"], new_message_count, networking_count
+        )
+        now = datetime.utcnow()
+        next_sync_at = now + timedelta(seconds=sync_interval + _jitter())
+        
+        # Update last sync time, advance the history cursor and store the schedule
         with get_session() as session:
             session.execute(
                 text("""
                     UPDATE gmail_oauth_tokens 
-                    SET last_sync_at = :last_sync_at
+                    SET last_sync_at = :last_sync_at,
+                        history_id = COALESCE(:history_id, history_id),
+                        sync_interval_seconds = :sync_interval_seconds,
+                        next_sync_at = :next_sync_at,
+                        retry_message_ids = :retry_message_ids
                     WHERE user_id = :user_id
                 """),
                 {
                     "user_id": user_id,
-                    "last_sync_at": datetime.utcnow()
+                    "last_sync_at": now,
+                    "history_id": new_history_id,
+                    "retry_message_ids": json.dumps(retry_ids) if retry_ids else None,
+                    "sync_interval_seconds": sync_interval,
+                    "next_sync_at": next_sync_at
                 }
             )
+        print(f"⏱️  Next sync for user {user_id} in ~{sync_interval}s")
         
         return {
             "success": True,
+            "sync_mode": sync_mode,
             "messages_processed": len(messages),
             "networking_messages": networking_count,
+            "sync_interval_seconds": sync_interval,
+            "next_sync_at": next_sync_at.isoformat() + 'Z',
             "errors": errors[:5] if errors else []  # Limit error messages
         }
     
     except Exception as e:
         print(f"Error syncing Gmail for user {user_id}: {e}")
+        if _is_auth_error(e):
+            evict_gmail_service(user_id)
         return {"success": False, "error": str(e)}
 
 
 def get_gmail_sync_status(user_id: int) -> Dict[str, Any]:
     """Get Gmail sync status for user."""
+    _ensure_gmail_sync_columns()
     with get_session() as session:
         result = session.execute(
             text("""
                 SELECT tokens_json, last_sync_at, created_at, 
-                       COALESCE(auto_sync_enabled, true) as auto_sync_enabled
+                       COALESCE(auto_sync_enabled, true) as auto_sync_enabled,
+                       sync_interval_seconds, next_sync_at
                 FROM gmail_oauth_tokens
                 WHERE user_id = :user_id
             """),
@@ -439,7 +737,7 @@ def get_gmail_sync_status(user_id: int) -> Dict[str, Any]:
                 last_sync = dt.isoformat() + 'Z'
             else:
                 # Timezone-aware datetime, convert to UTC and append 'Z'
-                last_sync = dt.astimezone(datetime.timezone.utc).isoformat().replace('+00:00', 'Z')
+                last_sync = dt.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z')
         
         connected_at = None
         if row[2]:
@@ -447,15 +745,26 @@ def get_gmail_sync_status(user_id: int) -> Dict[str, Any]:
             if dt.tzinfo is None:
                 connected_at = dt.isoformat() + 'Z'
             else:
-                connected_at = dt.astimezone(datetime.timezone.utc).isoformat().replace('+00:00', 'Z')
+                connected_at = dt.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z')
         
         auto_sync_enabled = row[3] if row[3] is not None else True
         
+        lag = get_sync_lag(user_id).get(user_id)
+        stored_next_sync = _to_epoch(row[5])
+        next_sync_at = None
+        if lag:
+            next_sync_at = lag["next_run_at"]
+        elif stored_next_sync is not None:
+            next_sync_at = datetime.utcfromtimestamp(stored_next_sync).isoformat() + 'Z'
+        
         return {
             "oauth_connected": True,
             "last_sync": last_sync,
             "connected_at": connected_at,
-            "auto_sync_enabled": auto_sync_enabled
+            "auto_sync_enabled": auto_sync_enabled,
+            "sync_interval_seconds": row[4] or SYNC_INTERVAL_SECONDS,
+            "next_sync_at": next_sync_at,
+            "sync_lag_seconds": lag["lag_seconds"] if lag else None
         }
 
 
@@ -463,152 +772,143 @@ def _sync_gmail_contacts_to_main_contacts(user_id: int):
     """
     Sync Gmail contacts to main contacts table.
     Creates or updates contacts in the main contacts table based on Gmail contacts.
+    
+    Only Gmail contacts changed since the last run (pending_main_sync = true) are
+    reconciled. Everything happens in one transaction: one query each for pending
+    contacts, their main contacts and their networking threads, then one bulk
+    INSERT, one bulk UPDATE and clearing the pending flags.
     """
+    try:
+        from gmail_db import _ensure_gmail_contact_columns
+    except ImportError:
+        from services.gmail_db import _ensure_gmail_contact_columns
+    _ensure_gmail_contact_columns()
     try:
         with get_session() as session:
-            # Get all Gmail contacts for this user
-            gmail_contacts_result = session.execute(
+            # Gmail contacts changed since the last reconciliation
+            gmail_contacts = session.execute(
                 text("""
                     SELECT email, name, last_contact_ts
                     FROM gmail_contacts
-                    WHERE user_id = :user_id
-                    ORDER BY last_contact_ts DESC
+                    WHERE user_id = :user_id AND COALESCE(pending_main_sync, true) = true
                 """),
                 {"user_id": user_id}
-            )
-            gmail_contacts = gmail_contacts_result.fetchall()
+            ).fetchall()
+            gmail_contacts = [row for row in gmail_contacts if row[0]]
             
-            print(f"📧 Found {len(gmail_contacts)} Gmail contacts for user {user_id}")
+            print(f"📧 Found {len(gmail_contacts)} changed Gmail contacts for user {user_id}")
             
             if not gmail_contacts:
-                print(f"⚠️  No Gmail contacts found for user {user_id} - nothing to sync")
                 return {"synced": 0, "created": 0, "updated": 0}
             
-            # Get existing main contacts for this user (by email)
-            existing_contacts_result = session.execute(
-                select(Contact).where(Contact.user_id == user_id)
-            )
-            existing_contacts = {c.email.lower(): c for c in existing_contacts_result.scalars().all() if c.email}
+            pending_emails = [row[0] for row in gmail_contacts]
+            emails_lower = sorted({e.lower() for e in pending_emails})
+            
+            # Existing main contacts for just these emails
+            existing_contacts = {}
+            for contact_id, email, name, gmail_thread_id, last_interaction_date in session.execute(
+                select(
+                    Contact.contact_id, Contact.email, Contact.name,
+                    Contact.gmail_thread_id, Contact.last_interaction_date,
+                ).where(
+                    Contact.user_id == user_id,
+                    func.lower(Contact.email).in_(emails_lower),
+                ).order_by(Contact.contact_id)
+            ).all():
+                existing_contacts.setdefault(email.lower(), {
+                    "contact_id": contact_id,
+                    "name": name,
+                    "gmail_thread_id": gmail_thread_id,
+                    "last_interaction_date": last_interaction_date,
+                })
             
-            # Get Gmail threads to link thread_id to contacts
-            threads_result = session.execute(
+            # Earliest networking thread per pending contact
+            thread_map = {}
+            for contact_email, thread_id in session.execute(
                 text("""
-                    SELECT DISTINCT contact_email, thread_id
+                    SELECT contact_email, thread_id
                     FROM gmail_threads
-                    WHERE user_id = :user_id AND is_networking = true
-                """),
-                {"user_id": user_id}
-            )
-            thread_map = {row[0].lower(): row[1] for row in threads_result.fetchall() if row[0]}
-            
-            synced_count = 0
-            created_count = 0
-            updated_count = 0
+                    WHERE user_id = :user_id AND is_networking = true AND lower(contact_email) IN :emails
+                    ORDER BY first_message_ts ASC
+                """).bindparams(bindparam("emails", expanding=True)),
+                {"user_id": user_id, "emails": emails_lower}
+            ).fetchall():
+                if contact_email:
+                    thread_map.setdefault(contact_email.lower(), thread_id)
             
+            today = date.today()
+            new_rows = []
+            update_rows = []
+            seen = set()
             for gmail_email, gmail_name, last_contact_ts in gmail_contacts:
-                if not gmail_email:
+                email_lower = gmail_email.lower()
+                if email_lower in seen:
                     continue
+                seen.add(email_lower)
                 
-                email_lower = gmail_email.lower()
+                gmail_name = gmail_name.strip() if gmail_name else ""
                 gmail_thread_id = thread_map.get(email_lower)
-                
-                print(f"  🔍 Processing Gmail contact: {gmail_email} (name: {gmail_name})")
-                
-                # Convert timestamp to date if available
                 last_interaction_date = None
                 if last_contact_ts:
                     try:
-                        last_interaction_date = datetime.fromtimestamp(last_contact_ts / 1000).date().isoformat()
-                        print(f"     Last contact timestamp: {last_contact_ts} -> {last_interaction_date}")
-                    except:
+                        last_interaction_date = datetime.fromtimestamp(last_contact_ts / 1000).date()
+                    except (OverflowError, OSError, ValueError):
                         pass
                 
-                # Check if contact already exists
-                if email_lower in existing_contacts:
-                    print(f"  ✓ Contact already exists in main contacts table")
-                    # Update existing contact
-                    existing_contact = existing_contacts[email_lower]
-                    update_data = {}
-                    
-                    print(f"     Existing contact ID: {existing_contact.contact_id}, name: {existing_contact.name}")
-                    print(f"     Gmail thread_id: {gmail_thread_id}, existing gmail_thread_id: {existing_contact.gmail_thread_id}")
-                    
-                    # Update name if Gmail has a better name
-                    if gmail_name and gmail_name.strip() and (not existing_contact.name or existing_contact.name.strip() == ""):
-                        update_data["name"] = gmail_name.strip()
-                        print(f"     Will update name to: {gmail_name.strip()}")
-                    
-                    # Update gmail_thread_id if we have one
-                    if gmail_thread_id and not existing_contact.gmail_thread_id:
-                        update_data["gmail_thread_id"] = gmail_thread_id
-                        print(f"     Will update gmail_thread_id to: {gmail_thread_id}")
-                    
-                    # Update last_interaction_date if newer
-                    if last_interaction_date:
-                        # Convert to date for comparison
-                        new_date = datetime.fromisoformat(last_interaction_date).date() if isinstance(last_interaction_date, str) else last_interaction_date
-                        existing_date = existing_contact.last_interaction_date
-                        
-                        print(f"     New date: {new_date}, existing date: {existing_date}")
-                        
-                        if not existing_date or (new_date > existing_date):
-                            update_data["last_interaction_date"] = last_interaction_date
-                            print(f"     Will update last_interaction_date to: {last_interaction_date}")
-                    
-                    if update_data:
-                        print(f"  🔄 Updating contact with: {update_data}")
-                        try:
-                            update_contact_service(
-                                contact_id=existing_contact.contact_id,
-                                user_id=user_id,
-                                **update_data
-                            )
-                            updated_count += 1
-                            print(f"  ✅ Updated contact {existing_contact.contact_id}")
-                        except Exception as e:
-                            print(f"  ❌ Error updating contact {existing_contact.contact_id}: {e}")
-                            import traceback
-                            traceback.print_exc()
-                    else:
-                        print(f"  ⚠️  No updates needed for contact {existing_contact.contact_id}")
-                else:
-                    # Create new contact
-                    print(f"  ➕ Contact does NOT exist in main contacts - will create new one")
-                    try:
-                        contact_name = gmail_name.strip() if gmail_name and gmail_name.strip() else gmail_email.split("@")[0]
-                        print(f"     Creating contact: {contact_name} ({gmail_email})")
-                        contact_dict = create_contact(
-                            user_id=user_id,
-                            name=contact_name,
-                            email=gmail_email,
-                            category="Professional",  # Default category
-                        )
-                        print(f"     Contact created with ID: {contact_dict.get('contact_id')}")
-                        
-                        # Update with Gmail-specific fields if needed
-                        if gmail_thread_id or last_interaction_date:
-                            print(f"     Updating with Gmail fields: thread_id={gmail_thread_id}, last_interaction_date={last_interaction_date}")
-                            update_contact_service(
-                                contact_id=contact_dict["contact_id"],
-                                user_id=user_id,
-                                gmail_thread_id=gmail_thread_id,
-                                last_interaction_date=last_interaction_date,
-                            )
-                        created_count += 1
-                        print(f"  ✅ Created contact {contact_dict['contact_id']} for {gmail_email}")
-                    except Exception as e:
-                        print(f"  ❌ Error creating contact for {gmail_email}: {e}")
-                        import traceback
-                        traceback.print_exc()
+                existing = existing_contacts.get(email_lower)
+                if existing is None:
+                    new_rows.append({
+                        "user_id": user_id,
+                        "name": gmail_name or gmail_email.split("@")[0],
+                        "email": gmail_email,
+                        "category": "Professional",  # Default category
+                        "date_created": today,
+                        "gmail_thread_id": gmail_thread_id,
+                        "last_interaction_date": last_interaction_date,
+                    })
+                    continue
                 
-                synced_count += 1
+                # Fill an empty name, link a thread if missing, move last interaction forward
+                update_data = {}
+                if gmail_name and not (existing["name"] or "").strip():
+                    update_data["name"] = gmail_name
+                if gmail_thread_id and not existing["gmail_thread_id"]:
+                    update_data["gmail_thread_id"] = gmail_thread_id
+                if last_interaction_date and (
+                    not existing["last_interaction_date"]
+                    or last_interaction_date > existing["last_interaction_date"]
+                ):
+                    update_data["last_interaction_date"] = last_interaction_date
+                if update_data:
+                    update_rows.append({
+                        "contact_id": existing["contact_id"],
+                        "name": update_data.get("name", existing["name"]),
+                        "gmail_thread_id": update_data.get("gmail_thread_id", existing["gmail_thread_id"]),
+                        "last_interaction_date": update_data.get("last_interaction_date", existing["last_interaction_date"]),
+                    })
+            
+            if new_rows:
+                session.execute(insert(Contact), new_rows)
+            if update_rows:
+                # Bulk UPDATE by primary key
+                session.execute(update(Contact), update_rows)
+            
+            # Mark reconciled; contacts changed later by another sync get flagged again
+            session.execute(
+                text("""
+                    UPDATE gmail_contacts
+                    SET pending_main_sync = false
+                    WHERE user_id = :user_id AND email IN :emails
+                """).bindparams(bindparam("emails", expanding=True)),
+                {"user_id": user_id, "emails": pending_emails}
+            )
             
             result = {
-                "synced": synced_count,
-                "created": created_count,
-                "updated": updated_count
+                "synced": len(seen),
+                "created": len(new_rows),
+                "updated": len(update_rows)
             }
-            print(f"✅ Synced {synced_count} Gmail contacts to main contacts (created: {created_count}, updated: {updated_count})")
+            print(f"✅ Synced {result['synced']} Gmail contacts to main contacts (created: {result['created']}, updated: {result['updated']})")
             return result
             
     except Exception as e:
@@ -619,76 +919,207 @@ def _sync_gmail_contacts_to_main_contacts(user_id: int):
 
 
 # ============================================================================
-# Background Sync Service (runs every 5 minutes)
+# Background Sync Service (scheduler + bounded worker pool)
 # ============================================================================
 
+# Per-user poll intervals adapt to mailbox activity between these bounds
+# (stored in gmail_oauth_tokens.sync_interval_seconds / next_sync_at).
+SYNC_INTERVAL_SECONDS = int(os.getenv("GMAIL_SYNC_INTERVAL_SECONDS", "300"))  # base / starting interval
+SYNC_MIN_INTERVAL_SECONDS = int(os.getenv("GMAIL_SYNC_MIN_INTERVAL_SECONDS", "60"))
+SYNC_MAX_INTERVAL_SECONDS = int(os.getenv("GMAIL_SYNC_MAX_INTERVAL_SECONDS", "14400"))  # 4 hours
+# Random delay added to each user's next run so syncs don't all line up
+SYNC_JITTER_SECONDS = int(os.getenv("GMAIL_SYNC_JITTER_SECONDS", "30"))
+# Attempts before a message that keeps failing processing is skipped for good
+SYNC_MAX_MESSAGE_RETRIES = int(os.getenv("GMAIL_SYNC_MAX_MESSAGE_RETRIES", "3"))
+# Worker pool size == max number of users syncing at the same time.
+# Keep this below the DB connection pool size.
+SYNC_MAX_CONCURRENT_USERS = max(1, int(os.getenv("GMAIL_SYNC_MAX_CONCURRENT_USERS", "3")))
+# How often the scheduler wakes up to dispatch due users
+SYNC_TICK_SECONDS = 10
+
 _background_sync_thread: Optional[threading.Thread] = None
 _background_sync_running = False
 _background_sync_lock = threading.Lock()
+_sync_executor: Optional[ThreadPoolExecutor] = None
+
+# Scheduler state (guarded by _schedule_lock)
+_schedule_lock = threading.Lock()
+_next_run_at: Dict[int, float] = {}       # user_id -> epoch seconds when the user is next due
+_in_flight: Set[int] = set()              # user_ids currently being synced by the pool
+_last_finished_at: Dict[int, float] = {}  # user_id -> epoch seconds of last background sync
+
+# One lock per user so manual and background syncs never overlap
+_user_sync_locks: Dict[int, threading.Lock] = {}
+_user_sync_locks_guard = threading.Lock()
+
+
+def _get_user_sync_lock(user_id: int) -> threading.Lock:
+    with _user_sync_locks_guard:
+        lock = _user_sync_locks.get(user_id)
+        if lock is None:
+            lock = threading.Lock()
+            _user_sync_locks[user_id] = lock
+        return lock
 
 
-def _sync_all_users_with_gmail():
-    """Sync Gmail for all users who have OAuth connected and auto-sync enabled."""
+def _jitter() -> float:
+    return random.uniform(0, SYNC_JITTER_SECONDS) if SYNC_JITTER_SECONDS > 0 else 0.0
+
+
+def _get_auto_sync_schedule() -> Dict[int, Optional[float]]:
+    """Users with Gmail OAuth connected and auto-sync enabled -> stored next_sync_at (epoch, or None)."""
+    _ensure_gmail_sync_columns()
+    with get_session() as session:
+        result = session.execute(
+            text("""
+                SELECT user_id, next_sync_at
+                FROM gmail_oauth_tokens 
+                WHERE COALESCE(auto_sync_enabled, true) = true
+            """)
+        )
+        return {row[0]: _to_epoch(row[1]) for row in result.fetchall()}
+
+
+def _defer_next_sync(user_id: int, seconds: float):
+    """Push a user's stored next_sync_at out (used after a failed background sync)."""
+    with get_session() as session:
+        session.execute(
+            text("UPDATE gmail_oauth_tokens SET next_sync_at = :next_sync_at WHERE user_id = :user_id"),
+            {"user_id": user_id, "next_sync_at": datetime.utcnow() + timedelta(seconds=seconds)}
+        )
+
+
+def _run_scheduled_sync(user_id: int):
+    """Worker body: sync one user and schedule their next run."""
+    started = time.time()
+    # A successful sync stores its own adaptive next_sync_at; failures retry after the base interval
+    next_run = None
     try:
-        with get_session() as session:
-            # Get all users with Gmail OAuth tokens AND auto_sync_enabled = true
-            result = session.execute(
-                text("""
-                    SELECT DISTINCT user_id 
-                    FROM gmail_oauth_tokens 
-                    WHERE COALESCE(auto_sync_enabled, true) = true
-                """)
-            )
-            user_ids = [row[0] for row in result.fetchall()]
-        
-        if not user_ids:
-            print("📧 Background sync: No users with Gmail OAuth connected")
-            return
-        
-        print(f"📧 Background sync: Syncing Gmail for {len(user_ids)} user(s)")
-        
-        for user_id in user_ids:
+        result = sync_gmail_for_user(user_id)
+        if result.get("success"):
+            print(f"  ✅ User {user_id}: Processed {result.get('messages_processed', 0)} messages, found {result.get('networking_messages', 0)} networking emails ({time.time() - started:.1f}s)")
+            next_run = _to_epoch(datetime.fromisoformat(result["next_sync_at"].rstrip('Z')))
+        else:
+            print(f"  ⚠️  User {user_id}: Sync failed - {result.get('error', 'Unknown error')}")
+    except Exception as e:
+        print(f"  ❌ User {user_id}: Error during sync - {e}")
+    finally:
+        finished = time.time()
+        if next_run is None:
+            next_run = finished + SYNC_INTERVAL_SECONDS + _jitter()
             try:
-                print(f"  🔄 Syncing Gmail for user {user_id}...")
-                result = sync_gmail_for_user(user_id)
-                if result.get("success"):
-                    print(f"  ✅ User {user_id}: Processed {result.get('messages_processed', 0)} messages, found {result.get('networking_messages', 0)} networking emails")
-                else:
-                    print(f"  ⚠️  User {user_id}: Sync failed - {result.get('error', 'Unknown error')}")
+                _defer_next_sync(user_id, next_run - finished)
             except Exception as e:
-                print(f"  ❌ User {user_id}: Error during sync - {e}")
-                # Continue with other users even if one fails
+                print(f"  ⚠️  User {user_id}: Could not store next sync time - {e}")
+        with _schedule_lock:
+            _in_flight.discard(user_id)
+            _last_finished_at[user_id] = finished
+            # Only reschedule users that are still enrolled
+            if user_id in _next_run_at:
+                _next_run_at[user_id] = next_run
+
+
+def _dispatch_due_users():
+    """Refresh the set of auto-sync users and hand due users to the worker pool."""
+    try:
+        schedule = _get_auto_sync_schedule()
+    except Exception as e:
+        print(f"❌ Background sync: failed to load users - {e}")
+        return
+    
+    now = time.time()
+    to_submit = []
+    with _schedule_lock:
+        # Drop users who disconnected or disabled auto-sync
+        for user_id in list(_next_run_at):
+            if user_id not in schedule:
+                del _next_run_at[user_id]
+        for user_id, stored_next_run in schedule.items():
+            if user_id in _in_flight:
                 continue
+            if stored_next_run is not None:
+                # The stored schedule is authoritative (survives restarts, updated by manual syncs)
+                _next_run_at[user_id] = stored_next_run
+            elif user_id not in _next_run_at:
+                # Never synced: spread first runs out instead of all firing at once
+                _next_run_at[user_id] = now + _jitter()
         
-        print(f"✅ Background sync completed for {len(user_ids)} user(s)")
+        due = sorted(
+            (run_at, user_id) for user_id, run_at in _next_run_at.items()
+            if run_at <= now and user_id not in _in_flight
+        )
+        free_slots = SYNC_MAX_CONCURRENT_USERS - len(_in_flight)
+        for _, user_id in due[:max(0, free_slots)]:
+            _in_flight.add(user_id)
+            to_submit.append(user_id)
+        waiting = len(due) - len(to_submit)
+        max_lag = max((now - run_at for run_at, _ in due), default=0.0)
     
-    except Exception as e:
-        print(f"❌ Background sync error: {e}")
-        import traceback
-        traceback.print_exc()
+    if not to_submit:
+        return
+    
+    print(f"📧 Background sync: dispatching {len(to_submit)} user(s), {waiting} still waiting, max lag {max_lag:.0f}s")
+    if max_lag > SYNC_INTERVAL_SECONDS:
+        print(f"⚠️  Background sync is falling behind (max lag {max_lag:.0f}s > interval {SYNC_INTERVAL_SECONDS}s); consider raising GMAIL_SYNC_MAX_CONCURRENT_USERS")
+    
+    for user_id in to_submit:
+        try:
+            _sync_executor.submit(_run_scheduled_sync, user_id)
+        except RuntimeError as e:
+            # Executor shut down underneath us
+            with _schedule_lock:
+                _in_flight.discard(user_id)
+            print(f"❌ Background sync: could not dispatch user {user_id} - {e}")
 
 
-def _background_sync_loop():
-    """Background sync loop that runs every 5 minutes."""
-    global _background_sync_running
+def get_sync_lag(user_id: Optional[int] = None) -> Dict[int, Dict[str, Any]]:
+    """
+    How far behind schedule the background sync is, per user.
     
+    lag_seconds is how long a user has been due without being picked up
+    (0 when on schedule or currently syncing).
+    """
+    now = time.time()
+    with _schedule_lock:
+        user_ids = [user_id] if user_id is not None else list(_next_run_at)
+        report = {}
+        for uid in user_ids:
+            if uid not in _next_run_at:
+                continue
+            run_at = _next_run_at[uid]
+            in_flight = uid in _in_flight
+            report[uid] = {
+                "lag_seconds": 0.0 if in_flight else round(max(0.0, now - run_at), 1),
+                "in_flight": in_flight,
+                "next_run_at": datetime.utcfromtimestamp(run_at).isoformat() + 'Z',
+                "last_finished_at": (
+                    datetime.utcfromtimestamp(_last_finished_at[uid]).isoformat() + 'Z'
+                    if uid in _last_finished_at else None
+                ),
+            }
+        return report
+
+
+def _background_sync_loop():
+    """Scheduler loop: wakes every SYNC_TICK_SECONDS and dispatches due users."""
     while _background_sync_running:
         try:
-            _sync_all_users_with_gmail()
+            _dispatch_due_users()
         except Exception as e:
             print(f"❌ Error in background sync loop: {e}")
+            import traceback
+            traceback.print_exc()
         
-        # Wait 5 minutes (300 seconds) before next sync
-        # Check _background_sync_running every 10 seconds to allow graceful shutdown
-        for _ in range(30):  # 30 * 10 seconds = 5 minutes
+        # Sleep in 1s steps to allow graceful shutdown
+        for _ in range(SYNC_TICK_SECONDS):
             if not _background_sync_running:
                 break
-            time.sleep(10)
+            time.sleep(1)
 
 
 def start_background_sync():
-    """Start the background Gmail sync service (runs every 5 minutes)."""
-    global _background_sync_thread, _background_sync_running
+    """Start the background Gmail sync scheduler and its worker pool."""
+    global _background_sync_thread, _background_sync_running, _sync_executor
     
     with _background_sync_lock:
         if _background_sync_running:
@@ -696,18 +1127,22 @@ def start_background_sync():
             return
         
         _background_sync_running = True
+        _sync_executor = ThreadPoolExecutor(
+            max_workers=SYNC_MAX_CONCURRENT_USERS,
+            thread_name_prefix="GmailSyncWorker"
+        )
         _background_sync_thread = threading.Thread(
             target=_background_sync_loop,
             daemon=True,  # Thread will exit when main process exits
             name="GmailBackgroundSync"
         )
         _background_sync_thread.start()
-        print("✅ Background Gmail sync started (runs every 5 minutes)")
+        print(f"✅ Background Gmail sync started (every {SYNC_MIN_INTERVAL_SECONDS}-{SYNC_MAX_INTERVAL_SECONDS}s per user depending on activity, up to {SYNC_MAX_CONCURRENT_USERS} users at once)")
 
 
 def stop_background_sync():
-    """Stop the background Gmail sync service."""
-    global _background_sync_thread, _background_sync_running
+    """Stop the background Gmail sync scheduler."""
+    global _background_sync_thread, _background_sync_running, _sync_executor
     
     with _background_sync_lock:
         if not _background_sync_running:
@@ -719,6 +1154,15 @@ def stop_background_sync():
         if _background_sync_thread and _background_sync_thread.is_alive():
             _background_sync_thread.join(timeout=10)  # Wait up to 10 seconds for thread to finish
         
+        if _sync_executor:
+            # Don't block shutdown on in-flight syncs; queued work is dropped
+            _sync_executor.shutdown(wait=False, cancel_futures=True)
+            _sync_executor = None
+        
+        with _schedule_lock:
+            _next_run_at.clear()
+            _in_flight.clear()
+        
         print("✅ Background Gmail sync stopped")
 
 
@@ -734,15 +1178,29 @@ def set_auto_sync_enabled(user_id: int, enabled: bool) -> Dict[str, Any]:
             if not result.fetchone():
                 return {"success": False, "error": "User does not have Gmail OAuth connected"}
             
-            # Update auto_sync_enabled
-            session.execute(
-                text("""
-                    UPDATE gmail_oauth_tokens 
-                    SET auto_sync_enabled = :enabled
-                    WHERE user_id = :user_id
-                """),
-                {"user_id": user_id, "enabled": enabled}
-            )
+            # Update auto_sync_enabled; re-enabling resets the adaptive schedule
+            # so the user is synced promptly instead of waiting out a long backoff
+            _ensure_gmail_sync_columns()
+            if enabled:
+                session.execute(
+                    text("""
+                        UPDATE gmail_oauth_tokens 
+                        SET auto_sync_enabled = :enabled,
+                            sync_interval_seconds = NULL,
+                            next_sync_at = NULL
+                        WHERE user_id = :user_id
+                    """),
+                    {"user_id": user_id, "enabled": enabled}
+                )
+            else:
+                session.execute(
+                    text("""
+                        UPDATE gmail_oauth_tokens 
+                        SET auto_sync_enabled = :enabled
+                        WHERE user_id = :user_id
+                    """),
+                    {"user_id": user_id, "enabled": enabled}
+                )
             
             return {"success": True, "auto_sync_enabled": enabled}
     except Exception as e:
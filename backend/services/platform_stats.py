@@ -0,0 +1,92 @@
+# platform_stats.py
+# ---------------------------------------------------------------------
+# In-process cache for the landing page statistics (/api/stats).
+# A background thread recomputes get_platform_stats() every
+# STATS_REFRESH_SECONDS; requests only read the cached values, so
+# landing page traffic never queries the database. If the refresher
+# falls behind, readers still get the last values (stale-while-revalidate)
+# and trigger one refresh in the background.
+# ---------------------------------------------------------------------
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from services.service_api import get_platform_stats
+
+STATS_REFRESH_SECONDS = int(os.getenv("STATS_REFRESH_SECONDS", "300"))
+
+# Served until the first refresh completes
+DEFAULT_STATS: Dict[str, Any] = {
+    "total_users": 0,
+    "total_contacts": 0,
+    "active_users": 0,
+}
+
+_stats: Dict[str, Any] = dict(DEFAULT_STATS)
+_stats_refreshed_at: float = 0.0  # monotonic; 0 = never refreshed
+_stats_lock = threading.Lock()
+_refresh_in_progress = False
+
+_refresher_thread: Optional[threading.Thread] = None
+_refresher_stop = threading.Event()
+
+
+def refresh_platform_stats() -> bool:
+    """Recompute the stats from the database. Returns False if another refresh is running or it failed."""
+    global _stats, _stats_refreshed_at, _refresh_in_progress
+    with _stats_lock:
+        if _refresh_in_progress:
+            return False
+        _refresh_in_progress = True
+    try:
+        stats = get_platform_stats()
+        with _stats_lock:
+            _stats = stats
+            _stats_refreshed_at = time.monotonic()
+        return True
+    except Exception as e:
+        # Keep serving the previous values
+        print(f"⚠️  Platform stats refresh failed: {e}")
+        return False
+    finally:
+        with _stats_lock:
+            _refresh_in_progress = False
+
+
+def get_cached_platform_stats() -> Dict[str, Any]:
+    """Last computed stats (never blocks on the database)."""
+    with _stats_lock:
+        stats = dict(_stats)
+        refreshed_at = _stats_refreshed_at
+        in_progress = _refresh_in_progress
+    if not in_progress and (not refreshed_at or time.monotonic() - refreshed_at > 2 * STATS_REFRESH_SECONDS):
+        # Refresher not running or falling behind: revalidate in the background
+        threading.Thread(target=refresh_platform_stats, daemon=True, name="PlatformStatsRefresh").start()
+    return stats
+
+
+def _refresher_loop() -> None:
+    while not _refresher_stop.is_set():
+        refresh_platform_stats()
+        _refresher_stop.wait(STATS_REFRESH_SECONDS)
+
+
+def start_stats_refresher() -> None:
+    """Start the background stats refresher (first refresh runs immediately)."""
+    global _refresher_thread
+    if _refresher_thread and _refresher_thread.is_alive():
+        return
+    _refresher_stop.clear()
+    _refresher_thread = threading.Thread(target=_refresher_loop, daemon=True, name="PlatformStatsRefresher")
+    _refresher_thread.start()
+    print(f"✅ Platform stats refresher started (every {STATS_REFRESH_SECONDS}s)")
+
+
+def stop_stats_refresher() -> None:
+    global _refresher_thread
+    _refresher_stop.set()
+    if _refresher_thread and _refresher_thread.is_alive():
+        _refresher_thread.join(timeout=5)
+    _refresher_thread = None
@@ -3,12 +3,15 @@ RAG (Retrieval-Augmented Generation) Service
 Helps users navigate and understand the Ripple app features and functionality
 """
 import os
-from typing import List, Dict, Optional, Tuple
+import hashlib
+import json
+from typing import Any, List, Dict, Optional, Tuple
 from pathlib import Path
 from dotenv import load_dotenv
 import glob
 import time
 import math
+import threading
 
 try:
     import numpy as _np  # type: ignore
@@ -17,10 +20,8 @@ except Exception:
 
 try:
     from sklearn.feature_extraction.text import TfidfVectorizer  # type: ignore
-    from sklearn.metrics.pairwise import cosine_similarity  # type: ignore
 except Exception:
     TfidfVectorizer = None
-    cosine_similarity = None
 
 # Load environment variables from .env file
 env_path = Path(__file__).parent.parent / '.env'
@@ -37,25 +38,41 @@ USE_OPENAI = bool(OPENAI_API_KEY)
 # Path to optional on-disk knowledge base
 KB_DIR = Path(__file__).parent.parent / "knowledge_base"
 
-# Track last modified time to support lightweight hot reload
-def _kb_latest_mtime() -> float:
+# On-disk cache for chunk embeddings (float32, keyed by model + chunk hash)
+RAG_CACHE_DIR = Path(os.getenv("RAG_CACHE_DIR", str(Path(__file__).parent.parent / ".rag_cache")))
+EMBEDDING_MODEL = "text-embedding-3-small"
+TFIDF_OPTIONS = {"max_features": 20000, "ngram_range": (1, 2)}
+# Embedding API request limits: 2048 inputs per request, ~300k tokens per request.
+# Chunks are <= 600 chars, so the char budget (~4 chars/token) keeps well under it.
+EMBED_BATCH_SIZE = int(os.getenv("RAG_EMBED_BATCH_SIZE", "512"))
+_EMBED_MAX_INPUTS = 2048
+_EMBED_MAX_CHARS_PER_REQUEST = 800_000
+
+# How often the background watcher re-stats the KB files (seconds)
+KB_CHECK_INTERVAL_SECONDS = float(os.getenv("RAG_KB_CHECK_INTERVAL", "30"))
+
+
+def _kb_paths() -> List[Path]:
+    """All .md and .txt files under KB_DIR (recursively), excluding README files."""
+    if not (KB_DIR.exists() and KB_DIR.is_dir()):
+        return []
+    paths = glob.glob(str(KB_DIR / "**/*.md"), recursive=True) + glob.glob(str(KB_DIR / "**/*.txt"), recursive=True)
+    return [Path(p) for p in paths if Path(p).name.lower() != "readme.md"]
+
+
+# Snapshot of the KB files on disk; any added, removed or modified file changes it
+def _kb_signature() -> frozenset:
+    signature = set()
     try:
-        if KB_DIR.exists() and KB_DIR.is_dir():
-            mtimes: List[float] = []
-            # Recursively check all .md and .txt files
-            for path_str in glob.glob(str(KB_DIR / "**/*.md"), recursive=True) + glob.glob(str(KB_DIR / "**/*.txt"), recursive=True):
-                path = Path(path_str)
-                # Skip README files
-                if path.name.lower() == "readme.md":
-                    continue
-                try:
-                    mtimes.append(path.stat().st_mtime)
-                except Exception:
-                    continue
-            return max(mtimes) if mtimes else 0.0
+        for path in _kb_paths():
+            try:
+                st = path.stat()
+                signature.add((str(path), st.st_mtime_ns, st.st_size))
+            except Exception:
+                continue
     except Exception:
-        return 0.0
-    return 0.0
+        pass
+    return frozenset(signature)
 
 def load_knowledge_base_from_folder() -> Dict[str, str]:
     """
@@ -66,14 +83,9 @@ def load_knowledge_base_from_folder() -> Dict[str, str]:
     kb_files: Dict[str, str] = {}
     try:
         if KB_DIR.exists() and KB_DIR.is_dir():
-            # Recursively find all .md and .txt files in subdirectories
-            for path_str in glob.glob(str(KB_DIR / "**/*.md"), recursive=True) + glob.glob(str(KB_DIR / "**/*.txt"), recursive=True):
-                path = Path(path_str)
-                
-                # Skip README files and files that look like directory listings
-                if path.name.lower() == "readme.md":
-                    continue
-                
+            # Recursively find all .md and .txt files in subdirectories (README files skipped)
+            for path in _kb_paths():
+                path_str = str(path)
                 try:
                     text = path.read_text(encoding="utf-8")
                     
@@ -102,20 +114,38 @@ def load_knowledge_base_from_folder() -> Dict[str, str]:
     return kb_files
 
 # Load KB at import time
+KB_SIGNATURE: frozenset = _kb_signature()
 KB_FILES: Dict[str, str] = load_knowledge_base_from_folder()
-KB_LAST_MTIME: float = _kb_latest_mtime()
+
+# Generation counters: the watcher bumps _KB_DISK_GENERATION when the files on disk
+# change; KB_GENERATION is the generation the loaded index was built from.
+KB_GENERATION: int = 0
+_KB_DISK_GENERATION: int = 0
+_kb_reload_lock = threading.Lock()
+_kb_watcher: Optional[threading.Thread] = None
 
 # Chunked KB and vector index (rebuilt on change)
 KB_CHUNKS: List[Dict[str, str]] = []  # {id, source, text}
-_EMB_MATRIX = None  # type: ignore
+_EMB_MATRIX = None  # type: ignore  # rows L2-normalized (dense embeddings and TF-IDF alike)
 _TFIDF = None  # type: ignore
+_BOOST = None  # type: ignore  # per-chunk score multiplier for app-related queries (app-help content)
+
+# Per-file manifest (KB key -> content hash) with each file's chunks and embedding rows,
+# so a rebuild only re-chunks / re-embeds files that were added or changed
+_FILE_HASHES: Dict[str, str] = {}
+_FILE_CHUNKS: Dict[str, List[Dict[str, str]]] = {}
+_FILE_EMBEDDINGS: Dict[str, Any] = {}
 
 # Initial index build (called at end of file after all functions defined)
 def _init_index_once():
     try:
         if KB_FILES:
-            _rebuild_index()
-            print(f"RAG: Loaded {len(KB_FILES)} KB files, built {len(KB_CHUNKS)} chunks")
+            # Prefer the persisted index (memory-mapped, shared across workers); rebuild as fallback
+            if _load_index_artifact():
+                print(f"RAG: Loaded {len(KB_FILES)} KB files, mapped index artifact with {len(KB_CHUNKS)} chunks")
+            else:
+                _rebuild_index()
+                print(f"RAG: Loaded {len(KB_FILES)} KB files, built {len(KB_CHUNKS)} chunks")
         else:
             print("RAG: No KB files found in knowledge_base folder")
     except Exception as e:
@@ -124,11 +154,40 @@ def _init_index_once():
         traceback.print_exc()
 
 
+def _kb_watch_loop() -> None:
+    """Background check: re-stat the KB files every KB_CHECK_INTERVAL_SECONDS and flag changes."""
+    global KB_SIGNATURE, _KB_DISK_GENERATION
+    while True:
+        time.sleep(KB_CHECK_INTERVAL_SECONDS)
+        signature = _kb_signature()
+        if signature != KB_SIGNATURE:
+            KB_SIGNATURE = signature
+            _KB_DISK_GENERATION += 1
+
+
+def _start_kb_watcher() -> None:
+    global _kb_watcher
+    with _kb_reload_lock:
+        if _kb_watcher is None:
+            _kb_watcher = threading.Thread(target=_kb_watch_loop, daemon=True, name="RAGKnowledgeBaseWatcher")
+            _kb_watcher.start()
+
+
 def ensure_kb_up_to_date() -> None:
-    """Reload KB files from disk if any files changed since last load."""
-    global KB_FILES, KB_LAST_MTIME, KB_CHUNKS
-    current_mtime = _kb_latest_mtime()
-    if current_mtime and current_mtime > KB_LAST_MTIME:
+    """
+    Reload KB files if the watcher saw them change since the index was built.
+    The query path only compares two in-memory counters; the directory is scanned
+    by the background watcher, not per query.
+    """
+    global KB_FILES, KB_GENERATION
+    if _kb_watcher is None:
+        _start_kb_watcher()
+    if KB_GENERATION == _KB_DISK_GENERATION:
+        return
+    with _kb_reload_lock:
+        target_generation = _KB_DISK_GENERATION
+        if KB_GENERATION == target_generation:
+            return  # another request already reloaded
         files = load_knowledge_base_from_folder()
         KB_FILES = files or {}
         try:
@@ -136,7 +195,7 @@ def ensure_kb_up_to_date() -> None:
             print(f"RAG: Reloaded KB, now {len(KB_CHUNKS)} chunks")
         except Exception as e:
             print(f"RAG: Error reloading index: {e}")
-        KB_LAST_MTIME = current_mtime
+        KB_GENERATION = target_generation
 
 
 def get_relevant_context(query: str) -> str:
@@ -394,31 +453,88 @@ def _make_concise_answer(query: str, context: str) -> str:
 # Semantic Retrieval Utilities
 # ---------------------------
 
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
 def _rebuild_index() -> None:
-    """Build chunked KB and vector index."""
-    global KB_CHUNKS, _EMB_MATRIX, _TFIDF
-    KB_CHUNKS = []
-    texts: List[str] = []
-    if not KB_FILES:
-        _EMB_MATRIX = None
-        _TFIDF = None
+    """
+    Build chunked KB and vector index (built aside, then swapped in for concurrent readers).
+    Files whose content hash is unchanged keep their chunks and embedding rows; only added
+    or changed files are re-chunked and re-embedded, removed files are dropped.
+    """
+    global _FILE_HASHES
+    hashes = {name: _content_hash(content) for name, content in KB_FILES.items()}
+    changed = [name for name, h in hashes.items() if _FILE_HASHES.get(name) != h]
+    removed = [name for name in _FILE_HASHES if name not in hashes]
+    for name in removed:
+        _FILE_CHUNKS.pop(name, None)
+        _FILE_EMBEDDINGS.pop(name, None)
+    for name in changed:
+        _FILE_CHUNKS[name] = [
+            {"id": f"{name}-{idx}", "source": name, "text": chunk}
+            for idx, chunk in enumerate(_chunk_text(KB_FILES[name]))
+        ]
+        _FILE_EMBEDDINGS.pop(name, None)
+    if _FILE_HASHES:
+        print(f"RAG: Re-indexing {len(changed)} changed/added and {len(removed)} removed KB files")
+    _FILE_HASHES = hashes
+
+    names = [name for name in KB_FILES if _FILE_CHUNKS[name]]
+    chunks = [c for name in names for c in _FILE_CHUNKS[name]]
+    if not chunks:
+        _set_index([], None, None)
         return
-    for name, content in KB_FILES.items():
-        for idx, chunk in enumerate(_chunk_text(content)):
-            KB_CHUNKS.append({"id": f"{name}-{idx}", "source": name, "text": chunk})
-            texts.append(chunk)
     # Embeddings: prefer OpenAI, else TF-IDF
     if USE_OPENAI:
-        embs = _embed_texts_openai(texts)
-        _EMB_MATRIX = embs
-        _TFIDF = None
+        _set_index(chunks, _embedding_matrix(names), None)
     else:
         if TfidfVectorizer is None:
-            _EMB_MATRIX = None
-            _TFIDF = None
+            _set_index(chunks, None, None)
         else:
-            _TFIDF = TfidfVectorizer(max_features=20000, ngram_range=(1,2))
-            _EMB_MATRIX = _TFIDF.fit_transform(texts)
+            # The vocabulary / IDF weights depend on the whole corpus, so TF-IDF is refit on
+            # every chunk (local and fast); only the chunking of changed files is redone.
+            # Rows come out L2-normalized (norm="l2"), so cosine similarity is a dot product.
+            tfidf = TfidfVectorizer(**TFIDF_OPTIONS)
+            matrix = tfidf.fit_transform([c["text"] for c in chunks]).tocsr()
+            _set_index(chunks, matrix, tfidf)
+    _save_index_artifact()
+
+
+def _embedding_matrix(names: List[str]):
+    """Embedding rows for the files in order; only files without stored rows are embedded."""
+    pending = [name for name in names if name not in _FILE_EMBEDDINGS]
+    texts = [c["text"] for name in pending for c in _FILE_CHUNKS[name]]
+    if texts:
+        vectors = _embed_texts_openai(texts)
+        if vectors is None:
+            return None
+        start = 0
+        for name in pending:
+            count = len(_FILE_CHUNKS[name])
+            _FILE_EMBEDDINGS[name] = vectors[start:start + count]
+            start += count
+    if _np is not None:
+        # Normalized once here, so a query only needs one matrix-vector product
+        return _normalize_rows(_np.vstack([_FILE_EMBEDDINGS[name] for name in names]))
+    return [row for name in names for row in _FILE_EMBEDDINGS[name]]
+
+
+def _normalize_rows(matrix):
+    matrix = _np.asarray(matrix, dtype=_np.float32)
+    return matrix / (_np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12)
+
+
+def _set_index(chunks: List[Dict[str, str]], matrix, tfidf) -> None:
+    """Swap in a new index together with its precomputed app-help boost vector."""
+    global KB_CHUNKS, _EMB_MATRIX, _TFIDF, _BOOST
+    boost = None
+    if _np is not None:
+        boost = _np.array(
+            [1.5 if "app-help" in c.get("source", "").lower() else 1.0 for c in chunks],
+            dtype=_np.float32,
+        )
+    KB_CHUNKS, _EMB_MATRIX, _TFIDF, _BOOST = chunks, matrix, tfidf, boost
 
 
 def _chunk_text(text: str, max_len: int = 600, overlap: int = 80) -> List[str]:
@@ -440,28 +556,256 @@ def _chunk_text(text: str, max_len: int = 600, overlap: int = 80) -> List[str]:
     return chunks
 
 
+# In-memory view of the embedding cache file: key -> float32 vector
+_EMBED_CACHE: Optional[Dict[str, Any]] = None
+
+
+def _embedding_cache_path() -> Path:
+    return RAG_CACHE_DIR / f"embeddings-{EMBEDDING_MODEL}.npz"
+
+
+def _embedding_cache_key(text: str) -> str:
+    return hashlib.sha256(f"{EMBEDDING_MODEL}\n{text}".encode("utf-8")).hexdigest()
+
+
+def _load_embedding_cache() -> Dict[str, Any]:
+    global _EMBED_CACHE
+    if _EMBED_CACHE is None:
+        _EMBED_CACHE = {}
+        path = _embedding_cache_path()
+        if _np is not None and path.exists():
+            try:
+                with _np.load(path) as data:
+                    _EMBED_CACHE = dict(zip(data["keys"].tolist(), data["vectors"]))
+                print(f"RAG: Loaded {len(_EMBED_CACHE)} cached embeddings")
+            except Exception as e:
+                print(f"RAG: Could not read embedding cache {path}: {e}")
+    return _EMBED_CACHE
+
+
+def _save_embedding_cache(cache: Dict[str, Any]) -> None:
+    """Write the cache file atomically (temp file + rename)."""
+    path = _embedding_cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.parent / f"{path.name}.{os.getpid()}.tmp"
+        keys = list(cache)
+        with open(tmp, "wb") as f:
+            _np.savez(
+                f,
+                keys=_np.array(keys),
+                vectors=_np.array([cache[k] for k in keys], dtype=_np.float32),
+            )
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"RAG: Could not write embedding cache {path}: {e}")
+
+
+def _embedding_batches(texts: List[str]):
+    """Split texts into request-sized batches (input count and total size limits)."""
+    batch: List[str] = []
+    batch_chars = 0
+    max_inputs = max(1, min(EMBED_BATCH_SIZE, _EMBED_MAX_INPUTS))
+    for t in texts:
+        if batch and (len(batch) >= max_inputs or batch_chars + len(t) > _EMBED_MAX_CHARS_PER_REQUEST):
+            yield batch
+            batch, batch_chars = [], 0
+        batch.append(t)
+        batch_chars += len(t)
+    if batch:
+        yield batch
+
+
 def _embed_texts_openai(texts: List[str]):
+    """
+    Embed chunk texts: cached vectors are reused, the rest are sent in batched requests
+    and added to the on-disk cache. Returns a float32 matrix (or list of vectors without
+    numpy), or None if embedding failed.
+    """
     try:
         import openai  # type: ignore
         openai.api_key = OPENAI_API_KEY
-        # Batch embed; for simplicity, do single call per text (could batch optimize)
-        vectors = []
-        for t in texts:
-            resp = openai.embeddings.create(model="text-embedding-3-small", input=t)
-            vectors.append(resp.data[0].embedding)
-        if _np is not None:
-            return _np.array(vectors)
-        return vectors
-    except Exception:
+        if _np is None:
+            vectors = []
+            for batch in _embedding_batches(texts):
+                resp = openai.embeddings.create(model=EMBEDDING_MODEL, input=batch)
+                vectors.extend(d.embedding for d in sorted(resp.data, key=lambda d: d.index))
+            return vectors
+
+        cache = _load_embedding_cache()
+        keys = [_embedding_cache_key(t) for t in texts]
+        missing = list(dict.fromkeys(t for t, k in zip(texts, keys) if k not in cache))
+        if missing:
+            try:
+                for batch in _embedding_batches(missing):
+                    resp = openai.embeddings.create(model=EMBEDDING_MODEL, input=batch)
+                    for d in sorted(resp.data, key=lambda d: d.index):
+                        cache[_embedding_cache_key(batch[d.index])] = _np.asarray(d.embedding, dtype=_np.float32)
+            finally:
+                # Keep whatever was embedded, even if a later batch failed
+                _save_embedding_cache(cache)
+            print(f"RAG: Embedded {len(missing)} chunks ({len(texts) - len(missing)} reused from cache)")
+        return _np.stack([cache[k] for k in keys])
+    except Exception as e:
+        print(f"RAG: Embedding failed: {e}")
         return None
 
 
+# ---------------------------
+# Persisted Index Artifact
+# ---------------------------
+# RAG_CACHE_DIR/index/manifest.json holds the chunk table and a key over the KB content,
+# index kind and format version; the matrix arrays sit next to it as .npy files named
+# by that key and are loaded with mmap_mode="r", so worker processes share the pages.
+# Bump INDEX_FORMAT_VERSION whenever chunking or the stored layout changes.
+INDEX_FORMAT_VERSION = 3  # 2: dense vectors stored L2-normalized, 3: TF-IDF vectorizer stored as vocabulary JSON + idf array
+
+
+def _index_dir() -> Path:
+    return RAG_CACHE_DIR / "index"
+
+
+def _index_kind() -> Optional[str]:
+    if USE_OPENAI:
+        return f"openai:{EMBEDDING_MODEL}"
+    if TfidfVectorizer is not None:
+        return "tfidf"
+    return None
+
+
+def _index_key(file_hashes: Dict[str, str]) -> str:
+    raw = json.dumps(
+        {"version": INDEX_FORMAT_VERSION, "kind": _index_kind(), "files": sorted(file_hashes.items())},
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _save_index_artifact() -> None:
+    """Write the current index to disk (arrays first, manifest last via atomic rename)."""
+    kind = _index_kind()
+    if _np is None or kind is None or _EMB_MATRIX is None or not KB_CHUNKS:
+        return
+    index_dir = _index_dir()
+    key = _index_key(_FILE_HASHES)
+    prefix = key[:16]
+    try:
+        index_dir.mkdir(parents=True, exist_ok=True)
+        files: Dict[str, str] = {}
+
+        def _write_array(name: str, array) -> None:
+            filename = f"{prefix}-{name}.npy"
+            tmp = index_dir / f"{filename}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                _np.save(f, array)
+            os.replace(tmp, index_dir / filename)
+            files[name] = filename
+
+        if kind == "tfidf":
+            matrix = _EMB_MATRIX.tocsr()
+            _write_array("data", matrix.data.astype(_np.float32))
+            _write_array("indices", matrix.indices)
+            _write_array("indptr", matrix.indptr)
+            # The fitted vectorizer is just its vocabulary and idf weights
+            _write_array("idf", _np.asarray(_TFIDF.idf_, dtype=_np.float64))
+            filename = f"{prefix}-vocabulary.json"
+            tmp = index_dir / f"{filename}.{os.getpid()}.tmp"
+            tmp.write_text(
+                json.dumps({term: int(i) for term, i in _TFIDF.vocabulary_.items()}, separators=(",", ":")),
+                encoding="utf-8",
+            )
+            os.replace(tmp, index_dir / filename)
+            files["vocabulary"] = filename
+        else:
+            _write_array("vectors", _np.asarray(_EMB_MATRIX, dtype=_np.float32))
+
+        manifest = {
+            "format_version": INDEX_FORMAT_VERSION,
+            "kind": kind,
+            "key": key,
+            "shape": list(_EMB_MATRIX.shape),
+            "files": files,
+            "file_hashes": _FILE_HASHES,
+            "chunks": KB_CHUNKS,
+        }
+        tmp = index_dir / f"manifest.json.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps(manifest), encoding="utf-8")
+        os.replace(tmp, index_dir / "manifest.json")
+
+        # Drop arrays of older index versions (already-mapped files stay valid until unmapped)
+        for path in index_dir.iterdir():
+            if path.name != "manifest.json" and not path.name.startswith(prefix) and not path.name.endswith(".tmp"):
+                try:
+                    path.unlink()
+                except Exception:
+                    pass
+    except Exception as e:
+        print(f"RAG: Could not write index artifact: {e}")
+
+
+def _load_index_artifact() -> bool:
+    """Map the persisted index if it matches the KB on disk. Returns False to fall back to a rebuild."""
+    global _FILE_HASHES, _FILE_CHUNKS, _FILE_EMBEDDINGS
+    kind = _index_kind()
+    manifest_path = _index_dir() / "manifest.json"
+    if _np is None or kind is None or not manifest_path.exists():
+        return False
+    hashes = {name: _content_hash(content) for name, content in KB_FILES.items()}
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("format_version") != INDEX_FORMAT_VERSION or manifest.get("key") != _index_key(hashes):
+            return False
+        files = {name: _index_dir() / filename for name, filename in manifest["files"].items()}
+        shape = tuple(manifest["shape"])
+        if kind == "tfidf":
+            from scipy.sparse import csr_matrix  # type: ignore
+            matrix = csr_matrix(
+                (
+                    _np.load(files["data"], mmap_mode="r"),
+                    _np.load(files["indices"], mmap_mode="r"),
+                    _np.load(files["indptr"], mmap_mode="r"),
+                ),
+                shape=shape,
+                copy=False,
+            )
+            tfidf = TfidfVectorizer(
+                **TFIDF_OPTIONS, vocabulary=json.loads(files["vocabulary"].read_text(encoding="utf-8"))
+            )
+            tfidf.idf_ = _np.load(files["idf"])
+        else:
+            matrix = _np.load(files["vectors"], mmap_mode="r")
+            tfidf = None
+        chunks = manifest["chunks"]
+        if matrix.shape != shape or len(chunks) != shape[0]:
+            return False
+    except Exception as e:
+        print(f"RAG: Ignoring index artifact ({e}); rebuilding")
+        return False
+
+    # Restore the per-file manifest so later incremental rebuilds reuse it
+    file_chunks: Dict[str, List[Dict[str, str]]] = {name: [] for name in KB_FILES}
+    for c in chunks:
+        file_chunks.setdefault(c["source"], []).append(c)
+    file_embeddings: Dict[str, Any] = {}
+    if tfidf is None:
+        # Rows follow the build-time file order kept in the manifest chunk list; the
+        # current KB_FILES (directory listing) order may differ
+        start = 0
+        for name in dict.fromkeys(c["source"] for c in chunks):
+            count = len(file_chunks[name])
+            file_embeddings[name] = matrix[start:start + count]
+            start += count
+    _FILE_HASHES, _FILE_CHUNKS, _FILE_EMBEDDINGS = hashes, file_chunks, file_embeddings
+    _set_index(chunks, matrix, tfidf)
+    return True
+
+
 def _embed_query(query: str):
     if USE_OPENAI:
         try:
             import openai  # type: ignore
             openai.api_key = OPENAI_API_KEY
-            resp = openai.embeddings.create(model="text-embedding-3-small", input=query)
+            resp = openai.embeddings.create(model=EMBEDDING_MODEL, input=query)
             vec = resp.data[0].embedding
             if _np is not None:
                 return _np.array(vec).reshape(1, -1)
@@ -474,44 +818,52 @@ def _embed_query(query: str):
     return None
 
 
+def _top_k(sims, k: int) -> List[int]:
+    """Indices of the k highest scores, best first (ties by position): O(n) selection + O(k log k)."""
+    k = min(k, len(sims))
+    if k <= 0:
+        return []
+    kth = sims[_np.argpartition(-sims, k - 1)[k - 1]]
+    # Everything above the k-th score, then the earliest chunks tied with it (like a stable sort)
+    above = _np.flatnonzero(sims > kth)
+    idxs = _np.concatenate([above, _np.flatnonzero(sims == kth)[:k - len(above)]])
+    return idxs[_np.lexsort((idxs, -sims[idxs]))].tolist()
+
+
 def retrieve_context(query: str, k: int = 5) -> List[Dict[str, str]]:
-    if not KB_CHUNKS:
+    # Read the index once; a concurrent reload swaps all of these together
+    chunks, matrix, boost = KB_CHUNKS, _EMB_MATRIX, _BOOST
+    if not chunks:
         return []
     q_vec = _embed_query(query)
-    if q_vec is None or _EMB_MATRIX is None:
+    if q_vec is None or matrix is None or _np is None:
         # No embeddings available; prioritize app-help content
-        app_help_chunks = [c for c in KB_CHUNKS if "app-help" in c.get("source", "").lower()]
+        app_help_chunks = [c for c in chunks if "app-help" in c.get("source", "").lower()]
         if app_help_chunks:
             return app_help_chunks[:k]
-        return KB_CHUNKS[:k]
+        return chunks[:k]
     try:
-        if _np is not None and isinstance(_EMB_MATRIX, _np.ndarray):
-            # cosine similarity manually
-            a = q_vec / ( _np.linalg.norm(q_vec) + 1e-12 )
-            b = _EMB_MATRIX / ( _np.linalg.norm(_EMB_MATRIX, axis=1, keepdims=True) + 1e-12 )
-            sims = (a @ b.T).flatten()
+        # Index rows are L2-normalized at build time: cosine similarity is one matrix-vector product
+        if isinstance(matrix, _np.ndarray):
+            q = _np.asarray(q_vec, dtype=_np.float32).ravel()
+            sims = matrix @ (q / (_np.linalg.norm(q) + 1e-12))
         else:
-            # sparse matrix (TF-IDF) path
-            sims = cosine_similarity(q_vec, _EMB_MATRIX).flatten()
+            # sparse matrix (TF-IDF) path; transform() output is already normalized
+            sims = _np.asarray((matrix @ q_vec.T).todense()).ravel()
         
         # Boost app-help content for app-related queries
         q_lower = query.lower()
         is_app_query = any(kw in q_lower for kw in ["how", "where", "what", "add", "create", "use", "navigate", "page", "button", "click"])
+        if is_app_query and boost is not None:
+            sims = sims * boost
         
-        if is_app_query:
-            # Boost scores for app-help chunks
-            for i, chunk in enumerate(KB_CHUNKS):
-                if "app-help" in chunk.get("source", "").lower():
-                    sims[i] = sims[i] * 1.5  # Boost app-help content
-        
-        idxs = sorted(range(len(sims)), key=lambda i: sims[i], reverse=True)[:k]
-        return [KB_CHUNKS[i] for i in idxs]
+        return [chunks[i] for i in _top_k(sims, k)]
     except Exception:
         # Fallback: prioritize app-help
-        app_help_chunks = [c for c in KB_CHUNKS if "app-help" in c.get("source", "").lower()]
+        app_help_chunks = [c for c in chunks if "app-help" in c.get("source", "").lower()]
         if app_help_chunks:
             return app_help_chunks[:k]
-        return KB_CHUNKS[:k]
+        return chunks[:k]
 
 
 # ---------------------------
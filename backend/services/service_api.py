@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import asyncio
+from datetime import date, time, timedelta
 from typing import Optional, List, Dict, Any
 
+from sqlalchemy import inspect
+
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
@@ -9,6 +13,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from models.database_functions import (
     add_user,
     update_user,
+    update_user_password_hash,
     add_contact,
     update_contact,
     delete_contact,
@@ -49,11 +54,20 @@ from models.database_functions import (
     SessionLocal,
     select,
     func,
+    list_page,
+    load_dashboard,
 )
 
 from models.database_functions import (
     AlreadyExistsError,
-    NotFoundError
+    NotFoundError,
+    InvalidQueryError
+)
+from models.async_database import (
+    ASYNC_DB_AVAILABLE,
+    list_page_async,
+    load_dashboard_async,
+    list_goals_for_user_async,
 )
 
 def user_to_dict(user: User) -> Dict[str, Any]:
@@ -134,8 +148,11 @@ def interaction_to_dict(interaction: Interaction) -> Dict[str, Any]:
 
 
 def goal_to_dict(goal: Goal) -> Dict[str, Any]:
-    # Get steps for this goal
-    steps = list_goal_steps(goal.goal_id)
+    # Use eager-loaded steps when available (list_goals_for_user), otherwise query them
+    if "steps" in inspect(goal).unloaded:
+        steps = list_goal_steps(goal.goal_id)
+    else:
+        steps = goal.steps
     return {
         "goal_id": goal.goal_id,
         "user_id": goal.user_id,
@@ -175,6 +192,152 @@ def list_meetings_for_user(user_id: int) -> List[Dict[str, Any]]:
         return [meeting_to_dict(m) for m in rows]
 
 
+# ---------- DASHBOARD ----------
+def _dashboard_payload(data: Dict[str, list], follow_up_days: int, meeting_days: int) -> Dict[str, Any]:
+    """
+    Serialize load_dashboard() rows. The follow-up and upcoming views use the same
+    filters and ordering as their standalone endpoints.
+    """
+    today = date.today()
+    follow_up_end = today + timedelta(days=follow_up_days)
+    meeting_end = today + timedelta(days=meeting_days)
+
+    upcoming_meetings = sorted(
+        (m for m in data["meetings"] if m.meeting_date and today <= m.meeting_date <= meeting_end),
+        key=lambda m: (m.meeting_date, m.start_time is None, m.start_time or time.min),
+    )
+    follow_ups = [
+        c for c in data["contacts"]
+        if c.date_next_follow_up and today <= c.date_next_follow_up <= follow_up_end
+    ]
+    pending = [i for i in data["interactions"] if i.follow_up_required and i.follow_up_date]
+
+    return {
+        "contacts": [contact_to_dict(c) for c in data["contacts"]],
+        "meetings": [meeting_to_dict(m) for m in data["meetings"]],
+        "upcoming_meetings": [meeting_to_dict(m) for m in upcoming_meetings],
+        "interactions": [interaction_to_dict(i) for i in data["interactions"]],
+        "goals": [goal_to_dict(g) for g in data["goals"]],
+        "follow_ups": [contact_to_dict(c) for c in follow_ups],
+        "overdue_follow_ups": [interaction_to_dict(i) for i in pending if i.follow_up_date < today],
+        "upcoming_interaction_follow_ups": [
+            interaction_to_dict(i) for i in pending if today <= i.follow_up_date <= follow_up_end
+        ],
+    }
+
+
+def get_dashboard_data(user_id: int, follow_up_days: int = 7, meeting_days: int = 30) -> Dict[str, Any]:
+    """Dashboard payload in one session (see load_dashboard)."""
+    return _dashboard_payload(load_dashboard(user_id), follow_up_days, meeting_days)
+
+
+async def get_dashboard_data_async(user_id: int, follow_up_days: int = 7, meeting_days: int = 30) -> Dict[str, Any]:
+    """get_dashboard_data() on the async engine (sync engine in a worker thread if unavailable)."""
+    if not ASYNC_DB_AVAILABLE:
+        return await asyncio.to_thread(get_dashboard_data, user_id, follow_up_days, meeting_days)
+    return _dashboard_payload(await load_dashboard_async(user_id), follow_up_days, meeting_days)
+
+
+async def get_goals_for_user_async(user_id: int) -> List[Dict[str, Any]]:
+    """get_goals_for_user() on the async engine."""
+    if not ASYNC_DB_AVAILABLE:
+        return await asyncio.to_thread(get_goals_for_user, user_id)
+    return [goal_to_dict(goal) for goal in await list_goals_for_user_async(user_id)]
+
+
+# ---------- PAGINATED LISTS ----------
+# Per list: model, serializer, keyset sort order (ends with the primary key so it is unique)
+_PAGE_SPECS = {
+    "contacts": (Contact, contact_to_dict, [("contact_id", False)]),
+    "meetings": (Meeting, meeting_to_dict, [("meeting_id", False)]),
+    "interactions": (
+        Interaction, interaction_to_dict,
+        [("interaction_date", True), ("date_created", True), ("interaction_id", True)],
+    ),
+}
+
+
+def _serialize_value(value: Any) -> Any:
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def _check_fields(fields: Optional[List[str]], allowed: List[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise InvalidQueryError(f"unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(fields))
+
+
+def _page_query_args(kind: str, user_id: int, limit, cursor, fields) -> Dict[str, Any]:
+    model, _, order_by = _PAGE_SPECS[kind]
+    return {
+        "where": [model.user_id == user_id],
+        "order_by": order_by,
+        "limit": limit,
+        "cursor": cursor,
+        "fields": _check_fields(fields, model.__table__.columns.keys()),
+    }
+
+
+def _page_items(kind: str, rows: List[Any], fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+    if fields:
+        return [{k: _serialize_value(v) for k, v in row.items()} for row in rows]
+    to_dict = _PAGE_SPECS[kind][1]
+    return [to_dict(row) for row in rows]
+
+
+def _page(kind: str, user_id: int, limit, cursor, fields):
+    args = _page_query_args(kind, user_id, limit, cursor, fields)
+    rows, next_cursor = list_page(_PAGE_SPECS[kind][0], **args)
+    return _page_items(kind, rows, args["fields"]), next_cursor
+
+
+async def _page_async(kind: str, user_id: int, limit, cursor, fields):
+    if not ASYNC_DB_AVAILABLE:
+        return await asyncio.to_thread(_page, kind, user_id, limit, cursor, fields)
+    args = _page_query_args(kind, user_id, limit, cursor, fields)
+    rows, next_cursor = await list_page_async(_PAGE_SPECS[kind][0], **args)
+    return _page_items(kind, rows, args["fields"]), next_cursor
+
+
+def list_contacts_page(
+    user_id: int, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[List[str]] = None
+) -> tuple[List[Dict[str, Any]], Optional[str]]:
+    """Contacts for a user, optionally one keyset page and/or only some fields. Returns (items, next_cursor)."""
+    return _page("contacts", user_id, limit, cursor, fields)
+
+
+def list_meetings_page(
+    user_id: int, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[List[str]] = None
+) -> tuple[List[Dict[str, Any]], Optional[str]]:
+    """Meetings for a user, optionally one keyset page and/or only some fields. Returns (items, next_cursor)."""
+    return _page("meetings", user_id, limit, cursor, fields)
+
+
+def list_interactions_page(
+    user_id: int, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[List[str]] = None
+) -> tuple[List[Dict[str, Any]], Optional[str]]:
+    """Interactions for a user (newest first), optionally one keyset page and/or only some fields."""
+    return _page("interactions", user_id, limit, cursor, fields)
+
+
+async def list_contacts_page_async(user_id: int, limit=None, cursor=None, fields=None):
+    """list_contacts_page() on the async engine."""
+    return await _page_async("contacts", user_id, limit, cursor, fields)
+
+
+async def list_meetings_page_async(user_id: int, limit=None, cursor=None, fields=None):
+    """list_meetings_page() on the async engine."""
+    return await _page_async("meetings", user_id, limit, cursor, fields)
+
+
+async def list_interactions_page_async(user_id: int, limit=None, cursor=None, fields=None):
+    """list_interactions_page() on the async engine."""
+    return await _page_async("interactions", user_id, limit, cursor, fields)
+
+
 def get_upcoming_follow_ups_for_user(user_id: int, days_ahead: int = 7) -> List[Dict[str, Any]]:
     contacts = get_upcoming_follow_ups(user_id, days_ahead)
     return [contact_to_dict(contact) for contact in contacts]
@@ -191,6 +354,10 @@ def update_user_service(user_id: int, name: Optional[str] = None, company_or_sch
     return user_to_dict(user)
 
 
+def update_user_password_hash_service(user_id: int, password_hash: str) -> None:
+    update_user_password_hash(user_id=user_id, password_hash=password_hash)
+
+
 def create_contact(
     user_id: int,
     name: str,
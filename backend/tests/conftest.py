@@ -0,0 +1,65 @@
+# conftest.py
+# ---------------------------------------------------------------------
+# Tests run against a throwaway SQLite database. DATABASE_URL has to be
+# set before models.database_functions is imported (it builds the engine
+# at import time).
+# ---------------------------------------------------------------------
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+_DB_DIR = tempfile.mkdtemp(prefix="ripple-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(_DB_DIR) / 'test.db'}"
+
+from sqlalchemy import event  # noqa: E402
+
+from models.database_functions import Base, engine, add_user  # noqa: E402
+from services.gmail_db import Base as GmailBase  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    """Create every table (and model-declared index) once per test session."""
+    Base.metadata.create_all(engine)
+    GmailBase.metadata.create_all(engine)
+    yield
+
+
+@pytest.fixture
+def user(request):
+    """A fresh user row (unique email per test)."""
+    return add_user(email=f"{request.node.name}@example.com", password_hash="x", name="Test User")
+
+
+class StatementRecorder:
+    """Collects (statement, parameters) for every statement an engine executes."""
+
+    def __init__(self, target_engine):
+        self.engine = target_engine
+        self.statements: list[tuple[str, object]] = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append((statement, parameters))
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+    @property
+    def selects(self) -> list[tuple[str, object]]:
+        return [(stmt, params) for stmt, params in self.statements if stmt.lstrip().upper().startswith("SELECT")]
+
+
+@pytest.fixture
+def record_statements():
+    """Context manager factory: `with record_statements() as rec: ...` (defaults to the sync engine)."""
+    return lambda target_engine=engine: StatementRecorder(target_engine)
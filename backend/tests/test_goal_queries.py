@@ -0,0 +1,52 @@
+"""
+Listing goals must not issue a query per goal: goals_query() eager-loads the steps
+(one goals SELECT + one steps SELECT ... IN), and goal_to_dict() must reuse them.
+"""
+import asyncio
+
+import pytest
+
+from models import database_functions as df
+from models.async_database import ASYNC_DB_AVAILABLE, async_engine
+from services import service_api
+
+STEPS_PER_GOAL = 3
+
+
+def _seed_goals(user_id: int, goal_count: int) -> None:
+    for g in range(goal_count):
+        goal = df.add_goal(user_id=user_id, title=f"Goal {g}", target_value=STEPS_PER_GOAL)
+        for i in range(STEPS_PER_GOAL):
+            df.add_goal_step(goal_id=goal.goal_id, title=f"Step {i}", order_index=i)
+
+
+@pytest.mark.parametrize("goal_count", [1, 5, 25])
+def test_list_goals_for_user_query_count(user, record_statements, goal_count):
+    _seed_goals(user.user_id, goal_count)
+    with record_statements() as rec:
+        goals = df.list_goals_for_user(user.user_id)
+    assert len(goals) == goal_count
+    assert all(len(goal.steps) == STEPS_PER_GOAL for goal in goals)
+    assert len(rec.statements) <= 2, rec.statements
+
+
+@pytest.mark.parametrize("goal_count", [1, 5, 25])
+def test_get_goals_for_user_query_count(user, record_statements, goal_count):
+    """Serializing through goal_to_dict() must not lazy-load steps per goal."""
+    _seed_goals(user.user_id, goal_count)
+    with record_statements() as rec:
+        goals = service_api.get_goals_for_user(user.user_id)
+    assert len(goals) == goal_count
+    assert all(len(goal["steps"]) == STEPS_PER_GOAL for goal in goals)
+    assert len(rec.statements) <= 2, rec.statements
+
+
+@pytest.mark.skipif(not ASYNC_DB_AVAILABLE, reason="async database driver not installed")
+@pytest.mark.parametrize("goal_count", [1, 25])
+def test_get_goals_for_user_async_query_count(user, record_statements, goal_count):
+    _seed_goals(user.user_id, goal_count)
+    with record_statements(async_engine.sync_engine) as rec:
+        goals = asyncio.run(service_api.get_goals_for_user_async(user.user_id))
+    assert len(goals) == goal_count
+    assert all(len(goal["steps"]) == STEPS_PER_GOAL for goal in goals)
+    assert len(rec.statements) <= 2, rec.statements
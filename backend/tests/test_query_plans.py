@@ -0,0 +1,89 @@
+"""
+Query-plan regression test for the per-user indexes (see migrate_add_query_indexes.py).
+
+Each hot query in models/database_functions.py is run for real, the SELECTs it
+issues are captured and re-run under EXPLAIN QUERY PLAN, and the plan must use
+the expected index instead of a full table scan.
+"""
+from datetime import date, timedelta
+
+import pytest
+
+from models import database_functions as df
+from models.database_functions import engine
+
+TODAY = date.today()
+
+# (name, call(seeded ids), {table: expected index})
+HOT_QUERIES = [
+    ("dashboard contacts", lambda ids: _run(df.dashboard_queries(ids["user_id"])["contacts"]),
+     {"contacts": "ix_contacts_user_id_contact_id"}),
+    ("dashboard interactions", lambda ids: _run(df.dashboard_queries(ids["user_id"])["interactions"]),
+     {"interactions": "ix_interactions_user_id_date"}),
+    ("get_upcoming_follow_ups", lambda ids: df.get_upcoming_follow_ups(ids["user_id"]),
+     {"contacts": "ix_contacts_user_id_follow_up"}),
+    ("get_upcoming_meetings", lambda ids: df.get_upcoming_meetings(ids["user_id"]),
+     {"meetings": "ix_meetings_user_id_date"}),
+    ("get_meetings_for_date", lambda ids: df.get_meetings_for_date(ids["user_id"], TODAY),
+     {"meetings": "ix_meetings_user_id_date"}),
+    ("list_goals_for_user", lambda ids: df.list_goals_for_user(ids["user_id"]),
+     {"goals": "ix_goals_user_id_date_created", "goal_steps": "ix_goal_steps_goal_id_order"}),
+    ("list_goal_steps", lambda ids: df.list_goal_steps(ids["goal_id"]),
+     {"goal_steps": "ix_goal_steps_goal_id_order"}),
+    ("list_interactions_for_user", lambda ids: df.list_interactions_for_user(ids["user_id"]),
+     {"interactions": "ix_interactions_user_id_date"}),
+    ("list_interactions_for_contact", lambda ids: df.list_interactions_for_contact(ids["contact_id"], ids["user_id"]),
+     {"interactions": "ix_interactions_user_id_contact_date"}),
+    ("get_overdue_follow_ups", lambda ids: df.get_overdue_follow_ups(ids["user_id"]),
+     {"interactions": "ix_interactions_user_id_follow_up"}),
+    ("get_upcoming_interaction_follow_ups", lambda ids: df.get_upcoming_interaction_follow_ups(ids["user_id"]),
+     {"interactions": "ix_interactions_user_id_follow_up"}),
+]
+
+
+def _run(stmt):
+    with df.get_session() as s:
+        return list(s.execute(stmt).scalars().all())
+
+
+def _query_plan(statement: str, parameters) -> list[str]:
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [str(row[-1]) for row in cursor.fetchall()]
+    finally:
+        raw.close()
+
+
+@pytest.fixture
+def seeded(user):
+    """One user with a contact, a goal with steps, a meeting and an interaction."""
+    contact = df.add_contact(user_id=user.user_id, name="Contact", email="c@example.com",
+                             date_next_follow_up=TODAY + timedelta(days=1))
+    goal = df.add_goal(user_id=user.user_id, title="Goal", target_value=1)
+    for i in range(2):
+        df.add_goal_step(goal_id=goal.goal_id, title=f"Step {i}", order_index=i)
+    df.add_meeting(user_id=user.user_id, contact_id=contact.contact_id, meeting_date=TODAY)
+    df.add_interaction(user_id=user.user_id, contact_id=contact.contact_id,
+                       interaction_type="email", interaction_date=TODAY,
+                       follow_up_required=True, follow_up_date=TODAY - timedelta(days=1))
+    return {"user_id": user.user_id, "contact_id": contact.contact_id, "goal_id": goal.goal_id}
+
+
+@pytest.mark.parametrize("name,call,expected", HOT_QUERIES, ids=[q[0] for q in HOT_QUERIES])
+def test_hot_query_uses_index(seeded, record_statements, name, call, expected):
+    with record_statements() as rec:
+        call(seeded)
+    assert rec.selects, f"{name} issued no SELECT"
+
+    plans = [_query_plan(stmt, params) for stmt, params in rec.selects]
+    for table, index in expected.items():
+        table_plans = [p for p in plans if any(f" {table} " in f" {line} " for line in p)]
+        assert table_plans, f"{name}: no query on {table}"
+        for plan in table_plans:
+            for line in plan:
+                # SQLite reports a full table scan as "SCAN <table>" without an index
+                assert not (line.startswith(f"SCAN {table}") and "INDEX" not in line), \
+                    f"{name}: full scan on {table}: {plan}"
+            assert any(index in line for line in plan), f"{name}: {index} not used: {plan}"
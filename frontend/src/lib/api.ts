@@ -181,6 +181,14 @@ export const followUpsApi = {
   },
 };
 
+// Dashboard API (everything the dashboard shows, in one request)
+export const dashboardApi = {
+  getDashboard: async (followUpDays: number = 7) => {
+    const response = await apiClient.get(`/api/dashboard?follow_up_days=${followUpDays}`);
+    return response.data;
+  },
+};
+
 // Stats API (public endpoint)
 export const statsApi = {
   getStats: async () => {
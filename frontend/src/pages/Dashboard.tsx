@@ -21,7 +21,7 @@ import {
   DialogTitle,
 } from "@/components/ui/dialog";
 import { useAuth } from "@/contexts/AuthContext";
-import { contactsApi, goalsApi, followUpsApi, interactionsApi, meetingsApi } from "@/lib/api";
+import { dashboardApi } from "@/lib/api";
 import { useEffect, useState } from "react";
 import { useNavigate } from "react-router-dom";
 import { networkingTips } from "@/data/networking-tips";
@@ -163,24 +163,16 @@ const Dashboard = () => {
     const loadUserData = async () => {
       if (user?.userId) {
         try {
-          // Load contacts, goals, follow-ups, interactions, and meetings in parallel
-          const [contactsData, goalsData, followUpsData, overdueFollowUpsData, interactionFollowUpsData, interactionsData, meetingsData] = await Promise.all([
-            contactsApi.getContacts(user.userId),
-            goalsApi.getGoals(user.userId),
-            followUpsApi.getUpcomingFollowUps(user.userId, 7),
-            followUpsApi.getOverdueFollowUps(user.userId),
-            followUpsApi.getUpcomingInteractionFollowUps(user.userId, 7),
-            interactionsApi.getInteractionsForUser(user.userId),
-            meetingsApi.getUserMeetings(user.userId)
-          ]);
-          setContacts(contactsData);
-          setGoals(goalsData);
-          setInteractions(interactionsData || []);
-          setMeetings(meetingsData || []);
+          // Load contacts, goals, follow-ups, interactions, and meetings in one request
+          const dashboard = await dashboardApi.getDashboard(7);
+          setContacts(dashboard.contacts || []);
+          setGoals(dashboard.goals || []);
+          setInteractions(dashboard.interactions || []);
+          setMeetings(dashboard.meetings || []);
           // Combine contact follow-ups and interaction follow-ups
-          const allFollowUps = [...(followUpsData || []), ...(interactionFollowUpsData || [])];
+          const allFollowUps = [...(dashboard.follow_ups || []), ...(dashboard.upcoming_interaction_follow_ups || [])];
           setFollowUpsThisWeek(allFollowUps);
-          setOverdueFollowUps(overdueFollowUpsData || []);
+          setOverdueFollowUps(dashboard.overdue_follow_ups || []);
           setCompletionRate(0); // Set to 0 for now until we define what completion rate means
         } catch (error) {
           console.error('Failed to load user data:', error);
@@ -0,0 +1,14 @@
+-- Add incremental checklist state to gmail_contacts table
+-- first_sent_ts / last_received_ts: earliest outbound and latest inbound networking message
+-- (Gmail ms timestamps), so checklist flags can be updated from each new message alone.
+-- checklist_backfilled = FALSE marks existing rows; the next sync touching the contact
+-- recomputes its state once from gmail_messages and sets it to TRUE.
+
+ALTER TABLE gmail_contacts 
+ADD COLUMN IF NOT EXISTS first_sent_ts BIGINT;
+
+ALTER TABLE gmail_contacts 
+ADD COLUMN IF NOT EXISTS last_received_ts BIGINT;
+
+ALTER TABLE gmail_contacts 
+ADD COLUMN IF NOT EXISTS checklist_backfilled BOOLEAN DEFAULT FALSE;
@@ -0,0 +1,11 @@
+-- Add pending_main_sync column to gmail_contacts table
+-- TRUE when the Gmail contact changed since it was last reconciled into the main
+-- contacts table. Sync only reconciles pending rows, then clears the flag.
+-- DEFAULT TRUE so every existing row is reconciled once.
+
+ALTER TABLE gmail_contacts 
+ADD COLUMN IF NOT EXISTS pending_main_sync BOOLEAN DEFAULT TRUE;
+
+CREATE INDEX IF NOT EXISTS idx_gmail_contacts_pending_main_sync
+ON gmail_contacts(user_id)
+WHERE pending_main_sync = TRUE;
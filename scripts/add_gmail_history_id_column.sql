@@ -0,0 +1,6 @@
+-- Add history_id column to gmail_oauth_tokens table
+-- Stores the Gmail History API cursor used for incremental sync.
+-- NULL means the next sync does a bounded full rescan and records a fresh cursor.
+
+ALTER TABLE gmail_oauth_tokens 
+ADD COLUMN IF NOT EXISTS history_id VARCHAR(64);
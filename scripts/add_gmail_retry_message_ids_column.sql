@@ -0,0 +1,7 @@
+-- Add retry_message_ids column to gmail_oauth_tokens table
+-- JSON object {gmail_id: failed attempts} of messages that errored during processing.
+-- They are fetched again on the next syncs (the history cursor moves on) until
+-- they succeed or reach GMAIL_SYNC_MAX_MESSAGE_RETRIES attempts.
+
+ALTER TABLE gmail_oauth_tokens 
+ADD COLUMN IF NOT EXISTS retry_message_ids TEXT;
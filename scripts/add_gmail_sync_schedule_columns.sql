@@ -0,0 +1,12 @@
+-- Add adaptive sync schedule columns to gmail_oauth_tokens table
+-- sync_interval_seconds: current per-user poll interval (shrinks on networking mail, backs off when idle)
+-- next_sync_at: when the background scheduler should sync this user next (UTC)
+-- NULL in either column means "use the default interval / sync soon".
+
+ALTER TABLE gmail_oauth_tokens 
+ADD COLUMN IF NOT EXISTS sync_interval_seconds INTEGER;
+
+ALTER TABLE gmail_oauth_tokens 
+ADD COLUMN IF NOT EXISTS next_sync_at TIMESTAMP;
+
+CREATE INDEX IF NOT EXISTS idx_gmail_oauth_tokens_next_sync ON gmail_oauth_tokens(next_sync_at);
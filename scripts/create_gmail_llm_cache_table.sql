@@ -0,0 +1,17 @@
+-- Gmail LLM Result Cache Table
+-- Caches OpenAI classification / summary / meeting-detection results so identical
+-- inputs (same model, prompt version and prepared email or thread text) are not re-sent.
+-- The backend also creates this table automatically on first use.
+
+CREATE TABLE IF NOT EXISTS gmail_llm_cache (
+    cache_key VARCHAR(64) NOT NULL PRIMARY KEY,  -- sha256(kind, model, prompt version, input hash)
+    kind VARCHAR(20),                            -- 'classify', 'summary' or 'meeting'
+    model VARCHAR(100),
+    prompt_version VARCHAR(16),
+    result_json TEXT,
+    created_at BIGINT,                           -- epoch seconds
+    expires_at BIGINT                            -- epoch seconds (TTL)
+);
+
+CREATE INDEX IF NOT EXISTS ix_gmail_llm_cache_created_at ON gmail_llm_cache(created_at);
+CREATE INDEX IF NOT EXISTS ix_gmail_llm_cache_expires_at ON gmail_llm_cache(expires_at);
@@ -0,0 +1,32 @@
+-- Composite indexes for the per-user query paths
+-- Matches the indexes declared on the models (__table_args__). Equivalent to running
+-- `python backend/migrate_add_query_indexes.py`; then verify with `--check`
+-- (backend/tests/test_query_plans.py asserts the plans in CI).
+-- CONCURRENTLY avoids blocking writes; run each statement outside a transaction.
+
+-- Contacts: per-user listing, upcoming follow-ups, Gmail reconciliation by email
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_contacts_user_id_contact_id ON contacts(user_id, contact_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_contacts_user_id_follow_up ON contacts(user_id, date_next_follow_up);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_contacts_user_id_email_lower ON contacts(user_id, lower(email));
+
+-- Meetings: upcoming / by date, per contact
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_meetings_user_id_date ON meetings(user_id, meeting_date, start_time);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_meetings_contact_id ON meetings(contact_id);
+
+-- Interactions: timeline, per-contact timeline, follow-ups
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_interactions_user_id_date ON interactions(user_id, interaction_date, date_created);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_interactions_user_id_contact_date ON interactions(user_id, contact_id, interaction_date, date_created);
+-- Superseded by ix_interactions_user_id_contact_date (didn't cover the timeline ORDER BY)
+DROP INDEX CONCURRENTLY IF EXISTS ix_interactions_user_id_contact_id;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_interactions_user_id_follow_up ON interactions(user_id, follow_up_required, follow_up_date);
+
+-- Goals and steps
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_goals_user_id_date_created ON goals(user_id, date_created);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_goal_steps_goal_id_order ON goal_steps(goal_id, order_index);
+
+-- Gmail tables: per-contact and per-thread lookups ordered by time
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_gmail_contacts_user_id_last_contact ON gmail_contacts(user_id, last_contact_ts);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_gmail_threads_user_id_contact ON gmail_threads(user_id, contact_email, last_updated_ts);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_gmail_threads_user_id_updated ON gmail_threads(user_id, last_updated_ts);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_gmail_messages_user_id_contact ON gmail_messages(user_id, contact_email, "timestamp");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_gmail_messages_user_id_thread ON gmail_messages(user_id, thread_id, "timestamp");